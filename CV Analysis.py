@@ -1,284 +1,113 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
-import json
 import os
-import re
+import queue
+import threading
+import time
 from datetime import datetime
 from collections import Counter
 import math
 
-class PersonalityAnalyzer:
-    def __init__(self):
-        # Big Five personality traits
-        self.traits = {
-            'Openness': 0,
-            'Conscientiousness': 0, 
-            'Extraversion': 0,
-            'Agreeableness': 0,
-            'Emotional Stability': 0
-        }
-        
-        # Keyword dictionaries for personality prediction
-        self.personality_keywords = {
-            'Openness': {
-                'high': ['creative', 'innovative', 'artistic', 'imaginative', 'curious', 'original', 
-                        'inventive', 'versatile', 'adaptable', 'experimental', 'design', 'research',
-                        'development', 'exploration', 'brainstorming', 'conceptual', 'theoretical',
-                        'abstract', 'philosophical', 'unconventional', 'novel', 'cutting-edge'],
-                'low': ['traditional', 'conventional', 'routine', 'standard', 'established',
-                       'systematic', 'structured', 'methodical', 'practical', 'conservative']
-            },
-            'Conscientiousness': {
-                'high': ['organized', 'detailed', 'responsible', 'reliable', 'thorough', 'systematic',
-                        'methodical', 'disciplined', 'efficient', 'punctual', 'planning', 'scheduled',
-                        'achievement', 'goal-oriented', 'dedicated', 'committed', 'focused', 'precise',
-                        'quality', 'standards', 'deadline', 'completion', 'accomplishment'],
-                'low': ['flexible', 'spontaneous', 'casual', 'relaxed', 'informal', 'adaptable']
-            },
-            'Extraversion': {
-                'high': ['leadership', 'team', 'collaboration', 'communication', 'presentation',
-                        'networking', 'social', 'outgoing', 'energetic', 'enthusiastic', 'dynamic',
-                        'engaging', 'interactive', 'public speaking', 'relationship building',
-                        'influencing', 'motivating', 'coordinating', 'facilitating', 'mentoring'],
-                'low': ['independent', 'individual', 'solitary', 'analytical', 'research',
-                       'documentation', 'writing', 'technical', 'focused', 'concentrated']
-            },
-            'Agreeableness': {
-                'high': ['cooperative', 'collaborative', 'supportive', 'helpful', 'team player',
-                        'consensus', 'harmony', 'diplomatic', 'understanding', 'empathetic',
-                        'service', 'assistance', 'volunteer', 'community', 'charity', 'caring',
-                        'nurturing', 'patient', 'kind', 'considerate', 'respectful'],
-                'low': ['competitive', 'challenging', 'assertive', 'direct', 'critical',
-                       'analytical', 'objective', 'independent', 'decisive']
-            },
-            'Emotional Stability': {
-                'high': ['calm', 'stable', 'consistent', 'resilient', 'composed', 'confident',
-                        'steady', 'balanced', 'reliable', 'stress management', 'pressure',
-                        'challenging', 'difficult', 'crisis', 'problem-solving', 'adaptable',
-                        'flexible', 'managing', 'handling', 'coping'],
-                'low': ['sensitive', 'reactive', 'emotional', 'stressed', 'anxious', 'worried']
-            }
-        }
-        
-        # Experience level indicators
-        self.experience_indicators = {
-            'senior': ['senior', 'lead', 'principal', 'director', 'manager', 'head', 'chief', 'vp', 'vice president'],
-            'mid': ['specialist', 'analyst', 'consultant', 'coordinator', 'supervisor'],
-            'junior': ['junior', 'entry', 'assistant', 'associate', 'intern', 'trainee']
-        }
-        
-        # Industry categories
-        self.industries = {
-            'tech': ['software', 'technology', 'IT', 'computer', 'programming', 'development', 'data'],
-            'business': ['business', 'management', 'marketing', 'sales', 'finance', 'accounting'],
-            'creative': ['design', 'creative', 'art', 'media', 'advertising', 'content'],
-            'research': ['research', 'science', 'analysis', 'academic', 'laboratory']
-        }
-        
-    def extract_text_features(self, text):
-        """Extract various features from resume text"""
-        text_lower = text.lower()
-        words = re.findall(r'\b\w+\b', text_lower)
-        
-        features = {
-            'total_words': len(words),
-            'unique_words': len(set(words)),
-            'avg_word_length': sum(len(word) for word in words) / len(words) if words else 0,
-            'sentence_count': len(re.findall(r'[.!?]+', text)),
-            'exclamation_count': text.count('!'),
-            'question_count': text.count('?'),
-            'capital_words': len(re.findall(r'\b[A-Z]{2,}\b', text)),
-            'numbers_count': len(re.findall(r'\b\d+\b', text)),
-        }
-        
-        # Education indicators
-        education_keywords = ['university', 'college', 'degree', 'bachelor', 'master', 'phd', 'doctorate']
-        features['education_mentions'] = sum(text_lower.count(word) for word in education_keywords)
-        
-        # Achievement indicators  
-        achievement_keywords = ['achieved', 'accomplished', 'awarded', 'recognized', 'improved', 'increased']
-        features['achievement_mentions'] = sum(text_lower.count(word) for word in achievement_keywords)
-        
-        # Leadership indicators
-        leadership_keywords = ['led', 'managed', 'directed', 'supervised', 'coordinated', 'headed']
-        features['leadership_mentions'] = sum(text_lower.count(word) for word in leadership_keywords)
-        
-        return features
-    
-    def calculate_personality_scores(self, text, features):
-        """Calculate personality trait scores based on text analysis"""
-        text_lower = text.lower()
-        scores = {}
-        
-        for trait, keywords in self.personality_keywords.items():
-            high_score = sum(text_lower.count(word) for word in keywords['high'])
-            low_score = sum(text_lower.count(word) for word in keywords['low'])
-            
-            # Base score calculation
-            base_score = (high_score - low_score) + 50  # Normalize around 50
-            
-            # Adjust based on text features
-            if trait == 'Conscientiousness':
-                # More organized language structure indicates higher conscientiousness
-                if features['avg_word_length'] > 5:
-                    base_score += 5
-                if features['achievement_mentions'] > 2:
-                    base_score += 10
-                    
-            elif trait == 'Extraversion':
-                # More social and leadership language
-                if features['leadership_mentions'] > 1:
-                    base_score += 10
-                if features['exclamation_count'] > 0:
-                    base_score += 5
-                    
-            elif trait == 'Openness':
-                # Diverse vocabulary and creative language
-                vocab_diversity = features['unique_words'] / features['total_words'] if features['total_words'] > 0 else 0
-                if vocab_diversity > 0.6:
-                    base_score += 10
-                    
-            elif trait == 'Agreeableness':
-                # Collaborative and service-oriented language
-                collab_words = ['team', 'collaborate', 'help', 'support', 'assist']
-                collab_score = sum(text_lower.count(word) for word in collab_words)
-                base_score += collab_score * 2
-                
-            elif trait == 'Emotional Stability':
-                # Consistent, calm language patterns
-                if features['sentence_count'] > 10 and features['exclamation_count'] == 0:
-                    base_score += 5
-            
-            # Normalize score to 0-100 range
-            scores[trait] = max(0, min(100, base_score))
-            
-        return scores
-    
-    def determine_experience_level(self, text):
-        """Determine experience level from resume text"""
-        text_lower = text.lower()
-        
-        senior_count = sum(text_lower.count(word) for word in self.experience_indicators['senior'])
-        mid_count = sum(text_lower.count(word) for word in self.experience_indicators['mid'])
-        junior_count = sum(text_lower.count(word) for word in self.experience_indicators['junior'])
-        
-        if senior_count > mid_count and senior_count > junior_count:
-            return "Senior Level"
-        elif mid_count > junior_count:
-            return "Mid Level"
-        else:
-            return "Entry Level"
-    
-    def identify_industry(self, text):
-        """Identify likely industry based on keywords"""
-        text_lower = text.lower()
-        industry_scores = {}
-        
-        for industry, keywords in self.industries.items():
-            score = sum(text_lower.count(word) for word in keywords)
-            industry_scores[industry] = score
-        
-        if max(industry_scores.values()) > 0:
-            return max(industry_scores, key=industry_scores.get).title()
-        return "General"
-    
-    def generate_personality_report(self, scores, experience_level, industry, features):
-        """Generate a comprehensive personality report"""
-        report = []
-        report.append("=== PERSONALITY ANALYSIS REPORT ===\n")
-        
-        # Big Five Scores
-        report.append("BIG FIVE PERSONALITY TRAITS:\n")
-        for trait, score in scores.items():
-            level = "High" if score > 70 else "Moderate" if score > 40 else "Low"
-            report.append(f"• {trait}: {score:.1f}/100 ({level})")
-        
-        report.append(f"\nEXPERIENCE LEVEL: {experience_level}")
-        report.append(f"LIKELY INDUSTRY: {industry}")
-        
-        # Detailed trait interpretations
-        report.append("\n=== DETAILED TRAIT ANALYSIS ===\n")
-        
-        # Openness
-        openness = scores['Openness']
-        if openness > 70:
-            report.append("OPENNESS (High): This candidate likely enjoys new experiences, is creative and imaginative. They may thrive in roles requiring innovation and adaptability.")
-        elif openness > 40:
-            report.append("OPENNESS (Moderate): This candidate shows balanced openness to new experiences while maintaining practical focus.")
-        else:
-            report.append("OPENNESS (Low): This candidate likely prefers routine and established methods. They may excel in structured, detail-oriented roles.")
-        
-        # Conscientiousness  
-        conscientiousness = scores['Conscientiousness']
-        if conscientiousness > 70:
-            report.append("CONSCIENTIOUSNESS (High): Highly organized and reliable. Likely to meet deadlines and maintain high quality standards.")
-        elif conscientiousness > 40:
-            report.append("CONSCIENTIOUSNESS (Moderate): Shows good organizational skills with balanced flexibility.")
-        else:
-            report.append("CONSCIENTIOUSNESS (Low): May prefer flexible work environments and spontaneous approaches.")
-        
-        # Extraversion
-        extraversion = scores['Extraversion']
-        if extraversion > 70:
-            report.append("EXTRAVERSION (High): Likely energetic and outgoing. May excel in leadership, sales, or client-facing roles.")
-        elif extraversion > 40:
-            report.append("EXTRAVERSION (Moderate): Comfortable in both individual and team settings.")
-        else:
-            report.append("EXTRAVERSION (Low): Likely prefers independent work and smaller team environments.")
-        
-        # Agreeableness
-        agreeableness = scores['Agreeableness']
-        if agreeableness > 70:
-            report.append("AGREEABLENESS (High): Cooperative and team-oriented. Likely to work well in collaborative environments.")
-        elif agreeableness > 40:
-            report.append("AGREEABLENESS (Moderate): Balanced approach to cooperation and assertiveness.")
-        else:
-            report.append("AGREEABLENESS (Low): May be more competitive and direct in approach. Could excel in challenging, results-driven roles.")
-        
-        # Emotional Stability
-        stability = scores['Emotional Stability']
-        if stability > 70:
-            report.append("EMOTIONAL STABILITY (High): Likely handles stress well and remains calm under pressure.")
-        elif stability > 40:
-            report.append("EMOTIONAL STABILITY (Moderate): Generally stable with normal stress responses.")
-        else:
-            report.append("EMOTIONAL STABILITY (Low): May be more sensitive to stress. Could benefit from supportive work environments.")
-        
-        # Role recommendations
-        report.append(f"\n=== ROLE RECOMMENDATIONS ===\n")
-        
-        if scores['Extraversion'] > 60 and scores['Agreeableness'] > 60:
-            report.append("• Team Leadership roles")
-            report.append("• Customer Relations")
-            report.append("• Sales and Marketing")
-        
-        if scores['Conscientiousness'] > 70 and scores['Openness'] < 50:
-            report.append("• Project Management")
-            report.append("• Quality Assurance")
-            report.append("• Operations")
-        
-        if scores['Openness'] > 70 and scores['Conscientiousness'] > 60:
-            report.append("• Research and Development")
-            report.append("• Creative roles")
-            report.append("• Innovation Management")
-        
-        if scores['Emotional Stability'] > 70 and scores['Conscientiousness'] > 60:
-            report.append("• Crisis Management")
-            report.append("• High-pressure environments")
-            report.append("• Strategic roles")
-        
-        return "\n".join(report)
+import history_io
+from analysis_worker import AnalysisWorker
+from cohort_analytics import CohortAnalytics, ordinal
+from history_store import HistoryStore, TRAIT_COLUMNS
+from history_view import VirtualHistoryView
+from instrumentation import Instrumentation, format_breakdown
+from lexicon_bundle import LexiconWatcher
+from live_analysis import LiveAnalysis, changed_range
+from personality_analyzer import PersonalityAnalyzer
+from result_cache import ResultCache
+
+try:
+    from near_duplicates import NearDuplicateIndex
+    from similarity_index import SimilarityIndex
+except ImportError:
+    # Near-duplicate detection and similarity search need NumPy
+    NearDuplicateIndex = SimilarityIndex = None
+
+# How often the Tk main loop checks the analysis worker for events (ms)
+WORKER_POLL_INTERVAL = 50
+
+# How often the lexicon file is checked for edits (ms)
+LEXICON_POLL_INTERVAL = 2000
+
+# Pause in typing after which live analysis updates the results (ms)
+LIVE_ANALYSIS_DELAY = 150
+
+# Files larger than this are analyzed in streaming mode instead of being loaded
+STREAMING_THRESHOLD = 2 * 1024 * 1024
+
+# Characters of a streamed file shown in the text area as a preview
+PREVIEW_CHARS = 20000
+
+# Where analysis history is kept between sessions
+HISTORY_DB_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "history.sqlite")
+
+# MinHash signatures of the resumes in the history, keyed by history entry id
+NEAR_DUPLICATES_DB_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "near_duplicates.sqlite")
+
+# Snapshot of the similarity search vectors, refreshed from the history on start
+SIMILARITY_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "similarity.npz")
+
+# Number of similar analyses listed by "Find Similar"
+SIMILAR_RESULTS = 10
+
+# Snapshot of the cohort aggregates, refreshed from the history on start
+COHORTS_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "cohorts.json")
+
+# Months of experience mix shown in the analytics tab
+ANALYTICS_MONTHS = 12
+
+# Characters drawing a bucket's share of a trait distribution, emptiest first
+SPARK_CHARS = " ▁▂▃▄▅▆▇█"
+
+# File types offered when exporting or importing the history
+HISTORY_FILE_TYPES = [
+    ("JSON files", "*.json"),
+    ("JSON Lines files", "*.jsonl"),
+    ("CSV files", "*.csv"),
+    ("Columnar history files", "*.cvh"),
+    ("All files", "*.*"),
+]
+
+# Choices offered by the history filters
+EXPERIENCE_LEVELS = ("Senior Level", "Mid Level", "Entry Level")
+INDUSTRIES = ("Tech", "Business", "Creative", "Research", "General")
+ALL_CHOICE = "All"
 
 class PersonalityAnalyzerGUI:
     def __init__(self):
         self.analyzer = PersonalityAnalyzer()
+        self.instrumentation = Instrumentation()
+        self.analyzer.instrumentation = self.instrumentation
+        self.timed_runs = 0
+        bundle = self.analyzer.lexicon_bundle
+        self.lexicon_watcher = LexiconWatcher(bundle.source_path, bundle.word_boundary, bundle.source_digest)
+        self.lexicon_error = None
+        self.live_analysis = None
+        self.live_after_id = None
+        self.history_task = None
+        self.result_cache = ResultCache(self.analyzer)
+        self.duplicate_index = NearDuplicateIndex(NEAR_DUPLICATES_DB_PATH) if NearDuplicateIndex else None
+        self.worker = AnalysisWorker(self.result_cache, self.duplicate_index)
         self.root = tk.Tk()
         self.root.title("Resume Personality Analyzer")
         self.root.geometry("1000x700")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        self.analysis_history = []
+        self.analysis_history = HistoryStore(HISTORY_DB_PATH, self.analyzer)
+        self.similarity_index = None
+        if SimilarityIndex is not None:
+            self.similarity_index = SimilarityIndex.load(SIMILARITY_INDEX_PATH)
+            self.similarity_index.sync(self.analysis_history)
+        self.cohort_analytics = CohortAnalytics.load(COHORTS_PATH)
+        self.cohort_analytics.sync(self.analysis_history)
         
         self.setup_gui()
+        self.update_history_display()
+        self.root.after(WORKER_POLL_INTERVAL, self.poll_worker)
+        self.root.after(LEXICON_POLL_INTERVAL, self.poll_lexicon)
     
     def setup_gui(self):
         """Setup the GUI components"""
@@ -300,6 +129,8 @@ class PersonalityAnalyzerGUI:
         
         ttk.Button(file_frame, text="Upload Resume File", 
                   command=self.upload_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Analyze Files...", 
+                  command=self.queue_files).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_frame, text="Clear Text", 
                   command=self.clear_text).pack(side=tk.LEFT, padx=5)
         
@@ -307,10 +138,25 @@ class PersonalityAnalyzerGUI:
         ttk.Label(input_frame, text="Or paste resume text below:").pack(anchor=tk.W, padx=10, pady=(10,0))
         self.text_input = scrolledtext.ScrolledText(input_frame, height=15, width=80)
         self.text_input.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Analysis button
-        ttk.Button(input_frame, text="Analyze Personality", 
-                  command=self.analyze_resume).pack(pady=10)
+        self.text_input.bind('<<Modified>>', self.on_text_modified)
+        
+        # Analysis button and progress
+        action_frame = ttk.Frame(input_frame)
+        action_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Button(action_frame, text="Analyze Personality", 
+                  command=self.analyze_resume).pack(side=tk.LEFT, padx=5)
+        ttk.Button(action_frame, text="Cancel", 
+                  command=self.cancel_analysis).pack(side=tk.LEFT, padx=5)
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="Live analysis", variable=self.live_var,
+                        command=self.toggle_live_analysis).pack(side=tk.LEFT, padx=5)
+        self.skip_duplicates_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="Skip near-duplicates", variable=self.skip_duplicates_var,
+                        command=self.toggle_skip_duplicates,
+                        state=tk.NORMAL if self.duplicate_index else tk.DISABLED).pack(side=tk.LEFT, padx=5)
+        self.progress_bar = ttk.Progressbar(action_frame, mode='determinate', maximum=100)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
         # Results Tab
         results_frame = ttk.Frame(notebook)
@@ -330,8 +176,35 @@ class PersonalityAnalyzerGUI:
         
         ttk.Button(history_controls, text="Export History", 
                   command=self.export_history).pack(side=tk.LEFT, padx=5)
+        ttk.Button(history_controls, text="Import History", 
+                  command=self.import_history).pack(side=tk.LEFT, padx=5)
         ttk.Button(history_controls, text="Clear History", 
                   command=self.clear_history).pack(side=tk.LEFT, padx=5)
+        ttk.Button(history_controls, text="Find Similar", command=self.find_similar,
+                   state=tk.NORMAL if self.similarity_index is not None else tk.DISABLED).pack(side=tk.LEFT, padx=5)
+        
+        # History filters, applied by the history store rather than the widget
+        filter_frame = ttk.Frame(history_frame)
+        filter_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.experience_filter = tk.StringVar(value=ALL_CHOICE)
+        self.industry_filter = tk.StringVar(value=ALL_CHOICE)
+        self.trait_filter = tk.StringVar(value=ALL_CHOICE)
+        self.min_score_filter = tk.StringVar()
+        
+        ttk.Label(filter_frame, text="Experience:").pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Combobox(filter_frame, textvariable=self.experience_filter, state='readonly', width=12,
+                     values=(ALL_CHOICE,) + EXPERIENCE_LEVELS).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Industry:").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Combobox(filter_frame, textvariable=self.industry_filter, state='readonly', width=10,
+                     values=(ALL_CHOICE,) + INDUSTRIES).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Trait:").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Combobox(filter_frame, textvariable=self.trait_filter, state='readonly', width=18,
+                     values=(ALL_CHOICE,) + tuple(TRAIT_COLUMNS)).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Score >").pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Entry(filter_frame, textvariable=self.min_score_filter, width=6).pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="Apply Filter", 
+                  command=self.apply_history_filter).pack(side=tk.LEFT, padx=5)
         
         # History list
         self.history_tree = ttk.Treeview(history_frame, 
@@ -348,12 +221,37 @@ class PersonalityAnalyzerGUI:
         self.history_tree.column('Industry', width=100)
         self.history_tree.column('Top_Trait', width=150)
         
-        history_scroll = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=history_scroll.set)
+        history_scroll = ttk.Scrollbar(history_frame, orient=tk.VERTICAL)
         
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=5)
         history_scroll.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
         
+        # Only the visible rows are materialized; scrolling re-queries the store
+        self.history_view = VirtualHistoryView(self.history_tree, history_scroll, self.analysis_history, {
+            'Timestamp': 'timestamp',
+            'Experience': 'experience_level',
+            'Industry': 'industry',
+            'Top_Trait': 'dominant_trait',
+        })
+        self.history_tree.bind('<Double-1>', self.open_history_entry)
+        
+        # Analytics Tab, drawn from the incrementally maintained cohort aggregates
+        self.analytics_frame = ttk.Frame(notebook)
+        notebook.add(self.analytics_frame, text="Analytics")
+        
+        analytics_controls = ttk.Frame(self.analytics_frame)
+        analytics_controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(analytics_controls, text="Cohort:").pack(side=tk.LEFT)
+        self.cohort_filter = tk.StringVar(value=ALL_CHOICE)
+        self.cohort_choice = ttk.Combobox(analytics_controls, textvariable=self.cohort_filter,
+                                          values=(ALL_CHOICE,), state='readonly', width=14)
+        self.cohort_choice.pack(side=tk.LEFT, padx=5)
+        self.cohort_choice.bind('<<ComboboxSelected>>', lambda event: self.refresh_analytics())
+        
+        self.analytics_text = scrolledtext.ScrolledText(self.analytics_frame, height=30, width=100)
+        self.analytics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        notebook.bind('<<NotebookTabChanged>>', lambda event: self.refresh_analytics())
+        
         # Status bar
         self.status_label = ttk.Label(self.root, text="Ready for analysis", relief=tk.SUNKEN)
         self.status_label.pack(fill=tk.X, side=tk.BOTTOM)
@@ -372,6 +270,9 @@ class PersonalityAnalyzerGUI:
         
         if filename:
             try:
+                if os.path.getsize(filename) > STREAMING_THRESHOLD:
+                    self.stream_file(filename)
+                    return
                 with open(filename, 'r', encoding='utf-8') as file:
                     content = file.read()
                     self.text_input.delete(1.0, tk.END)
@@ -380,11 +281,82 @@ class PersonalityAnalyzerGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to read file: {str(e)}")
     
+    def stream_file(self, filename):
+        """Show a preview of a very large file and analyze it in streaming mode"""
+        with open(filename, 'r', encoding='utf-8') as file:
+            preview = file.read(PREVIEW_CHARS)
+        
+        self.text_input.delete(1.0, tk.END)
+        self.text_input.insert(1.0, preview)
+        self.text_input.insert(tk.END, f"\n\n[Preview only - {os.path.basename(filename)} "
+                                       f"is analyzed in streaming mode]")
+        
+        self.worker.submit_file(filename)
+        self.status_label.config(text=f"Streaming large file: {os.path.basename(filename)}")
+    
     def clear_text(self):
         """Clear the text input area"""
         self.text_input.delete(1.0, tk.END)
         self.status_label.config(text="Text cleared")
     
+    def toggle_live_analysis(self):
+        """Start or stop updating the results while the text is edited"""
+        if self.live_var.get():
+            self.live_analysis = LiveAnalysis(self.analyzer)
+            self.update_live_analysis()
+        else:
+            if self.live_after_id is not None:
+                self.root.after_cancel(self.live_after_id)
+                self.live_after_id = None
+            self.live_analysis = None
+            self.status_label.config(text="Live analysis off")
+    
+    def on_text_modified(self, event):
+        """Debounce edits of the input text into one live analysis update"""
+        if not self.text_input.edit_modified():
+            return
+        # Tk only reports the next edit once the modified flag is reset
+        self.text_input.edit_modified(False)
+        if self.live_analysis is None:
+            return
+        if self.live_after_id is not None:
+            self.root.after_cancel(self.live_after_id)
+        self.live_after_id = self.root.after(LIVE_ANALYSIS_DELAY, self.update_live_analysis)
+    
+    def update_live_analysis(self):
+        """Rescan the edited lines and refresh the report sections that changed"""
+        self.live_after_id = None
+        start = time.perf_counter()
+        result = self.live_analysis.update(self.text_input.get(1.0, 'end-1c'))
+        features = result['features']
+        if not features['total_words']:
+            self.status_label.config(text="Live analysis: waiting for text")
+            return
+        
+        report = self.analyzer.generate_personality_report(
+            result['personality_scores'], result['experience_level'], result['industry'], features)
+        self.render_report_lines(report)
+        elapsed = time.perf_counter() - start
+        self.status_label.config(
+            text=f"Live analysis: {features['total_words']} words, {result['dominant_trait']} - "
+                 f"rescanned {self.live_analysis.rescanned} line(s) in {elapsed * 1000:.1f} ms")
+    
+    def render_report_lines(self, report):
+        """Replace only the lines of the displayed report that differ from report"""
+        old = self.results_text.get(1.0, 'end-1c').split('\n')
+        new = report.split('\n')
+        start, old_stop, new_stop = changed_range(old, new)
+        if old_stop < len(old):
+            self.results_text.delete(f"{start + 1}.0", f"{old_stop + 1}.0")
+            self.results_text.insert(f"{start + 1}.0", "".join(line + "\n" for line in new[start:new_stop]))
+        elif start:
+            # The change reaches the last line, which has no newline of its own
+            self.results_text.delete(f"{start}.end", 'end-1c')
+            self.results_text.insert('end-1c', "".join("\n" + line for line in new[start:new_stop]))
+        else:
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(1.0, report)
+    
     def analyze_resume(self):
         """Analyze the resume text for personality traits"""
         text = self.text_input.get(1.0, tk.END).strip()
@@ -396,69 +368,248 @@ class PersonalityAnalyzerGUI:
         if len(text) < 100:
             messagebox.showwarning("Warning", "Resume text seems too short for accurate analysis")
         
-        try:
-            # Perform analysis
-            self.status_label.config(text="Analyzing resume...")
-            
-            # Extract features
-            features = self.analyzer.extract_text_features(text)
-            
-            # Calculate personality scores
-            personality_scores = self.analyzer.calculate_personality_scores(text, features)
-            
-            # Determine additional attributes
-            experience_level = self.analyzer.determine_experience_level(text)
-            industry = self.analyzer.identify_industry(text)
-            
-            # Generate report
-            report = self.analyzer.generate_personality_report(
-                personality_scores, experience_level, industry, features
-            )
-            
-            # Display results
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(1.0, report)
-            
-            # Add to history
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            dominant_trait = max(personality_scores, key=personality_scores.get)
-            
-            history_entry = {
-                'timestamp': timestamp,
-                'experience_level': experience_level,
-                'industry': industry,
-                'dominant_trait': f"{dominant_trait} ({personality_scores[dominant_trait]:.1f})",
-                'personality_scores': personality_scores,
-                'full_report': report
-            }
-            
-            self.analysis_history.append(history_entry)
-            self.update_history_display()
-            
-            self.status_label.config(text="Analysis completed successfully")
+        # Analysis runs on the worker thread; results arrive through poll_worker
+        self.worker.submit_text(text)
+        self.status_label.config(text="Analyzing resume...")
+    
+    def queue_files(self):
+        """Queue one or more resume files for background analysis"""
+        filenames = filedialog.askopenfilenames(
+            title="Select Resume Files",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        
+        for filename in filenames:
+            self.worker.submit_file(filename)
+        if filenames:
+            self.status_label.config(text=f"Queued {len(filenames)} file(s) for analysis")
+    
+    def cancel_analysis(self):
+        """Cancel the running analysis and everything still queued"""
+        if self.worker.pending_count():
+            self.worker.cancel_all()
+            self.status_label.config(text="Cancelling analysis...")
+    
+    def poll_worker(self):
+        """Apply events reported by the analysis worker on the Tk main loop"""
+        for kind, job, payload in self.worker.poll_events():
+            queued = self.worker.queued_count()
+            suffix = f" ({queued} in queue)" if queued else ""
             
-            # Switch to results tab
+            if kind == 'started':
+                self.progress_bar['value'] = 0
+                self.status_label.config(text=f"Analyzing {job.label}...{suffix}")
+            elif kind == 'progress':
+                stage, step, total = payload
+                self.progress_bar['value'] = 100 * step / total
+                self.status_label.config(text=f"{job.label}: {stage}...{suffix}")
+            elif kind == 'done':
+                self.progress_bar['value'] = 100
+                entry_id = self.show_result(payload)
+                if self.duplicate_index is not None and job.signature is not None:
+                    self.duplicate_index.add(entry_id, job.signature)
+                duplicate = ""
+                if job.duplicate_of:
+                    duplicate = (f", near-duplicate of analysis #{job.duplicate_of[0]}"
+                                 f" ({job.duplicate_of[1]:.0%} similar)")
+                self.status_label.config(
+                    text=f"Analysis of {job.label} completed successfully{duplicate}{suffix}"
+                         f" - {self.timing_summary()}")
+            elif kind == 'duplicate':
+                self.progress_bar['value'] = 100
+                self.show_duplicate(job, payload, suffix)
+            elif kind == 'failed':
+                self.progress_bar['value'] = 0
+                messagebox.showerror("Error", f"Analysis of {job.label} failed: {payload}")
+                self.status_label.config(text="Analysis failed")
+            elif kind == 'cancelled':
+                self.progress_bar['value'] = 0
+                self.status_label.config(text=f"Analysis of {job.label} cancelled{suffix}")
+        
+        self.root.after(WORKER_POLL_INTERVAL, self.poll_worker)
+    
+    def toggle_skip_duplicates(self):
+        """Skip analyzing resumes that nearly match one already in the history"""
+        self.worker.skip_near_duplicates = self.skip_duplicates_var.get()
+    
+    def show_duplicate(self, job, match, suffix):
+        """Display the earlier analysis of a skipped near-duplicate resume"""
+        entry_id, similarity = match
+        entry = self.analysis_history.get(entry_id)
+        if entry is None:
+            # The earlier entry is gone from the history, so analyze after all
+            self.duplicate_index.remove(entry_id)
+            if job.path:
+                self.worker.submit_file(job.path, job.encoding)
+            else:
+                self.worker.submit_text(job.text)
+            return
+        
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, self.analysis_history.render_report(entry))
+        self.status_label.config(
+            text=f"{job.label} is a near-duplicate of analysis #{entry_id} from {entry.timestamp}"
+                 f" ({similarity:.0%} similar), not analyzed again{suffix}")
+        if not self.worker.pending_count():
             notebook = self.root.children['!notebook']
             notebook.select(1)  # Select results tab
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Analysis failed: {str(e)}")
-            self.status_label.config(text="Analysis failed")
+    
+    def poll_lexicon(self):
+        """Swap in a new analyzer when the lexicon file has been edited"""
+        try:
+            bundle = self.lexicon_watcher.check()
+            if bundle is not None:
+                analyzer = PersonalityAnalyzer(bundle=bundle)
+                analyzer.instrumentation = self.instrumentation
+                # Queued and later jobs pick up the new analyzer through the cache
+                self.analyzer = analyzer
+                self.result_cache.set_analyzer(analyzer)
+                self.analysis_history.analyzer = analyzer
+                if self.live_analysis is not None:
+                    self.live_analysis = LiveAnalysis(analyzer)
+                    self.update_live_analysis()
+                self.status_label.config(text=f"Lexicon reloaded (version {analyzer.lexicon_version})")
+            elif self.lexicon_watcher.error and self.lexicon_watcher.error != self.lexicon_error:
+                self.status_label.config(text=f"Lexicon not reloaded: {self.lexicon_watcher.error}")
+            self.lexicon_error = self.lexicon_watcher.error
+        finally:
+            # Keep watching even if this reload failed unexpectedly
+            self.root.after(LEXICON_POLL_INTERVAL, self.poll_lexicon)
+    
+    def timing_summary(self):
+        """Stage timing of the last analysis for the status bar"""
+        runs = self.instrumentation.runs
+        if runs == self.timed_runs:
+            return "cached result"
+        self.timed_runs = runs
+        return format_breakdown(self.instrumentation.last_run())
+    
+    def show_result(self, result):
+        """Display a finished analysis and add it to the history, returning its entry id"""
+        personality_scores = result['personality_scores']
+        report = result['report']
+        
+        # Display results, ranked against everyone analyzed before
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, report + self.percentile_section(personality_scores, result['industry']))
+        
+        # Add to history
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        dominant_trait = result['dominant_trait']
+        
+        history_entry = {
+            'timestamp': timestamp,
+            'experience_level': result['experience_level'],
+            'industry': result['industry'],
+            'dominant_trait': f"{dominant_trait} ({personality_scores[dominant_trait]:.1f})",
+            'personality_scores': personality_scores,
+            'features': result['features'],
+            'lexicon_version': result['lexicon_version']
+        }
+        
+        entry_id = self.analysis_history.append(history_entry)
+        self.history_view.entry_added(entry_id)
+        if self.similarity_index is not None:
+            self.similarity_index.add(entry_id, personality_scores, result['features'])
+        self.cohort_analytics.add(entry_id, timestamp, result['experience_level'], result['industry'],
+                                  personality_scores)
+        self.refresh_analytics()
+        
+        # Switch to results tab once the queue has drained
+        if not self.worker.pending_count():
+            notebook = self.root.children['!notebook']
+            notebook.select(1)  # Select results tab
+        return entry_id
+    
+    def percentile_section(self, personality_scores, industry):
+        """Report section ranking scores against the cohorts, empty before the first analysis"""
+        analytics = self.cohort_analytics
+        total = len(analytics)
+        if not total:
+            return ""
+        industry_total = analytics.industries().get(industry, 0)
+        overall = analytics.percentile_ranks(personality_scores)
+        within = analytics.percentile_ranks(personality_scores, industry) if industry_total else {}
+        
+        lines = ["", "", "=== PERCENTILE RANKS ===", "",
+                 f"Among {total:,} previous analyses ({industry_total:,} in {industry}):"]
+        for trait, rank in overall.items():
+            line = f"• {trait}: {ordinal(min(99, int(rank)))} percentile overall"
+            if within.get(trait) is not None:
+                line += f", {ordinal(min(99, int(within[trait])))} in {industry}"
+            lines.append(line)
+        return "\n".join(lines)
+    
+    def refresh_analytics(self):
+        """Redraw the analytics tab from the cohort aggregates when it is showing"""
+        notebook = self.root.children['!notebook']
+        if notebook.select() != str(self.analytics_frame):
+            return
+        analytics = self.cohort_analytics
+        industries = analytics.industries()
+        self.cohort_choice['values'] = (ALL_CHOICE,) + tuple(industries)
+        cohort = self.cohort_filter.get()
+        if cohort != ALL_CHOICE and cohort not in industries:
+            cohort = ALL_CHOICE
+            self.cohort_filter.set(cohort)
+        industry = None if cohort == ALL_CHOICE else cohort
+        
+        lines = ["=== COHORT ANALYTICS ===", "", f"Analyses: {len(analytics):,}"]
+        if industries:
+            lines.append("By industry: " + " | ".join(f"{name} {count:,}" for name, count in industries.items()))
+        
+        summary = analytics.trait_summary(industry)
+        count = next(iter(summary.values()))['count']
+        lines += ["", f"TRAIT SCORES ({cohort}, {count:,} analyses):", "",
+                  f"{'Trait':<22}{'Mean':>8}{'P25':>8}{'Median':>8}{'P75':>8}"]
+        for trait, stats in summary.items():
+            if not stats['count']:
+                lines.append(f"{trait:<22}{'-':>8}{'-':>8}{'-':>8}{'-':>8}")
+                continue
+            lines.append(f"{trait:<22}{stats['mean']:>8.1f}{stats['p25']:>8.1f}"
+                         f"{stats['p50']:>8.1f}{stats['p75']:>8.1f}")
+        
+        lines += ["", "TRAIT DISTRIBUTIONS (scores 0 to 100 in steps of 10):", ""]
+        for trait in summary:
+            buckets = analytics.trait_histogram(trait, industry).buckets()
+            peak = max(buckets) or 1
+            spark = "".join(SPARK_CHARS[round(value / peak * (len(SPARK_CHARS) - 1))] for value in buckets)
+            lines.append(f"{trait:<22}|{spark}|")
+        
+        lines += ["", f"EXPERIENCE MIX BY MONTH (last {ANALYTICS_MONTHS}):", "",
+                  f"{'Month':<10}" + "".join(f"{level:>14}" for level in EXPERIENCE_LEVELS) + f"{'Total':>10}"]
+        for month, levels in analytics.experience_mix(ANALYTICS_MONTHS).items():
+            month_total = sum(levels.values())
+            cells = "".join(f"{levels.get(level, 0) / month_total:>14.0%}" for level in EXPERIENCE_LEVELS)
+            lines.append(f"{month:<10}{cells}{month_total:>10,}")
+        
+        self.analytics_text.delete(1.0, tk.END)
+        self.analytics_text.insert(1.0, "\n".join(lines))
     
     def update_history_display(self):
         """Update the history tree display"""
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        # Add history entries
-        for entry in reversed(self.analysis_history):  # Show newest first
-            self.history_tree.insert('', 'end', values=(
-                entry['timestamp'],
-                entry['experience_level'],
-                entry['industry'],
-                entry['dominant_trait']
-            ))
+        self.history_view.refresh(recount=True)
+    
+    def apply_history_filter(self):
+        """Filter the history view by the selected experience, industry and score"""
+        trait = self.trait_filter.get()
+        min_score = self.min_score_filter.get().strip()
+        min_scores = None
+        
+        if trait != ALL_CHOICE and min_score:
+            try:
+                min_scores = {trait: float(min_score)}
+            except ValueError:
+                messagebox.showerror("Error", "Minimum score must be a number")
+                return
+        
+        self.history_view.set_filters(
+            experience_level=self.experience_filter.get() if self.experience_filter.get() != ALL_CHOICE else None,
+            industry=self.industry_filter.get() if self.industry_filter.get() != ALL_CHOICE else None,
+            dominant_trait=trait if trait != ALL_CHOICE and not min_score else None,
+            min_scores=min_scores
+        )
+        self.status_label.config(text=f"{self.history_view.total} matching analyses")
     
     def export_history(self):
         """Export analysis history to file"""
@@ -468,26 +619,179 @@ class PersonalityAnalyzerGUI:
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=HISTORY_FILE_TYPES,
             title="Save Analysis History"
         )
+        if not filename:
+            return
+        try:
+            fmt = history_io.format_for_path(filename)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.analysis_history, f, indent=2, ensure_ascii=False)
-                messagebox.showinfo("Success", f"History exported to {filename}")
+        def finished(rows):
+            if rows is not None:
+                messagebox.showinfo("Success", f"Exported {rows:,} analyses to {filename}")
                 self.status_label.config(text=f"History exported to {os.path.basename(filename)}")
+        
+        # JSON exports keep the regenerated reports, as they always have
+        self.start_history_task("Exporting history", finished, history_io.export_history,
+                                self.analysis_history, filename, fmt, include_reports=(fmt == 'json'))
+    
+    def import_history(self):
+        """Append the analyses of an exported history file to the history"""
+        filename = filedialog.askopenfilename(
+            filetypes=HISTORY_FILE_TYPES,
+            title="Import Analysis History"
+        )
+        if not filename:
+            return
+        try:
+            fmt = history_io.format_for_path(filename)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        def finished(rows):
+            # Batches stored before a failure stay in the history, so refresh either way
+            self.update_history_display()
+            if self.similarity_index is not None:
+                self.status_label.config(text="Indexing imported analyses...")
+                self.root.update_idletasks()
+                self.similarity_index.sync(self.analysis_history)
+            self.cohort_analytics.sync(self.analysis_history)
+            self.refresh_analytics()
+            if rows is not None:
+                self.status_label.config(text=f"Imported {rows:,} analyses from {os.path.basename(filename)}")
+        
+        self.start_history_task(f"Importing {os.path.basename(filename)}", finished,
+                                history_io.import_history, self.analysis_history, filename, fmt)
+    
+    def start_history_task(self, description, finished, function, *args, **kwargs):
+        """Run a history export or import on a background thread with progress in the status bar
+        
+        function is called with a progress keyword argument; finished is
+        called on the Tk main loop with its result, or None if it failed.
+        """
+        if self.history_task is not None:
+            messagebox.showwarning("Warning", "A history import or export is already running")
+            return
+        events = queue.Queue()
+        
+        def progress(rows, fraction):
+            events.put(('progress', (rows, fraction)))
+        
+        def run():
+            try:
+                events.put(('done', function(*args, progress=progress, **kwargs)))
             except Exception as e:
-                messagebox.showerror("Error", f"Export failed: {str(e)}")
+                events.put(('failed', e))
+        
+        self.history_task = (description, events, finished)
+        threading.Thread(target=run, daemon=True).start()
+        self.status_label.config(text=f"{description}...")
+        self.root.after(WORKER_POLL_INTERVAL, self.poll_history_task)
+    
+    def poll_history_task(self):
+        """Apply progress reported by the running history task on the Tk main loop"""
+        description, events, finished = self.history_task
+        while True:
+            try:
+                kind, payload = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                rows, fraction = payload
+                percent = f" {fraction:.0%}" if fraction is not None else ""
+                self.status_label.config(text=f"{description}...{percent} ({rows:,} analyses)")
+                continue
+            
+            self.history_task = None
+            if kind == 'failed':
+                messagebox.showerror("Error", f"{description} failed: {payload}")
+                self.status_label.config(text=f"{description} failed")
+                finished(None)
+            else:
+                finished(payload)
+            return
+        
+        self.root.after(WORKER_POLL_INTERVAL, self.poll_history_task)
+    
+    def open_history_entry(self, event):
+        """Show the report of a double-clicked history row, rendered from its scores"""
+        entry_id = self.history_tree.identify_row(event.y)
+        entry = self.analysis_history.get(int(entry_id)) if entry_id else None
+        if entry is None:
+            return
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, self.analysis_history.render_report(entry))
+        notebook = self.root.children['!notebook']
+        notebook.select(1)  # Select results tab
+        self.status_label.config(text=f"Showing analysis #{entry.id} from {entry.timestamp}")
+    
+    def find_similar(self):
+        """List the past analyses most similar to the selected one"""
+        selected = self.history_view.selected_ids()
+        if not selected:
+            messagebox.showwarning("Warning", "Select an analysis in the history first")
+            return
+        entry = self.analysis_history.get(selected[0])
+        if entry is None:
+            return
+        
+        start = time.perf_counter()
+        matches = self.similarity_index.query(entry.personality_scores, entry.features,
+                                              SIMILAR_RESULTS, exclude=(entry.id,))
+        elapsed = time.perf_counter() - start
+        
+        lines = [f"Analyses most similar to #{entry.id} ({entry.timestamp}, {entry.experience_level}, "
+                 f"{entry.industry}, {entry.dominant_label})", ""]
+        for entry_id, distance in matches:
+            match = self.analysis_history.get(entry_id)
+            if match is not None:
+                lines.append(f"#{entry_id:<8} distance {distance:.3f}   {match.timestamp}   "
+                             f"{match.experience_level}   {match.industry}   {match.dominant_label}")
+        if not matches:
+            lines.append("No other analyses in the history")
+        
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(1.0, "\n".join(lines))
+        notebook = self.root.children['!notebook']
+        notebook.select(1)  # Select results tab
+        self.status_label.config(text=f"Searched {len(self.similarity_index)} analyses in {elapsed * 1000:.1f} ms")
     
     def clear_history(self):
         """Clear analysis history"""
         if messagebox.askyesno("Confirmation", "Are you sure you want to clear all analysis history?"):
-            self.analysis_history = []
+            self.analysis_history.clear()
+            if self.duplicate_index is not None:
+                self.duplicate_index.clear()
+            if self.similarity_index is not None:
+                self.similarity_index.clear()
+            self.cohort_analytics.clear()
             self.update_history_display()
             self.status_label.config(text="History cleared")
     
+    def on_close(self):
+        """Stop the analysis worker and close the window"""
+        self.worker.stop()
+        self.analysis_history.close()
+        if self.duplicate_index is not None:
+            self.duplicate_index.close()
+        if self.similarity_index is not None and self.similarity_index.dirty:
+            try:
+                self.similarity_index.save(SIMILARITY_INDEX_PATH)
+            except OSError:
+                # The next start rebuilds the missing vectors from the history
+                pass
+        if self.cohort_analytics.dirty:
+            try:
+                self.cohort_analytics.save(COHORTS_PATH)
+            except OSError:
+                pass
+        self.root.destroy()
+    
     def run(self):
         """Run the application"""
         self.root.mainloop()
@@ -0,0 +1,190 @@
+import itertools
+import os
+import queue
+import threading
+
+from personality_analyzer import ANALYSIS_STAGES
+from result_cache import normalize_text
+from streaming_analyzer import READ_STAGE
+
+# Stages reported for a job, including reading the file for file jobs
+JOB_STAGES = (READ_STAGE,) + ANALYSIS_STAGES
+
+# Larger files are streamed and not checked for near-duplicates
+NEAR_DUPLICATE_MAX_BYTES = 2 * 1024 * 1024
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+
+class AnalysisJob:
+    """A single queued analysis of pasted text or of a file"""
+
+    def __init__(self, job_id, text=None, path=None, encoding='utf-8'):
+        self.job_id = job_id
+        self.text = text
+        self.path = path
+        self.encoding = encoding
+        self.stage = None
+        # MinHash signature and (entry id, similarity) of the closest earlier
+        # resume, when near-duplicate detection is enabled
+        self.signature = None
+        self.duplicate_of = None
+        self._cancelled = threading.Event()
+
+    @property
+    def label(self):
+        return os.path.basename(self.path) if self.path else "pasted text"
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+class AnalysisWorker:
+    """Run analyses on a background thread.
+
+    Jobs are processed one at a time in submission order.  The worker never
+    touches the GUI: it reports (kind, job, payload) events on a queue that the
+    Tk main loop drains with poll_events() from a root.after callback.
+
+    Event kinds are 'started', 'progress' (payload is (stage, step, total)),
+    'done' (payload is the cached analysis result), 'failed' (payload is the
+    error message) and 'cancelled'.  Cancellation takes effect at the next
+    stage boundary of the running job.
+
+    With a near_duplicates.NearDuplicateIndex, every job is first looked up
+    in the index and job.duplicate_of is set when an earlier resume is
+    similar enough.  If skip_near_duplicates is set, such jobs are not
+    analyzed and report a 'duplicate' event whose payload is (entry id,
+    similarity) instead of 'done'.
+    """
+
+    def __init__(self, result_cache, duplicate_index=None):
+        self.result_cache = result_cache
+        self.duplicate_index = duplicate_index
+        self.skip_near_duplicates = False
+        self.events = queue.Queue()
+        self._jobs = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queued = []
+        self._current = None
+        self._thread = threading.Thread(target=self._run, name="analysis-worker", daemon=True)
+        self._thread.start()
+
+    def submit_text(self, text):
+        """Queue pasted text for analysis and return the job"""
+        return self._submit(AnalysisJob(next(self._ids), text=text))
+
+    def submit_file(self, path, encoding='utf-8'):
+        """Queue a resume file for analysis and return the job"""
+        return self._submit(AnalysisJob(next(self._ids), path=path, encoding=encoding))
+
+    def _submit(self, job):
+        with self._lock:
+            self._queued.append(job)
+        self._jobs.put(job)
+        return job
+
+    def pending_count(self):
+        """Number of jobs queued or running"""
+        with self._lock:
+            return len(self._queued) + (1 if self._current else 0)
+
+    def queued_count(self):
+        """Number of jobs waiting behind the running one"""
+        with self._lock:
+            return len(self._queued)
+
+    def cancel_all(self):
+        """Cancel the running job and everything still queued"""
+        with self._lock:
+            jobs = self._queued + ([self._current] if self._current else [])
+        for job in jobs:
+            job.cancel()
+
+    def poll_events(self):
+        """Yield every event reported since the last poll without blocking"""
+        while True:
+            try:
+                yield self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def stop(self):
+        """Cancel outstanding work and let the worker thread exit"""
+        self.cancel_all()
+        self._jobs.put(None)
+
+    def _emit(self, kind, job, payload=None):
+        self.events.put((kind, job, payload))
+
+    def _progress(self, job, stage):
+        if job.cancelled:
+            raise AnalysisCancelled()
+        if stage != job.stage:
+            # Streaming reports each stage once per chunk; only forward changes
+            job.stage = stage
+            self._emit('progress', job, (stage, JOB_STAGES.index(stage) + 1, len(JOB_STAGES)))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                self._queued.remove(job)
+                self._current = job
+            try:
+                self._process(job)
+            finally:
+                with self._lock:
+                    self._current = None
+
+    def _process(self, job):
+        if job.cancelled:
+            self._emit('cancelled', job)
+            return
+
+        self._emit('started', job)
+        try:
+            progress = lambda stage: self._progress(job, stage)
+            if self.duplicate_index is not None:
+                self._check_near_duplicate(job)
+                if job.duplicate_of and self.skip_near_duplicates:
+                    self._emit('duplicate', job, job.duplicate_of)
+                    return
+            if job.path:
+                # Files are streamed so that huge inputs never sit in memory whole
+                result = self.result_cache.analyze_file(job.path, job.encoding, progress=progress)
+            else:
+                result = self.result_cache.analyze(job.text, progress)
+        except AnalysisCancelled:
+            self._emit('cancelled', job)
+        except Exception as e:
+            self._emit('failed', job, str(e))
+        else:
+            if job.cancelled:
+                self._emit('cancelled', job)
+            else:
+                self._emit('done', job, result)
+
+    def _check_near_duplicate(self, job):
+        """Compute the job's MinHash signature and look for an earlier near-duplicate"""
+        if job.path:
+            if os.path.getsize(job.path) > NEAR_DUPLICATE_MAX_BYTES:
+                return
+            with open(job.path, 'r', encoding=job.encoding) as file:
+                text = file.read()
+        else:
+            text = job.text
+        # The cache analyzes the normalized text, so this scan is reused
+        words = self.result_cache.analyzer.tokenize(normalize_text(text))
+        job.signature = self.duplicate_index.signature(words)
+        if job.signature is not None:
+            job.duplicate_of = self.duplicate_index.find(job.signature)
@@ -0,0 +1,239 @@
+"""Headless batch analysis of resume files.
+
+Examples:
+    python batch_analyze.py resumes/ --workers 8 > results.jsonl
+    python batch_analyze.py "incoming/*.txt" --output results.jsonl
+    python batch_analyze.py --manifest paths.txt --chunk-size 200
+    python batch_analyze.py resumes/ --vectorized --chunk-size 2000
+
+Results are streamed as one JSON object per line, in input order.
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from personality_analyzer import PersonalityAnalyzer
+from result_cache import ResultCache
+
+# Result cache owned by the current worker process, built once by the initializer
+_worker_cache = None
+
+# Vectorized batch scorer of the current worker process, only with --vectorized
+_worker_scorer = None
+
+
+def make_cache(word_boundary=False, cache_path=None, lexicon_path=None):
+    """Build an analyzer wrapped in a result cache"""
+    analyzer = PersonalityAnalyzer(word_boundary=word_boundary, lexicon_path=lexicon_path)
+    return ResultCache(analyzer, path=cache_path)
+
+
+def make_scorer(cache):
+    """Build a vectorized scorer for the cache's analyzer (requires NumPy)"""
+    from batch_scoring import BatchScorer
+    return BatchScorer(cache.analyzer)
+
+
+def _init_worker(word_boundary, cache_path, vectorized=False, lexicon_path=None):
+    """Build the per-process analyzer so the keyword automaton is loaded once"""
+    global _worker_cache, _worker_scorer
+    _worker_cache = make_cache(word_boundary, cache_path, lexicon_path)
+    _worker_scorer = make_scorer(_worker_cache) if vectorized else None
+
+
+def analyze_file(cache, path, encoding='utf-8', include_report=False):
+    """Analyze a single resume file and return a JSON-serializable record"""
+    record = {'path': path}
+    try:
+        result = cache.analyze_file(path, encoding, errors='replace')
+    except Exception as e:
+        record['error'] = str(e)
+        return record
+
+    if not include_report:
+        del result['report']
+    record.update(result)
+    return record
+
+
+def analyze_files_vectorized(cache, scorer, paths, encoding='utf-8', include_report=False):
+    """Analyze a chunk of files at once with the vectorized scorer.
+
+    Unlike analyze_file the files are read whole, so chunks of very large
+    files need correspondingly more memory.
+    """
+    records = [{'path': path} for path in paths]
+    texts = []
+    readable = []
+    for record in records:
+        try:
+            with open(record['path'], 'r', encoding=encoding, errors='replace') as file:
+                texts.append(file.read())
+        except Exception as e:
+            record['error'] = str(e)
+        else:
+            readable.append(record)
+
+    for record, result in zip(readable, cache.analyze_many(texts, scorer)):
+        if not include_report:
+            del result['report']
+        record.update(result)
+    return records
+
+
+def analyze_chunk(paths, encoding='utf-8', include_report=False):
+    """Analyze a chunk of files inside a worker process"""
+    if _worker_scorer is not None:
+        records = analyze_files_vectorized(_worker_cache, _worker_scorer, paths, encoding, include_report)
+    else:
+        records = [analyze_file(_worker_cache, path, encoding, include_report) for path in paths]
+    # Worker caches are never closed, so each chunk's results are committed here
+    _worker_cache.flush()
+    return records
+
+
+def iter_input_paths(inputs, pattern='*.txt', manifest=None, on_missing=None):
+    """Yield resume paths from directories, glob patterns, files and a manifest.
+
+    on_missing is called with every input that is neither a file nor a
+    directory and matches no file as a glob pattern.
+    """
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, dirnames, filenames in os.walk(item):
+                dirnames.sort()
+                for filename in sorted(fnmatch.filter(filenames, pattern)):
+                    yield os.path.join(dirpath, filename)
+        elif os.path.isfile(item):
+            yield item
+        else:
+            matches = sorted(glob.iglob(item, recursive=True))
+            if not matches and on_missing:
+                on_missing(item)
+            yield from matches
+
+    if manifest:
+        with open(manifest, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+
+
+def iter_chunks(iterable, size):
+    """Group an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(paths, workers=None, chunk_size=64, encoding='utf-8',
+              include_report=False, word_boundary=False, cache_path=None, vectorized=False,
+              lexicon_path=None):
+    """Analyze paths and yield result records in input order.
+
+    Work is sent to the pool in chunks so that the inter-process overhead is
+    paid once per chunk, and only a bounded number of chunks is in flight so
+    that arbitrarily long inputs stream through in constant memory.  With
+    vectorized, each chunk is scored as one NumPy batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_chunks(paths, chunk_size)
+
+    if workers == 1:
+        cache = make_cache(word_boundary, cache_path, lexicon_path)
+        scorer = make_scorer(cache) if vectorized else None
+        try:
+            for chunk in chunks:
+                if scorer is not None:
+                    yield from analyze_files_vectorized(cache, scorer, chunk, encoding, include_report)
+                    continue
+                for path in chunk:
+                    yield analyze_file(cache, path, encoding, include_report)
+        finally:
+            cache.close()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(word_boundary, cache_path, vectorized, lexicon_path)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(analyze_chunk, chunk, encoding, include_report))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyze resume files without the GUI and stream JSONL results")
+    parser.add_argument('inputs', nargs='*',
+                        help="resume files, directories or glob patterns")
+    parser.add_argument('--manifest', help="file listing one resume path per line")
+    parser.add_argument('--pattern', default='*.txt',
+                        help="filename pattern used inside directories (default: *.txt)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=64,
+                        help="resumes sent to a worker per task (default: 64)")
+    parser.add_argument('--output', '-o', help="write JSONL here instead of stdout")
+    parser.add_argument('--encoding', default='utf-8', help="encoding of resume files")
+    parser.add_argument('--report', action='store_true',
+                        help="include the full text report in each record")
+    parser.add_argument('--word-boundary', action='store_true',
+                        help="only count keywords that appear as whole words")
+    parser.add_argument('--lexicon', metavar='PATH',
+                        help="lexicon JSON file to use instead of the default lexicon")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="SQLite file used to reuse results across runs")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="score each chunk as one NumPy batch; use large chunks (requires NumPy)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.manifest:
+        parser.error("give at least one input path or --manifest")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    return args
+
+
+def _report_missing(item):
+    print(f"No such file or no matching files: {item}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = iter_input_paths(args.inputs, args.pattern, args.manifest, _report_missing)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    analyzed = failed = 0
+    try:
+        for record in run_batch(paths, args.workers, args.chunk_size, args.encoding,
+                                args.report, args.word_boundary, args.cache, args.vectorized,
+                                args.lexicon):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            analyzed += 1
+            if 'error' in record:
+                failed += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Analyzed {analyzed} resumes ({failed} failed)", file=sys.stderr)
+    return 1 if failed or not analyzed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
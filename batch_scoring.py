@@ -0,0 +1,567 @@
+"""Vectorized scoring of many resumes at once with NumPy.
+
+BatchScorer produces exactly the same results as PersonalityAnalyzer.analyze
+but replaces the per-document keyword scan and scoring rules with matrix
+operations over a sparse documents x keywords count matrix.
+
+Documents are split into tokens at ASCII non-word characters, which stay
+non-word characters after lowercasing, so every word and every keyword made
+only of word characters lies inside a single token.  The word features and
+keyword counts of each distinct token are computed once for the whole corpus
+and summed per document with NumPy.  The few keywords containing spaces or
+punctuation are counted per document, and only in documents holding tokens
+that can begin and end them.
+"""
+import re
+
+import numpy as np
+
+_WORD = re.compile(r'\b\w+\b')
+_WORD_TERM = re.compile(r'\w+')
+_CAPITAL_WORD = re.compile(r'\b[A-Z]{2,}\b')
+_NUMBER = re.compile(r'\b\d+\b')
+
+# Every ASCII byte outside [A-Za-z0-9_] becomes a space so that bytes.split()
+# on the UTF-8 encoded text yields the tokens; bytes >= 0x80 belong to
+# non-ASCII characters and are kept inside their token
+_WORD_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_'
+_TOKEN_TABLE = bytes(byte if byte in _WORD_BYTES or byte >= 0x80 else 32 for byte in range(256))
+
+# Token placed between the texts of a batch: a lone UTF-8 continuation byte,
+# which no token of a text can be
+_SEPARATOR = b'\x80'
+
+# Maps every sentence terminator to '.' and every other byte to a space, so
+# bytes.split() yields one piece per maximal run of [.!?]
+_SENTENCE_TABLE = bytes(46 if byte in b'.!?' else 32 for byte in range(256))
+
+# ASCII non-word characters, at which a multi-word keyword crosses tokens
+_TOKEN_BREAK = re.compile(r'[\x00-\x2f\x3a-\x40\x5b-\x5e\x60\x7b-\x7f]')
+
+# Capital sigma lowercases differently at the end of a word, the only
+# context-sensitive case mapping; texts containing it are featurized alone
+_CONTEXT_SENSITIVE = 'Σ'
+
+# Distinct tokens (and lowercased words) remembered across batches; a scorer
+# that has seen more forgets them all before its next batch, which bounds the
+# memory of long-running workers fed an endless stream of new tokens
+MAX_VOCABULARY_TOKENS = 500000
+
+# Larger batches are featurized in slices of this many documents, which keeps
+# the per-token arrays small enough to stay in the CPU caches
+CHUNK_DOCUMENTS = 1000
+
+# Bits of a token's phrase mask marking the multi-word keywords it can begin,
+# and as many marking those it can end; keywords beyond this many share bits,
+# which only lets more documents through to the exact per-document count
+PHRASE_BITS = 31
+
+EXPERIENCE_NAMES = ("Senior Level", "Mid Level", "Entry Level")
+
+
+class BatchScorer:
+    """Score batches of resume texts with vectorized matrix operations"""
+
+    def __init__(self, analyzer, max_vocabulary=MAX_VOCABULARY_TOKENS):
+        self.analyzer = analyzer
+        self.max_vocabulary = max_vocabulary
+        self.terms = list(analyzer.keyword_matcher.keywords)
+        self.term_index = {term: i for i, term in enumerate(self.terms)}
+        self.word_boundary = analyzer.keyword_matcher.word_boundary
+        self.traits = list(analyzer.personality_keywords)
+        self.experience_levels = list(analyzer.experience_indicators)
+        self.industries = list(analyzer.industries)
+
+        # Keywords that can span several words are counted per document.  One
+        # crossing tokens only occurs in documents with a token ending with its
+        # first segment and a token starting with its last one (segments being
+        # split at ASCII non-word characters); the others are counted in every
+        # document
+        self.phrase_terms = [term for term in self.terms if not _WORD_TERM.fullmatch(term)]
+        self._phrase_columns = [self.term_index[term] for term in self.phrase_terms]
+        self._phrase_patterns = [
+            re.compile(r'(?<!\w)' + re.escape(term) + r'(?!\w)') for term in self.phrase_terms
+        ]
+        self._phrase_edges = []
+        for phrase, term in enumerate(self.phrase_terms):
+            segments = _TOKEN_BREAK.split(term)
+            if len(segments) > 1 and segments[0] and segments[-1]:
+                self._phrase_edges.append((phrase, phrase % PHRASE_BITS, segments[0], segments[-1]))
+        self._phrase_firsts = tuple(first for _, _, first, _ in self._phrase_edges)
+        self._phrase_lasts = tuple(last for _, _, _, last in self._phrase_edges)
+        # Word-only keywords indexed by their first two characters (or one
+        # character for single-character keywords) to find candidates quickly
+        self._terms_by_prefix = {}
+        self._term_characters = set()
+        for term in self.terms:
+            if _WORD_TERM.fullmatch(term):
+                entry = (self.term_index[term], term, len(term))
+                self._terms_by_prefix.setdefault(term[:2], []).append(entry)
+                self._term_characters.update(term)
+        self._reset_vocabulary()
+        self._build_weights()
+
+    def _reset_vocabulary(self):
+        # word -> {term id: count} for every lowercased word seen so far
+        self._word_hits = {}
+        self._vocabulary = TokenVocabulary(self._describe_token)
+
+    def _weights(self, keyword_lists):
+        """Terms x len(keyword_lists) matrix counting each keyword's memberships"""
+        matrix = np.zeros((len(self.terms), len(keyword_lists)), dtype=np.int64)
+        for column, keywords in enumerate(keyword_lists):
+            for keyword in keywords:
+                matrix[self.term_index[keyword], column] += 1
+        return matrix
+
+    def _build_weights(self):
+        analyzer = self.analyzer
+        keywords = analyzer.personality_keywords
+        self.trait_weights = (self._weights([keywords[trait]['high'] for trait in self.traits])
+                              - self._weights([keywords[trait]['low'] for trait in self.traits]))
+        self.collab_weights = self._weights([analyzer.collab_keywords])[:, 0]
+        self.experience_weights = self._weights(
+            [analyzer.experience_indicators[level] for level in self.experience_levels])
+        self.industry_weights = self._weights([analyzer.industries[name] for name in self.industries])
+        self.mention_weights = self._weights([analyzer.education_keywords,
+                                              analyzer.achievement_keywords,
+                                              analyzer.leadership_keywords])
+
+    def _hits_for_word(self, word):
+        """Counts of every word-only keyword inside a single lowercased word"""
+        hits = self._word_hits.get(word)
+        if hits is None:
+            if self.word_boundary:
+                term_id = self.term_index.get(word)
+                hits = {term_id: 1} if term_id is not None else {}
+            else:
+                hits = self._count_in_word(word)
+            self._word_hits[word] = hits
+        return hits
+
+    def _count_in_word(self, word):
+        """Non-overlapping counts (str.count semantics) of keywords in a word"""
+        found = {}
+        if self._term_characters.isdisjoint(word):
+            return found
+        last_end = {}
+        by_prefix = self._terms_by_prefix
+        for start in range(len(word)):
+            for prefix in (word[start:start + 2], word[start]):
+                for term_id, term, length in by_prefix.get(prefix, ()):
+                    if start >= last_end.get(term_id, 0) and word.startswith(term, start):
+                        found[term_id] = found.get(term_id, 0) + 1
+                        last_end[term_id] = start + length
+        return found
+
+    def _describe_token(self, token):
+        """Return (lowercased words, total word length, capital words, numbers, keyword hits, phrase mask)"""
+        text = token.decode('utf-8', 'surrogatepass')
+        lowered = text.lower()
+        if token.isascii():
+            # An ASCII token is exactly one word
+            words = [lowered]
+            capital = int(len(text) >= 2 and text.isalpha() and text.isupper())
+            number = int(text.isdigit())
+        else:
+            # Tokens are bounded by non-word characters, so the analyzer's
+            # patterns match the same way inside the token as in the text
+            words = _WORD.findall(lowered)
+            capital = len(_CAPITAL_WORD.findall(text))
+            number = len(_NUMBER.findall(text))
+
+        hits = {}
+        for word in words:
+            for term_id, count in self._hits_for_word(word).items():
+                hits[term_id] = hits.get(term_id, 0) + count
+
+        mask = 0
+        if lowered.endswith(self._phrase_firsts) or lowered.startswith(self._phrase_lasts):
+            for _, bit, first, last in self._phrase_edges:
+                if lowered.endswith(first):
+                    mask |= 1 << bit
+                if lowered.startswith(last):
+                    mask |= 1 << (bit + PHRASE_BITS)
+        return words, sum(len(word) for word in words), capital, number, hits, mask
+
+    def _count_phrases(self, texts, candidates, counts):
+        """Count each multi-word keyword in its candidate documents.
+
+        candidates holds one array of row numbers per entry of
+        self.phrase_terms.
+        """
+        lowered = {}
+        rows, columns, values = [], [], []
+        for phrase, phrase_rows in enumerate(candidates):
+            term = self.phrase_terms[phrase]
+            pattern = self._phrase_patterns[phrase]
+            for row in phrase_rows.tolist():
+                text_lower = lowered.get(row)
+                if text_lower is None:
+                    text_lower = lowered[row] = texts[row].lower()
+                if self.word_boundary:
+                    count = len(pattern.findall(text_lower))
+                else:
+                    count = text_lower.count(term)
+                if count:
+                    rows.append(row)
+                    columns.append(self._phrase_columns[phrase])
+                    values.append(count)
+        counts.add(rows, columns, values)
+
+    def featurize(self, texts):
+        """Return (keyword counts, raw feature matrix) for texts.
+
+        The keyword counts are a SparseCounts matrix with one row per text and
+        one column per entry of self.terms.  The feature matrix columns are
+        total_words, unique_words, avg_word_length, sentence_count,
+        exclamation_count, question_count, capital_words and numbers_count;
+        the keyword mention features are derived from the counts by score().
+        """
+        if max(len(self._vocabulary.ids), len(self._word_hits)) > self.max_vocabulary:
+            self._reset_vocabulary()
+
+        n = len(texts)
+        counts = SparseCounts((n, len(self.terms)))
+        raw = np.zeros((n, 8), dtype=np.float64)
+        punctuation = []
+        token_texts = []
+        context_sensitive = []
+
+        for row, text in enumerate(texts):
+            data = text.encode('utf-8', 'surrogatepass')
+            sentences = len(data.translate(_SENTENCE_TABLE).split())
+            punctuation.append((sentences, text.count('!'), text.count('?')))
+            if _CONTEXT_SENSITIVE in text:
+                context_sensitive.append(row)
+                token_texts.append(b'')
+            else:
+                token_texts.append(data.translate(_TOKEN_TABLE))
+
+        phrase_masks = np.zeros(n, dtype=np.int64)
+        if n:
+            raw[:, 3:6] = punctuation
+            # One split of the whole batch, with a separator token before every
+            # text but the first
+            ids = self._vocabulary.lookup((b' ' + _SEPARATOR + b' ').join(token_texts).split())
+            self._featurize_tokens(ids, counts, raw, phrase_masks)
+        for row in context_sensitive:
+            self._featurize_one(row, texts[row], counts, raw)
+
+        if self.phrase_terms:
+            # Texts featurized alone are candidates for every phrase
+            phrase_masks[context_sensitive] = -1
+            candidates = [np.arange(n)] * len(self.phrase_terms)
+            present = phrase_masks & (phrase_masks >> PHRASE_BITS)
+            for phrase, bit, _, _ in self._phrase_edges:
+                candidates[phrase] = np.flatnonzero(present & (1 << bit))
+            self._count_phrases(texts, candidates, counts)
+
+        # Column 2 holds the total word length until here
+        total_words = raw[:, 0]
+        raw[:, 2] = np.divide(raw[:, 2], total_words, out=np.zeros(n), where=total_words > 0)
+        return counts, raw
+
+    def _featurize_one(self, row, text, counts, raw):
+        """Word features of a single text using the analyzer's patterns directly"""
+        words = _WORD.findall(text.lower())
+        raw[row, 0] = len(words)
+        raw[row, 1] = len(set(words))
+        raw[row, 2] = sum(len(word) for word in words)
+        raw[row, 6] = len(_CAPITAL_WORD.findall(text))
+        raw[row, 7] = len(_NUMBER.findall(text))
+        hits = {}
+        for word in words:
+            for term_id, count in self._hits_for_word(word).items():
+                hits[term_id] = hits.get(term_id, 0) + count
+        counts.add([row] * len(hits), list(hits), list(hits.values()))
+
+    def _featurize_tokens(self, ids, counts, raw, phrase_masks):
+        """Word features, word-only keyword counts and phrase masks of the batch's tokens"""
+        if not ids.size:
+            return
+        n = raw.shape[0]
+        vocabulary = self._vocabulary
+        # Separators (id 0) begin every text but the first and describe nothing
+        separators = ids == 0
+        docs = np.cumsum(separators)
+        starts = np.flatnonzero(separators)
+
+        # The tokens of each document are contiguous, so their features are
+        # summed per run starting at its separator
+        raw[:, TokenVocabulary.FEATURE_COLUMNS] = np.add.reduceat(
+            vocabulary.features.take(ids, axis=0), np.concatenate(([0], starts)))
+
+        # Distinct lowercased words per document from (document, word id + 1)
+        # pairs; tokens of several words are expanded into their words and
+        # tokens of none (separators included) pair with 0, which is not
+        # counted
+        word_docs = docs
+        word_ids = vocabulary.token_words[ids] + 1
+        if vocabulary.compound_tokens:
+            compound = word_ids < 0
+            if compound.any():
+                extra_docs, extra_words, _ = vocabulary.words.expand(docs[compound], ids[compound])
+                simple = ~compound
+                word_docs = np.concatenate((docs[simple], extra_docs))
+                word_ids = np.concatenate((word_ids[simple], extra_words + 1))
+        stride = len(vocabulary.word_ids) + 1
+        pairs = word_docs * stride + word_ids
+        pairs.sort()
+        first = np.ones(pairs.size, dtype=bool)
+        np.not_equal(pairs[1:], pairs[:-1], out=first[1:])
+        distinct = pairs[first]
+        raw[:, 1] = np.bincount(distinct[distinct % stride > 0] // stride, minlength=n)
+
+        # Keyword counts of the tokens that contain any keyword, as triples
+        hit_tokens = np.flatnonzero(vocabulary.hits.lengths[ids])
+        counts.add(*vocabulary.hits.expand(docs[hit_tokens], ids[hit_tokens]))
+
+        # Which multi-word keywords each document's tokens can begin and end
+        if self._phrase_edges:
+            masks = vocabulary.phrase_masks[ids]
+            marked = np.flatnonzero(masks)
+            np.bitwise_or.at(phrase_masks, docs[marked], masks[marked])
+
+    def score(self, counts, raw):
+        """Vectorized scoring rules.
+
+        Returns (scores, experience, industry, mentions): the trait score
+        matrix, an index into EXPERIENCE_NAMES, an index into self.industries
+        (-1 for General) and the education / achievement / leadership
+        mention counts.
+        """
+        mentions = counts @ self.mention_weights
+        achievement, leadership = mentions[:, 1], mentions[:, 2]
+        total_words, unique_words, avg_word_length = raw[:, 0], raw[:, 1], raw[:, 2]
+        sentence_count, exclamation_count = raw[:, 3], raw[:, 4]
+        column = {trait: i for i, trait in enumerate(self.traits)}
+
+        scores = counts @ self.trait_weights + 50
+        scores[:, column['Conscientiousness']] += 5 * (avg_word_length > 5) + 10 * (achievement > 2)
+        scores[:, column['Extraversion']] += 10 * (leadership > 1) + 5 * (exclamation_count > 0)
+        diversity = np.divide(unique_words, total_words, out=np.zeros(len(raw)), where=total_words > 0)
+        scores[:, column['Openness']] += 10 * (diversity > 0.6)
+        scores[:, column['Agreeableness']] += 2 * (counts @ self.collab_weights)
+        scores[:, column['Emotional Stability']] += 5 * ((sentence_count > 10) & (exclamation_count == 0))
+        np.clip(scores, 0, 100, out=scores)
+
+        levels = counts @ self.experience_weights
+        senior, mid, junior = (levels[:, self.experience_levels.index(level)]
+                               for level in ('senior', 'mid', 'junior'))
+        experience = np.where((senior > mid) & (senior > junior), 0, np.where(mid > junior, 1, 2))
+
+        industry_scores = counts @ self.industry_weights
+        industry = np.where(industry_scores.max(axis=1) > 0, industry_scores.argmax(axis=1), -1)
+        return scores, experience, industry, mentions
+
+    def analyze_batch(self, texts):
+        """Analyze texts and return one PersonalityAnalyzer.analyze style dict per text"""
+        results = []
+        for start in range(0, len(texts), CHUNK_DOCUMENTS):
+            results.extend(self._analyze_chunk(texts[start:start + CHUNK_DOCUMENTS]))
+        return results
+
+    def _analyze_chunk(self, texts):
+        counts, raw = self.featurize(texts)
+        scores, experience, industry, mentions = self.score(counts, raw)
+        dominant = scores.argmax(axis=1).tolist()
+        experience = experience.tolist()
+        industry = industry.tolist()
+
+        # Plain Python numbers, converted column by column instead of per element
+        counted = raw[:, [0, 1, 3, 4, 5, 6, 7]].astype(np.int64).tolist()
+        averages = raw[:, 2].tolist()
+        mentions = mentions.tolist()
+        scores = scores.tolist()
+        industry_names = [name.title() for name in self.industries] + ["General"]
+
+        results = []
+        for row, (total, unique, sentences, exclamations, questions, capitals, numbers) in enumerate(counted):
+            education, achievement, leadership = mentions[row]
+            features = {
+                'total_words': total,
+                'unique_words': unique,
+                'avg_word_length': averages[row] if total else 0,
+                'sentence_count': sentences,
+                'exclamation_count': exclamations,
+                'question_count': questions,
+                'capital_words': capitals,
+                'numbers_count': numbers,
+                'education_mentions': education,
+                'achievement_mentions': achievement,
+                'leadership_mentions': leadership,
+            }
+            results.append({
+                'personality_scores': dict(zip(self.traits, scores[row])),
+                'experience_level': EXPERIENCE_NAMES[experience[row]],
+                'industry': industry_names[industry[row]],
+                'dominant_trait': self.traits[dominant[row]],
+                'features': features,
+            })
+        return results
+
+
+class SparseCounts:
+    """Documents x keywords count matrix built from (row, column, count) triples.
+
+    A cell may appear in several triples; its count is their sum.  Products
+    with weight arrays use a dense copy made once, so a matrix should hold
+    one chunk of documents rather than a whole corpus.
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        self._parts = []
+        self._dense = None
+
+    def add(self, rows, columns, values):
+        self._parts.append((np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64),
+                            np.asarray(values, dtype=np.float64)))
+        self._dense = None
+
+    def triples(self):
+        """Return the rows, columns and counts arrays"""
+        if len(self._parts) != 1:
+            self.add([], [], [])
+            self._parts = [tuple(np.concatenate(arrays) for arrays in zip(*self._parts))]
+        return self._parts[0]
+
+    def _cells(self):
+        if self._dense is None:
+            rows, columns, values = self.triples()
+            cells = np.bincount(rows * self.shape[1] + columns, weights=values,
+                                minlength=self.shape[0] * self.shape[1])
+            self._dense = cells.reshape(self.shape)
+        return self._dense
+
+    def __matmul__(self, weights):
+        """Product with an integer keywords x k (or keywords) weight array"""
+        return (self._cells() @ weights).astype(np.int64)
+
+    def toarray(self):
+        """Dense int64 copy of the matrix"""
+        return self._cells().astype(np.int64)
+
+
+class RaggedTable:
+    """Variable-length lists of (key, value) pairs per token id in flat arrays"""
+
+    def __init__(self):
+        self.starts = np.zeros(0, dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros(0, dtype=np.float64)
+        self._size = 0
+        self._pending = ([], [], [], [])
+
+    def append(self, pairs):
+        starts, lengths, keys, values = self._pending
+        starts.append(self._size + len(keys))
+        lengths.append(len(pairs))
+        for key, value in pairs:
+            keys.append(key)
+            values.append(value)
+
+    def freeze(self):
+        """Extend the arrays with the rows appended since the last freeze"""
+        starts, lengths, keys, values = self._pending
+        self.starts = _extend(self.starts, starts)
+        self.lengths = _extend(self.lengths, lengths)
+        self.keys = _extend(self.keys, keys)
+        self.values = _extend(self.values, values)
+        self._size += len(keys)
+        self._pending = ([], [], [], [])
+
+    def expand(self, docs, ids):
+        """Return (docs, keys, values) with one element per pair of every token occurrence"""
+        repeats = self.lengths[ids]
+        total = int(repeats.sum())
+        offsets = np.cumsum(repeats) - repeats
+        positions = np.repeat(self.starts[ids] - offsets, repeats) + np.arange(total)
+        return np.repeat(docs, repeats), self.keys[positions], self.values[positions]
+
+
+class TokenIds(dict):
+    """Token to id mapping that assigns the next id to unseen tokens"""
+
+    def __init__(self):
+        super().__init__()
+        self.new_tokens = []
+
+    def __missing__(self, token):
+        token_id = self[token] = len(self)
+        self.new_tokens.append(token)
+        return token_id
+
+
+class TokenVocabulary:
+    """Facts about every distinct token seen so far, kept as NumPy arrays"""
+
+    # Raw feature columns filled from the features table: word count, total
+    # word length, capital words and numbers of each token
+    FEATURE_COLUMNS = [0, 2, 6, 7]
+
+    def __init__(self, describe):
+        self.describe = describe
+        self.ids = TokenIds()
+        self.word_ids = {}
+        self.features = np.zeros((0, len(self.FEATURE_COLUMNS)), dtype=np.float64)
+        # Word id of every token made of exactly one word, -1 for tokens of
+        # no word and -2 for compound tokens of several words
+        self.token_words = np.zeros(0, dtype=np.int64)
+        self.compound_tokens = 0
+        self.phrase_masks = np.zeros(0, dtype=np.int64)
+        self._new_rows = ([], [], [])
+        self.words = RaggedTable()
+        self.hits = RaggedTable()
+        # The separator between texts is token 0 and describes nothing
+        self.ids[_SEPARATOR] = 0
+        self._append((), 0, 0, 0, {}, 0)
+        self._freeze()
+
+    def lookup(self, tokens):
+        """Return the ids of tokens, describing the ones not seen before"""
+        ids = np.fromiter(map(self.ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        new_tokens = self.ids.new_tokens
+        if new_tokens:
+            self.ids.new_tokens = []
+            self._add(new_tokens)
+        return ids
+
+    def _add(self, new_tokens):
+        for token in new_tokens:
+            self._append(*self.describe(token))
+        self._freeze()
+
+    def _append(self, words, length, capital, number, hits, phrase_mask):
+        features, token_words, phrase_masks = self._new_rows
+        features.append((len(words), length, capital, number))
+        word_ids = [self.word_ids.setdefault(word, len(self.word_ids)) for word in words]
+        if len(word_ids) == 1:
+            token_words.append(word_ids[0])
+        elif word_ids:
+            token_words.append(-2)
+            self.compound_tokens += 1
+        else:
+            token_words.append(-1)
+        phrase_masks.append(phrase_mask)
+        self.words.append([(word_id, 1) for word_id in word_ids])
+        self.hits.append(list(hits.items()))
+
+    def _freeze(self):
+        # Only the new tokens are converted; the arrays are extended, not rebuilt
+        features, token_words, phrase_masks = self._new_rows
+        self.features = _extend(self.features, features)
+        self.token_words = _extend(self.token_words, token_words)
+        self.phrase_masks = _extend(self.phrase_masks, phrase_masks)
+        self._new_rows = ([], [], [])
+        self.words.freeze()
+        self.hits.freeze()
+
+
+def _extend(array, values):
+    """array followed by the Python list values, converted to array's dtype"""
+    if not values:
+        return array
+    return np.concatenate((array, np.array(values, dtype=array.dtype)))
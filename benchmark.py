@@ -0,0 +1,316 @@
+"""Reproducible performance benchmark for PersonalityAnalyzer.
+
+Examples:
+    python benchmark.py --output baseline.json
+    python benchmark.py --words 2000 --keyword-density 0.2 --baseline baseline.json
+    python benchmark.py --batch-sizes 1,64,1024 --engines scalar,vectorized
+
+Resumes are generated from a seed out of the analyzer's own lexicons, so the
+same options always produce the same corpus.  Results are printed as JSON;
+with --baseline they are compared against an earlier run and the exit status
+is 1 when any metric regressed by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from personality_analyzer import PersonalityAnalyzer
+
+# Words used between keywords in generated resumes
+FILLER_WORDS = (
+    'the', 'and', 'of', 'to', 'in', 'for', 'with', 'on', 'at', 'by', 'from', 'as',
+    'project', 'projects', 'company', 'client', 'clients', 'product', 'products',
+    'system', 'systems', 'process', 'processes', 'customer', 'customers', 'service',
+    'delivered', 'improved', 'reduced', 'increased', 'built', 'designed', 'supported',
+    'maintained', 'implemented', 'reviewed', 'prepared', 'handled', 'worked', 'used',
+    'quality', 'budget', 'schedule', 'reporting', 'tools', 'requirements', 'results',
+    'daily', 'weekly', 'monthly', 'annual', 'regional', 'global', 'internal', 'external',
+    'office', 'operations', 'program', 'platform', 'application', 'support', 'training',
+)
+
+# Uppercase words and numbers sprinkled in like the acronyms and dates of real resumes
+ACRONYMS = ('SQL', 'AWS', 'CRM', 'ERP', 'KPI', 'API', 'MBA', 'ISO', 'QA', 'HR')
+
+SECTION_HEADINGS = ('SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'ACHIEVEMENTS')
+
+# Stage methods in pipeline order, as named in PersonalityAnalyzer
+STAGE_METHODS = (
+    'extract_text_features',
+    'calculate_personality_scores',
+    'determine_experience_level',
+    'identify_industry',
+    'generate_personality_report',
+)
+
+DEFAULT_BATCH_SIZES = (1, 16, 256)
+
+# Fractional slowdown tolerated before a metric counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+def generate_resume(rng, keywords, words=400, keyword_density=0.1):
+    """Generate one synthetic resume of about words words.
+
+    keyword_density is the fraction of words drawn from the lexicons instead
+    of the filler vocabulary.
+    """
+    lines = []
+    remaining = words
+    section = 0
+    while remaining > 0:
+        lines.append(SECTION_HEADINGS[section % len(SECTION_HEADINGS)])
+        section += 1
+        for _ in range(rng.randint(2, 5)):
+            length = min(remaining, rng.randint(6, 18))
+            if length <= 0:
+                break
+            sentence = []
+            for _ in range(length):
+                roll = rng.random()
+                if roll < keyword_density:
+                    word = rng.choice(keywords)
+                elif roll < keyword_density + 0.03:
+                    word = rng.choice(ACRONYMS)
+                elif roll < keyword_density + 0.05:
+                    word = str(rng.randint(1, 2024))
+                else:
+                    word = rng.choice(FILLER_WORDS)
+                sentence.append(word)
+            remaining -= length
+            sentence[0] = sentence[0].capitalize()
+            ending = '!' if rng.random() < 0.02 else '.'
+            lines.append("- " + " ".join(sentence) + ending)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_corpus(analyzer, count, words=400, keyword_density=0.1, seed=0):
+    """Generate count resumes; the same arguments always give the same corpus"""
+    rng = random.Random(seed)
+    keywords = analyzer.all_keywords()
+    return [generate_resume(rng, keywords, words, keyword_density) for _ in range(count)]
+
+
+def summarize(samples):
+    """Summary statistics in microseconds of per-call durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        'calls': len(ordered),
+        'total_s': sum(ordered),
+        'mean_us': statistics.fmean(ordered) * 1e6,
+        'median_us': statistics.median(ordered) * 1e6,
+        'p95_us': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6,
+    }
+
+
+def time_stages(analyzer, corpus, repeat=3):
+    """Time each pipeline stage per document.
+
+    Stages run in pipeline order on each document like analyze() runs them.
+    Later stages reuse the keyword scan of extract_text_features, so the scan
+    is accounted to that stage.
+    """
+    timer = time.perf_counter
+    samples = {method: [] for method in STAGE_METHODS}
+    for _ in range(repeat):
+        for text in corpus:
+            start = timer()
+            features = analyzer.extract_text_features(text)
+            after_features = timer()
+            scores = analyzer.calculate_personality_scores(text, features)
+            after_scores = timer()
+            experience_level = analyzer.determine_experience_level(text)
+            after_experience = timer()
+            industry = analyzer.identify_industry(text)
+            after_industry = timer()
+            analyzer.generate_personality_report(scores, experience_level, industry, features)
+            end = timer()
+
+            samples['extract_text_features'].append(after_features - start)
+            samples['calculate_personality_scores'].append(after_scores - after_features)
+            samples['determine_experience_level'].append(after_experience - after_scores)
+            samples['identify_industry'].append(after_industry - after_experience)
+            samples['generate_personality_report'].append(end - after_industry)
+    return {method: summarize(values) for method, values in samples.items()}
+
+
+def _analyze_scalar(analyzer, batch):
+    for text in batch:
+        result = analyzer.analyze(text)
+        analyzer.generate_personality_report(result['personality_scores'], result['experience_level'],
+                                             result['industry'], result['features'])
+
+
+def _analyze_vectorized(scorer, batch):
+    analyzer = scorer.analyzer
+    for result in scorer.analyze_batch(batch):
+        analyzer.generate_personality_report(result['personality_scores'], result['experience_level'],
+                                             result['industry'], result['features'])
+
+
+def _make_runner(engine, analyzer):
+    """Return a function analyzing one batch of texts with the given engine"""
+    if engine == 'vectorized':
+        from batch_scoring import BatchScorer
+        scorer = BatchScorer(analyzer)
+        return lambda batch: _analyze_vectorized(scorer, batch)
+    return lambda batch: _analyze_scalar(analyzer, batch)
+
+
+def time_throughput(analyzer, corpus, batch_sizes=DEFAULT_BATCH_SIZES, engines=('scalar',), repeat=3):
+    """End-to-end analysis plus report throughput for each engine and batch size.
+
+    The best of repeat runs over the whole corpus is reported.  The vectorized
+    engine starts every run with a fresh scorer, so building its token
+    vocabulary is included.
+    """
+    characters = sum(len(text) for text in corpus)
+    results = {}
+    for engine in engines:
+        results[engine] = {}
+        for batch_size in batch_sizes:
+            best = None
+            for _ in range(repeat):
+                run = _make_runner(engine, analyzer)
+                start = time.perf_counter()
+                for offset in range(0, len(corpus), batch_size):
+                    run(corpus[offset:offset + batch_size])
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[engine][str(batch_size)] = {
+                'seconds': best,
+                'docs_per_second': len(corpus) / best,
+                'mb_per_second': characters / best / 1e6,
+            }
+    return results
+
+
+def run_benchmark(docs=200, words=400, keyword_density=0.1, seed=0, repeat=3,
+                  batch_sizes=DEFAULT_BATCH_SIZES, engines=('scalar',), word_boundary=False):
+    """Run the whole suite and return a JSON-serializable report"""
+    analyzer = PersonalityAnalyzer(word_boundary=word_boundary)
+    corpus = generate_corpus(analyzer, docs, words, keyword_density, seed)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'lexicon_version': analyzer.lexicon_version,
+        },
+        'parameters': {
+            'docs': docs,
+            'words': words,
+            'keyword_density': keyword_density,
+            'seed': seed,
+            'repeat': repeat,
+            'word_boundary': word_boundary,
+            'corpus_characters': sum(len(text) for text in corpus),
+        },
+        'stages': time_stages(analyzer, corpus, repeat),
+        'throughput': time_throughput(analyzer, corpus, batch_sizes, engines, repeat),
+    }
+
+
+def iter_metrics(report):
+    """Yield (name, value, higher_is_better) for every compared metric"""
+    for method, stats in report.get('stages', {}).items():
+        yield f"stages.{method}.median_us", stats['median_us'], False
+    for engine, by_batch in report.get('throughput', {}).items():
+        for batch_size, stats in by_batch.items():
+            yield f"throughput.{engine}.{batch_size}.docs_per_second", stats['docs_per_second'], True
+
+
+def compare_reports(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare a report against a baseline report.
+
+    Returns a list of dicts with name, baseline, current, change (fractional
+    slowdown, negative when faster) and regressed.  Metrics missing from
+    either report are skipped.
+    """
+    baseline_metrics = {name: value for name, value, _ in iter_metrics(baseline)}
+    comparison = []
+    for name, value, higher_is_better in iter_metrics(report):
+        old = baseline_metrics.get(name)
+        if not old or not value:
+            continue
+        change = old / value - 1 if higher_is_better else value / old - 1
+        comparison.append({
+            'name': name,
+            'baseline': old,
+            'current': value,
+            'change': change,
+            'regressed': change > threshold,
+        })
+    return comparison
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume analyzer on a synthetic corpus")
+    parser.add_argument('--docs', type=int, default=200, help="resumes in the corpus (default: 200)")
+    parser.add_argument('--words', type=int, default=400, help="words per resume (default: 400)")
+    parser.add_argument('--keyword-density', type=float, default=0.1,
+                        help="fraction of words taken from the lexicons (default: 0.1)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus random seed (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement (default: 3)")
+    parser.add_argument('--batch-sizes', default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="comma separated batch sizes for throughput (default: 1,16,256)")
+    parser.add_argument('--engines', default='scalar',
+                        help="comma separated engines: scalar, vectorized (requires NumPy)")
+    parser.add_argument('--word-boundary', action='store_true',
+                        help="only count keywords that appear as whole words")
+    parser.add_argument('--output', '-o', help="write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="JSON report of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="tolerated slowdown before failing, e.g. 0.1 for 10%% (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    try:
+        args.batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    except ValueError:
+        parser.error("--batch-sizes must be comma separated integers")
+    args.engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    for engine in args.engines:
+        if engine not in ('scalar', 'vectorized'):
+            parser.error(f"unknown engine {engine!r}")
+    if args.docs < 1 or args.words < 1 or args.repeat < 1 or min(args.batch_sizes) < 1:
+        parser.error("--docs, --words, --repeat and batch sizes must be at least 1")
+    if not 0 <= args.keyword_density <= 1:
+        parser.error("--keyword-density must be between 0 and 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmark(args.docs, args.words, args.keyword_density, args.seed, args.repeat,
+                           args.batch_sizes, args.engines, args.word_boundary)
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        report['comparison'] = compare_reports(report, baseline, args.threshold)
+        for metric in report['comparison']:
+            flag = "REGRESSED" if metric['regressed'] else "ok"
+            print(f"{metric['name']}: {metric['baseline']:.2f} -> {metric['current']:.2f} "
+                  f"({metric['change']:+.1%} time) {flag}", file=sys.stderr)
+        regressed = [metric['name'] for metric in report['comparison'] if metric['regressed']]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if regressed:
+        print(f"{len(regressed)} metrics regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
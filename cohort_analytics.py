@@ -0,0 +1,241 @@
+"""Incrementally maintained cohort aggregates over the analysis history.
+
+Each cohort (everyone, and each industry) keeps one histogram per trait over
+fixed 0.1-point bins.  Scores are bounded to 0-100, so the histograms are
+exact sketches: percentile ranks and quantiles come from at most a thousand
+bin counts instead of a scan of the history.  Experience levels are counted
+per month of the analysis timestamp.  Adding an analysis touches a handful
+of counters; sync(store) only reads entries newer than the last one synced,
+and save()/load() keep the aggregates between sessions.  Analyses added
+directly do not move that watermark, so entries stored meanwhile by other
+writers (e.g. watch_folder) are still counted by the next sync.
+"""
+import json
+import os
+import tempfile
+
+from history_store import TRAIT_COLUMNS
+
+# Histogram bins per score point; trait scores are integers today, and a
+# tenth of a point keeps imported fractional scores apart
+BINS_PER_POINT = 10
+MAX_SCORE = 100
+
+# Width in points of the buckets shown in distribution charts
+DISTRIBUTION_BUCKET = 10
+
+# Bump whenever the snapshot layout or binning changes
+SNAPSHOT_FORMAT = 1
+
+# Cohort key for all analyses regardless of industry
+ALL_COHORT = None
+
+
+class ScoreHistogram:
+    """Counts of 0-100 scores in fixed bins, with sum for the mean"""
+
+    def __init__(self, counts=None, total=0.0):
+        self.counts = counts or [0] * (MAX_SCORE * BINS_PER_POINT + 1)
+        self.count = sum(self.counts)
+        self.total = total
+
+    def add(self, score, weight=1):
+        self.counts[self._bin(score)] += weight
+        self.count += weight
+        self.total += weight * score
+
+    @staticmethod
+    def _bin(score):
+        return max(0, min(MAX_SCORE * BINS_PER_POINT, round(score * BINS_PER_POINT)))
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile_rank(self, score):
+        """Percentage of scores below score, counting ties as half, or None when empty"""
+        if not self.count:
+            return None
+        bin_index = self._bin(score)
+        below = sum(self.counts[:bin_index])
+        return 100 * (below + self.counts[bin_index] / 2) / self.count
+
+    def quantile(self, fraction):
+        """Score below which fraction of the scores fall, or None when empty"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bin_index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bin_index / BINS_PER_POINT
+        return MAX_SCORE
+
+    def buckets(self, width=DISTRIBUTION_BUCKET):
+        """Counts per width-point bucket, the last bucket including 100"""
+        step = width * BINS_PER_POINT
+        counts = [sum(self.counts[start:start + step]) for start in range(0, len(self.counts) - 1, step)]
+        counts[-1] += self.counts[-1]
+        return counts
+
+
+class CohortAnalytics:
+    """Trait distributions per industry, experience mix per month and percentile ranks"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.experience_months = {}
+        self.last_id = 0
+        # Counted ids above last_id, skipped when sync reaches them
+        self.ahead_ids = set()
+        self.dirty = False
+
+    def __len__(self):
+        return self._cohort(ALL_COHORT)[next(iter(TRAIT_COLUMNS))].count
+
+    def _cohort(self, industry):
+        cohort = self.histograms.get(industry)
+        if cohort is None:
+            cohort = self.histograms[industry] = {trait: ScoreHistogram() for trait in TRAIT_COLUMNS}
+        return cohort
+
+    def add(self, entry_id, timestamp, experience_level, industry, personality_scores):
+        """Count one stored analysis"""
+        self._count(timestamp, experience_level, industry, personality_scores)
+        if entry_id > self.last_id:
+            self.ahead_ids.add(entry_id)
+
+    def _count(self, timestamp, experience_level, industry, personality_scores):
+        for cohort in (self._cohort(ALL_COHORT), self._cohort(industry)):
+            for trait, histogram in cohort.items():
+                histogram.add(personality_scores[trait])
+        levels = self.experience_months.setdefault(timestamp[:7], {})
+        levels[experience_level] = levels.get(experience_level, 0) + 1
+        self.dirty = True
+
+    def sync(self, store, batch_size=10000):
+        """Count the store's entries not counted yet and return how many"""
+        if store.count() < len(self) or (self.last_id and store.get(self.last_id) is None):
+            # The history was cleared or replaced since the snapshot
+            self.clear()
+        added = self._sync_newer(store, batch_size)
+        if store.count(max_id=self.last_id) != len(self):
+            # Entries below the watermark are missing, as in snapshots saved
+            # before add() left the watermark alone, so count everything again
+            self.clear()
+            added = self._sync_newer(store, batch_size)
+        return added
+
+    def _sync_newer(self, store, batch_size):
+        """Count the entries above the watermark and move it to the newest entry"""
+        added = 0
+        last_id = self.last_id
+        for record in store.iter_entries(batch_size=batch_size, after_id=last_id):
+            last_id = record.id
+            if record.id in self.ahead_ids:
+                continue
+            self._count(record.timestamp, record.experience_level, record.industry, record.personality_scores)
+            added += 1
+        if last_id != self.last_id:
+            self.last_id = last_id
+            self.ahead_ids = {entry_id for entry_id in self.ahead_ids if entry_id > last_id}
+            self.dirty = True
+        return added
+
+    def clear(self):
+        self.histograms = {}
+        self.experience_months = {}
+        self.last_id = 0
+        self.ahead_ids = set()
+        self.dirty = True
+
+    def industries(self):
+        """Number of analyses per industry, largest first"""
+        counts = {industry: cohort[next(iter(TRAIT_COLUMNS))].count
+                  for industry, cohort in self.histograms.items() if industry is not ALL_COHORT}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def trait_histogram(self, trait, industry=ALL_COHORT):
+        return self._cohort(industry)[trait] if industry in self.histograms else ScoreHistogram()
+
+    def percentile_ranks(self, personality_scores, industry=ALL_COHORT):
+        """Percentile rank of each trait score among the cohort's analyses, or None when empty"""
+        return {trait: self.trait_histogram(trait, industry).percentile_rank(score)
+                for trait, score in personality_scores.items()}
+
+    def trait_summary(self, industry=ALL_COHORT):
+        """Count, mean and quartiles of each trait within a cohort"""
+        summary = {}
+        for trait in TRAIT_COLUMNS:
+            histogram = self.trait_histogram(trait, industry)
+            summary[trait] = {
+                'count': histogram.count,
+                'mean': histogram.mean(),
+                'p25': histogram.quantile(0.25),
+                'p50': histogram.quantile(0.5),
+                'p75': histogram.quantile(0.75),
+            }
+        return summary
+
+    def experience_mix(self, months=None):
+        """{month: {experience level: count}} for the latest months, oldest first"""
+        ordered = sorted(self.experience_months)
+        if months is not None:
+            ordered = ordered[-months:]
+        return {month: dict(self.experience_months[month]) for month in ordered}
+
+    def save(self, path):
+        """Write a snapshot of the aggregates, replacing any existing file atomically"""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        state = {
+            'format': SNAPSHOT_FORMAT,
+            'last_id': self.last_id,
+            'ahead_ids': sorted(self.ahead_ids),
+            'cohorts': [
+                {'industry': industry,
+                 'traits': {trait: {'counts': histogram.counts, 'total': histogram.total}
+                            for trait, histogram in cohort.items()}}
+                for industry, cohort in self.histograms.items()
+            ],
+            'experience_months': self.experience_months,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Load a snapshot written by save, or return empty aggregates when there is none"""
+        analytics = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            if state.get('format') != SNAPSHOT_FORMAT:
+                return analytics
+            for cohort in state['cohorts']:
+                analytics.histograms[cohort['industry']] = {
+                    trait: ScoreHistogram(cohort['traits'][trait]['counts'], cohort['traits'][trait]['total'])
+                    for trait in TRAIT_COLUMNS
+                }
+            analytics.experience_months = state['experience_months']
+            analytics.last_id = state['last_id']
+            analytics.ahead_ids = set(state.get('ahead_ids', ()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+        return analytics
+
+
+def ordinal(number):
+    """1 -> '1st', 22 -> '22nd', 13 -> '13th'"""
+    if 10 <= number % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+    return f"{number}{suffix}"
@@ -0,0 +1,466 @@
+"""Streaming export and import of the analysis history.
+
+Formats are chosen by file extension:
+    .json   one JSON array, as written by earlier versions of the GUI
+    .jsonl  one JSON object per line
+    .csv    one row per analysis, with a column per score and standard feature
+    .cvh    columnar binary: row groups of typed, zlib-compressed columns
+
+Every exporter writes entry by entry from HistoryStore.iter_entries and
+every importer stores entries in batches of one transaction each, so memory
+stays bounded by a batch (or one row group) whatever the history size.
+Imported analyses get new ids; their timestamps and scores are kept.
+"""
+import contextlib
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import islice
+
+from history_store import FEATURE_NAMES, TRAIT_COLUMNS, pack_features
+
+FORMATS = {
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.csv': 'csv',
+    '.cvh': 'columnar',
+}
+
+# Entries stored per import transaction, and between progress callbacks
+DEFAULT_BATCH_SIZE = 10000
+
+# Rows per row group of the columnar format
+ROW_GROUP_SIZE = 65536
+
+COLUMNAR_MAGIC = b'CVHC'
+COLUMNAR_VERSION = 1
+
+# zlib level for columnar data; higher levels barely shrink the score columns
+COMPRESSION_LEVEL = 1
+
+# Characters read per chunk when parsing a JSON array
+JSON_CHUNK_SIZE = 1 << 16
+
+CSV_COLUMNS = (('id', 'timestamp', 'experience_level', 'industry', 'dominant_trait')
+               + tuple(TRAIT_COLUMNS) + FEATURE_NAMES + ('lexicon_version',))
+
+# Columnar columns in file order with their array typecode; None marks a
+# dictionary-encoded string column
+COLUMNAR_COLUMNS = (
+    (('id', 'q'), ('timestamp', None), ('experience_level', None), ('industry', None),
+     ('dominant_trait', None))
+    + tuple((column, 'd') for column in TRAIT_COLUMNS.values())
+    + (('features_kind', 'B'),)
+    + tuple((name, 'd' if name == 'avg_word_length' else 'I') for name in FEATURE_NAMES)
+    + (('features_json', None), ('lexicon_version', None))
+)
+
+# features_kind values: no features, the standard features, other JSON features
+_NO_FEATURES, _PACKED_FEATURES, _JSON_FEATURES = 0, 1, 2
+
+_GROUP_HEADER = struct.Struct('<I')
+_FILE_HEADER = struct.Struct('<4sHI')
+
+
+def format_for_path(path):
+    """History file format implied by a file name"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported history file type {extension or path!r}; "
+                         f"use {', '.join(FORMATS)}")
+    return FORMATS[extension]
+
+
+def _report(progress, rows, fraction):
+    if progress:
+        progress(rows, fraction)
+
+
+def export_history(store, path, fmt=None, include_reports=False, progress=None,
+                   batch_size=DEFAULT_BATCH_SIZE, **filters):
+    """Write the matching history entries to path and return how many were written.
+
+    include_reports adds each regenerated report to JSON and JSONL exports.
+    progress, if given, is called with (rows written, fraction done) after
+    every batch_size entries.
+    """
+    fmt = fmt or format_for_path(path)
+    total = store.count(**filters)
+    writer = _WRITERS[fmt]
+    entries = store.iter_entries(batch_size=batch_size, **filters)
+
+    rows = 0
+    with open(path, 'wb' if fmt == 'columnar' else 'w', **_open_args(fmt)) as file:
+        write = writer(file, store, include_reports)
+        for entry in entries:
+            write(entry)
+            rows += 1
+            if rows % batch_size == 0:
+                _report(progress, rows, rows / total if total else None)
+        write(None)
+    _report(progress, rows, 1.0)
+    return rows
+
+
+def import_history(store, path, fmt=None, progress=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Append the analyses in a history file to store and return how many were added.
+
+    progress, if given, is called with (rows imported, fraction of the file
+    read) after every batch.  Raises ValueError for malformed files; batches
+    stored before the error are kept.
+    """
+    fmt = fmt or format_for_path(path)
+    size = os.path.getsize(path)
+    rows = 0
+    with open(path, 'rb') as raw:
+        entries = _READERS[fmt](raw)
+        try:
+            while True:
+                batch = list(islice(entries, batch_size))
+                if not batch:
+                    break
+                store.extend(batch)
+                rows += len(batch)
+                if len(batch) < batch_size:
+                    # The reader is done with raw; the final report follows
+                    break
+                _report(progress, rows, raw.tell() / size if size else None)
+        finally:
+            entries.close()
+    _report(progress, rows, 1.0)
+    return rows
+
+
+def _open_args(fmt):
+    if fmt == 'columnar':
+        return {}
+    args = {'encoding': 'utf-8'}
+    if fmt == 'csv':
+        args['newline'] = ''
+    return args
+
+
+def _check_entry(entry, where):
+    """Validate an imported entry dict enough for HistoryStore.extend"""
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where}: expected a JSON object")
+    for field in ('timestamp', 'experience_level', 'industry'):
+        if not isinstance(entry.get(field), str):
+            raise ValueError(f"{where}: missing {field}")
+    scores = entry.get('personality_scores')
+    if not isinstance(scores, dict) or any(not isinstance(scores.get(trait), (int, float))
+                                           for trait in TRAIT_COLUMNS):
+        raise ValueError(f"{where}: personality_scores must have a score for every trait")
+    features = entry.get('features')
+    if features is not None and not isinstance(features, dict):
+        raise ValueError(f"{where}: features must be an object")
+    return entry
+
+
+def _entry_dict(entry, store, include_reports):
+    exported = entry.to_dict()
+    if include_reports:
+        exported['full_report'] = store.render_report(entry)
+    return exported
+
+
+@contextlib.contextmanager
+def _text_file(raw, **options):
+    """Read a binary file as UTF-8 text, leaving the file open afterwards"""
+    text = io.TextIOWrapper(raw, encoding='utf-8', **options)
+    try:
+        yield text
+    finally:
+        # A wrapper that is garbage collected closes the file it wraps
+        text.detach()
+
+
+# JSON array, the original export format
+
+def _json_writer(file, store, include_reports):
+    first = [True]
+
+    def write(entry):
+        if entry is None:
+            file.write("\n]\n" if not first[0] else "[]\n")
+            return
+        file.write("[\n" if first[0] else ",\n")
+        first[0] = False
+        file.write(json.dumps(_entry_dict(entry, store, include_reports), indent=2, ensure_ascii=False))
+    return write
+
+
+def _json_reader(raw):
+    """Yield the objects of a JSON array without parsing the whole file at once"""
+    with _text_file(raw) as text:
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        index = 0
+        expect = '['
+
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position >= len(buffer):
+                buffer = text.read(JSON_CHUNK_SIZE)
+                position = 0
+                if not buffer:
+                    raise ValueError("unexpected end of JSON history file")
+                continue
+
+            if expect == '[':
+                if buffer[position] != '[':
+                    raise ValueError("JSON history file must hold an array")
+                position += 1
+                expect = 'first'
+            elif expect in ('first', 'separator'):
+                if buffer[position] == ']':
+                    return
+                if expect == 'separator':
+                    if buffer[position] != ',':
+                        raise ValueError(f"expected ',' after entry {index}")
+                    position += 1
+                expect = 'value'
+            else:
+                try:
+                    entry, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    # The entry may continue in the next chunk
+                    chunk = text.read(JSON_CHUNK_SIZE)
+                    if not chunk:
+                        raise ValueError(f"entry {index + 1}: {e}") from None
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                index += 1
+                yield _check_entry(entry, f"entry {index}")
+                expect = 'separator'
+
+
+# JSON Lines
+
+def _jsonl_writer(file, store, include_reports):
+    def write(entry):
+        if entry is not None:
+            file.write(json.dumps(_entry_dict(entry, store, include_reports), ensure_ascii=False))
+            file.write("\n")
+    return write
+
+
+def _jsonl_reader(raw):
+    with _text_file(raw) as text:
+        for number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {number}: {e}") from None
+            yield _check_entry(entry, f"line {number}")
+
+
+# CSV
+
+def _csv_writer(file, store, include_reports):
+    writer = csv.writer(file)
+    writer.writerow(CSV_COLUMNS)
+
+    def write(entry):
+        if entry is None:
+            return
+        features = entry.features or {}
+        writer.writerow(
+            [entry.id, entry.timestamp, entry.experience_level, entry.industry, entry.dominant_trait]
+            + list(entry.scores)
+            + [features.get(name, '') for name in FEATURE_NAMES]
+            + [entry.lexicon_version or '']
+        )
+    return write
+
+
+def _csv_number(value, where):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"{where}: {value!r} is not a number") from None
+
+
+def _csv_reader(raw):
+    with _text_file(raw, newline='') as text:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        missing = [column for column in CSV_COLUMNS[1:4] + tuple(TRAIT_COLUMNS) if column not in header]
+        if missing:
+            raise ValueError(f"CSV history file has no {', '.join(missing)} column")
+        position = {column: index for index, column in enumerate(header)}
+        feature_columns = [(name, position[name]) for name in FEATURE_NAMES if name in position]
+        version_column = position.get('lexicon_version')
+
+        for number, row in enumerate(reader, 2):
+            if not row:
+                continue
+            where = f"row {number}"
+            if len(row) != len(header):
+                raise ValueError(f"{where}: expected {len(header)} fields, got {len(row)}")
+            features = {name: _csv_number(row[index], where) for name, index in feature_columns if row[index]}
+            yield {
+                'timestamp': row[position['timestamp']],
+                'experience_level': row[position['experience_level']],
+                'industry': row[position['industry']],
+                'personality_scores': {trait: _csv_number(row[position[trait]], where) for trait in TRAIT_COLUMNS},
+                'features': features or None,
+                'lexicon_version': (row[version_column] or None) if version_column is not None else None,
+            }
+
+
+# Columnar binary
+
+def _array_bytes(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _array_values(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def _string_bytes(values):
+    """Dictionary-encode a string column as its distinct values plus one code per row"""
+    codes = {}
+    column = array('I', (codes.setdefault(value, len(codes)) for value in values))
+    if sys.byteorder == 'big':
+        column.byteswap()
+    dictionary = json.dumps(list(codes), ensure_ascii=False).encode('utf-8')
+    return struct.pack('<I', len(dictionary)) + dictionary + column.tobytes()
+
+
+def _string_values(data):
+    length, = struct.unpack_from('<I', data)
+    dictionary = json.loads(data[4:4 + length].decode('utf-8'))
+    return [dictionary[code] for code in _array_values('I', data[4 + length:])]
+
+
+def _columnar_writer(file, store, include_reports):
+    header = json.dumps({'columns': [name for name, _ in COLUMNAR_COLUMNS]}).encode('utf-8')
+    file.write(_FILE_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(header)) + header)
+    group = []
+
+    def flush():
+        columns = {name: [] for name, _ in COLUMNAR_COLUMNS}
+        for entry in group:
+            columns['id'].append(entry.id)
+            columns['timestamp'].append(entry.timestamp)
+            columns['experience_level'].append(entry.experience_level)
+            columns['industry'].append(entry.industry)
+            columns['dominant_trait'].append(entry.dominant_trait)
+            for column, score in zip(TRAIT_COLUMNS.values(), entry.scores):
+                columns[column].append(score)
+            features = entry.features
+            kind = _NO_FEATURES if features is None else (
+                _PACKED_FEATURES if pack_features(features) else _JSON_FEATURES)
+            columns['features_kind'].append(kind)
+            for name in FEATURE_NAMES:
+                columns[name].append(features[name] if kind == _PACKED_FEATURES else 0)
+            columns['features_json'].append(json.dumps(features) if kind == _JSON_FEATURES else None)
+            columns['lexicon_version'].append(entry.lexicon_version)
+
+        file.write(_GROUP_HEADER.pack(len(group)))
+        for name, typecode in COLUMNAR_COLUMNS:
+            data = _string_bytes(columns[name]) if typecode is None else _array_bytes(typecode, columns[name])
+            data = zlib.compress(data, COMPRESSION_LEVEL)
+            file.write(_GROUP_HEADER.pack(len(data)) + data)
+        group.clear()
+
+    def write(entry):
+        if entry is not None:
+            group.append(entry)
+        if group and (entry is None or len(group) == ROW_GROUP_SIZE):
+            flush()
+    return write
+
+
+def _read_exactly(raw, size):
+    data = raw.read(size)
+    if len(data) != size:
+        raise ValueError("truncated columnar history file")
+    return data
+
+
+def _columnar_reader(raw):
+    magic, version, header_length = _FILE_HEADER.unpack(_read_exactly(raw, _FILE_HEADER.size))
+    if magic != COLUMNAR_MAGIC:
+        raise ValueError("not a columnar history file")
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"columnar history format {version} is not supported")
+    header = json.loads(_read_exactly(raw, header_length).decode('utf-8'))
+    if header.get('columns') != [name for name, _ in COLUMNAR_COLUMNS]:
+        raise ValueError("columnar history file has unexpected columns")
+
+    traits = list(TRAIT_COLUMNS.items())
+    while True:
+        prefix = raw.read(_GROUP_HEADER.size)
+        if not prefix:
+            return
+        if len(prefix) != _GROUP_HEADER.size:
+            raise ValueError("truncated columnar history file")
+        rows, = _GROUP_HEADER.unpack(prefix)
+        columns = {}
+        for name, typecode in COLUMNAR_COLUMNS:
+            length, = _GROUP_HEADER.unpack(_read_exactly(raw, _GROUP_HEADER.size))
+            try:
+                data = zlib.decompress(_read_exactly(raw, length))
+            except zlib.error as e:
+                raise ValueError(f"corrupt {name} column: {e}") from None
+            columns[name] = _string_values(data) if typecode is None else _array_values(typecode, data)
+            if len(columns[name]) != rows:
+                raise ValueError(f"{name} column has {len(columns[name])} values, expected {rows}")
+
+        feature_columns = [columns[name] for name in FEATURE_NAMES]
+        for row in range(rows):
+            kind = columns['features_kind'][row]
+            if kind == _PACKED_FEATURES:
+                features = {name: column[row] for name, column in zip(FEATURE_NAMES, feature_columns)}
+            elif kind == _JSON_FEATURES:
+                features = json.loads(columns['features_json'][row])
+            else:
+                features = None
+            yield {
+                'timestamp': columns['timestamp'][row],
+                'experience_level': columns['experience_level'][row],
+                'industry': columns['industry'][row],
+                'personality_scores': {trait: columns[column][row] for trait, column in traits},
+                'features': features,
+                'lexicon_version': columns['lexicon_version'][row],
+            }
+
+
+_WRITERS = {
+    'json': _json_writer,
+    'jsonl': _jsonl_writer,
+    'csv': _csv_writer,
+    'columnar': _columnar_writer,
+}
+
+_READERS = {
+    'json': _json_reader,
+    'jsonl': _jsonl_reader,
+    'csv': _csv_reader,
+    'columnar': _columnar_reader,
+}
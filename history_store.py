@@ -0,0 +1,333 @@
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+from array import array
+from itertools import islice
+
+# Score column for each Big Five trait
+TRAIT_COLUMNS = {
+    'Openness': 'openness',
+    'Conscientiousness': 'conscientiousness',
+    'Extraversion': 'extraversion',
+    'Agreeableness': 'agreeableness',
+    'Emotional Stability': 'emotional_stability',
+}
+
+# Columns read back into a HistoryRecord, in its constructor's order
+RECORD_COLUMNS = ", ".join(('id', 'timestamp', 'experience_level', 'industry', 'dominant_trait')
+                           + tuple(TRAIT_COLUMNS.values()) + ('features', 'lexicon_version'))
+
+_TRAIT_INDEX = {trait: index for index, trait in enumerate(TRAIT_COLUMNS)}
+_SCORE_INDEX = {column: index for index, column in enumerate(TRAIT_COLUMNS.values())}
+
+# Columns the history can be sorted by
+SORT_COLUMNS = ('id', 'timestamp', 'experience_level', 'industry', 'dominant_trait') + tuple(TRAIT_COLUMNS.values())
+
+# Exact-match filters, and the label columns the history view sorts by; one
+# (filter, sort) index per pair lets a filtered, sorted page be read from an
+# index without sorting every match
+FILTER_COLUMNS = ('experience_level', 'industry', 'dominant_trait')
+LABEL_SORT_COLUMNS = ('timestamp', 'experience_level', 'industry', 'dominant_trait')
+SORT_INDEXES = tuple((column, sort_column) for column in FILTER_COLUMNS
+                     for sort_column in LABEL_SORT_COLUMNS if sort_column != column)
+
+DEFAULT_PAGE_SIZE = 200
+
+# Text features packed into a fixed binary layout instead of JSON; all are
+# counts except avg_word_length
+FEATURE_NAMES = (
+    'total_words', 'unique_words', 'avg_word_length', 'sentence_count', 'exclamation_count',
+    'question_count', 'capital_words', 'numbers_count', 'education_mentions',
+    'achievement_mentions', 'leadership_mentions',
+)
+_FEATURE_STRUCT = struct.Struct('<IIdIIIIIIII')
+
+# SQLite page cache in KiB; bulk imports spend most of their time updating
+# the score indexes, which a larger cache keeps in memory
+CACHE_SIZE_KIB = 65536
+
+
+def pack_features(features):
+    """Pack a features dict into bytes, or None if it does not fit the fixed layout"""
+    if len(features) != len(FEATURE_NAMES):
+        return None
+    try:
+        # struct rejects non-integer, negative and oversized counts
+        return _FEATURE_STRUCT.pack(*[features[name] for name in FEATURE_NAMES])
+    except (KeyError, struct.error):
+        return None
+
+
+class HistoryRecord:
+    """One stored analysis in compact form.
+
+    Scores are a typed array in TRAIT_COLUMNS order, repeated labels are
+    interned strings shared by every record, and the features stay in their
+    stored encoding until they are read.  Reports are never kept; render them
+    with HistoryStore.render_report.
+    """
+
+    __slots__ = ('id', 'timestamp', 'experience_level', 'industry', 'dominant_trait',
+                 'scores', 'lexicon_version', '_features')
+
+    def __init__(self, row):
+        self.id = row[0]
+        self.timestamp = row[1]
+        self.experience_level = sys.intern(row[2])
+        self.industry = sys.intern(row[3])
+        self.dominant_trait = sys.intern(row[4])
+        self.scores = array('d', row[5:10])
+        self._features = row[10]
+        self.lexicon_version = sys.intern(row[11]) if row[11] else None
+
+    @property
+    def personality_scores(self):
+        return dict(zip(TRAIT_COLUMNS, self.scores))
+
+    def sort_key(self, order_by):
+        """(order_by column value, id) of the record, for HistoryStore.query's after and before"""
+        if order_by in TRAIT_COLUMNS.values():
+            return self.scores[_SCORE_INDEX[order_by]], self.id
+        return getattr(self, order_by), self.id
+
+    @property
+    def dominant_label(self):
+        """Dominant trait with its score, as shown in the history table"""
+        return f"{self.dominant_trait} ({self.scores[_TRAIT_INDEX[self.dominant_trait]]:.1f})"
+
+    @property
+    def features(self):
+        """Decoded features dict, or None for analyses stored without features"""
+        if not self._features:
+            return None
+        if isinstance(self._features, bytes):
+            return dict(zip(FEATURE_NAMES, _FEATURE_STRUCT.unpack(self._features)))
+        return json.loads(self._features)
+
+    def to_dict(self):
+        """The record as the history entry dict used for export"""
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'experience_level': self.experience_level,
+            'industry': self.industry,
+            'dominant_trait': self.dominant_label,
+            'personality_scores': self.personality_scores,
+            'features': self.features,
+            'lexicon_version': self.lexicon_version,
+        }
+
+
+class HistoryStore:
+    """Analysis history persisted in an indexed SQLite database.
+
+    Scores, experience level, industry and timestamp live in their own
+    columns so filtered queries use the indexes instead of scanning.  Reports
+    are not stored: they are regenerated on demand from the stored scores with
+    the analyzer's generate_personality_report.  Entries are stored from dicts
+    and read back as HistoryRecord objects; features are packed with
+    pack_features, falling back to JSON for features of another shape.
+    """
+
+    def __init__(self, path, analyzer=None):
+        self.path = path
+        self.analyzer = analyzer
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        self._create_schema()
+
+    def _create_schema(self):
+        score_columns = ",\n".join(f"{column} REAL NOT NULL" for column in TRAIT_COLUMNS.values())
+        with self._db:
+            self._db.execute(f"""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    experience_level TEXT NOT NULL,
+                    industry TEXT NOT NULL,
+                    dominant_trait TEXT NOT NULL,
+                    {score_columns},
+                    features TEXT,
+                    lexicon_version TEXT
+                )
+            """)
+            for column in ('timestamp', 'experience_level', 'industry', 'dominant_trait'):
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_analyses_{column} ON analyses ({column})")
+            for column in TRAIT_COLUMNS.values():
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_analyses_{column} "
+                                 f"ON analyses (experience_level, industry, {column})")
+            for columns in SORT_INDEXES:
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_analyses_{'_'.join(columns)} "
+                                 f"ON analyses ({', '.join(columns)})")
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM analyses LIMIT 1").fetchone() is not None
+
+    def __iter__(self):
+        """Iterate over every entry, oldest first, without loading them all"""
+        return self.iter_entries()
+
+    def append(self, entry):
+        """Store a history entry and return its id"""
+        with self._lock, self._db:
+            cursor = self._db.execute(self._insert_sql(), self._entry_row(entry))
+            return cursor.lastrowid
+
+    def extend(self, entries):
+        """Store many history entries in one transaction"""
+        with self._lock, self._db:
+            self._db.executemany(self._insert_sql(), (self._entry_row(entry) for entry in entries))
+
+    def _insert_sql(self):
+        columns = ['timestamp', 'experience_level', 'industry', 'dominant_trait']
+        columns += list(TRAIT_COLUMNS.values()) + ['features', 'lexicon_version']
+        placeholders = ", ".join("?" for _ in columns)
+        return f"INSERT INTO analyses ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def _entry_row(self, entry):
+        scores = entry['personality_scores']
+        dominant_trait = max(scores, key=scores.get)
+        features = entry.get('features')
+        if features is not None:
+            features = pack_features(features) or json.dumps(features)
+        return (
+            entry['timestamp'], entry['experience_level'], entry['industry'], dominant_trait,
+            *(scores[trait] for trait in TRAIT_COLUMNS),
+            features,
+            entry.get('lexicon_version'),
+        )
+
+    def _where(self, experience_level=None, industry=None, dominant_trait=None,
+               min_scores=None, max_scores=None, max_id=None):
+        """Build a WHERE clause and parameters from query filters"""
+        clauses = []
+        params = []
+        if max_id is not None:
+            clauses.append("id <= ?")
+            params.append(max_id)
+        if experience_level:
+            clauses.append("experience_level = ?")
+            params.append(experience_level)
+        if industry:
+            clauses.append("industry = ?")
+            params.append(industry)
+        if dominant_trait:
+            clauses.append("dominant_trait = ?")
+            params.append(dominant_trait)
+        for scores, operator in ((min_scores, '>'), (max_scores, '<')):
+            for trait, value in (scores or {}).items():
+                clauses.append(f"{TRAIT_COLUMNS[trait]} {operator} ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def query(self, limit=DEFAULT_PAGE_SIZE, offset=0, order_by='id', descending=True, after=None, before=None,
+              **filters):
+        """Return one page of history entries matching the filters.
+
+        Filters are experience_level, industry and dominant_trait for exact
+        matches, and min_scores / max_scores mapping trait names to exclusive
+        bounds, e.g. query(experience_level="Senior Level", industry="Tech",
+        min_scores={'Openness': 70}).
+
+        after and before take a record's sort_key(order_by) and return the
+        rows right after or right before it in this order (keyset paging),
+        which unlike a large offset does not walk the skipped rows.
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort history by {order_by!r}")
+        where, params = self._where(**filters)
+        backwards = before is not None
+        key = before if backwards else after
+        if key is not None:
+            # Row values compare like the ORDER BY, column by column
+            operator = '<' if descending != backwards else '>'
+            where = f"{where} AND" if where else " WHERE"
+            where += f" ({order_by}, id) {operator} (?, ?)"
+            params += list(key)
+        direction = "DESC" if descending != backwards else "ASC"
+        sql = (f"SELECT {RECORD_COLUMNS} FROM analyses{where} ORDER BY {order_by} {direction}, id {direction} "
+               f"LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit, offset]).fetchall()
+        if backwards:
+            rows.reverse()
+        return [HistoryRecord(row) for row in rows]
+
+    def sort_keys(self, step, order_by='id', descending=True, **filters):
+        """sort_key of every step-th matching row in this order (rows step - 1, 2 * step - 1, ...).
+
+        Passing key i - 1 as after to query() seeks straight to row i * step,
+        so a view can jump anywhere in the result after this single pass.
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort history by {order_by!r}")
+        where, params = self._where(**filters)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {order_by}, id FROM analyses{where} ORDER BY {order_by} {direction}, id {direction}"
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            return [tuple(row) for row in islice(cursor, step - 1, None, step)]
+
+    def count(self, **filters):
+        """Number of entries matching the filters"""
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM analyses{where}", params).fetchone()[0]
+
+    def matches(self, entry_id, **filters):
+        """Whether the entry with entry_id matches the query filters"""
+        where, params = self._where(**filters)
+        where = f"{where} AND id = ?" if where else " WHERE id = ?"
+        with self._lock:
+            return self._db.execute(f"SELECT 1 FROM analyses{where}", params + [entry_id]).fetchone() is not None
+
+    def get(self, entry_id):
+        """Return a single history entry or None"""
+        with self._lock:
+            row = self._db.execute(f"SELECT {RECORD_COLUMNS} FROM analyses WHERE id = ?", (entry_id,)).fetchone()
+        return HistoryRecord(row) if row else None
+
+    def iter_entries(self, batch_size=1000, after_id=0, **filters):
+        """Yield matching entries with ids above after_id oldest first, fetching batch_size rows at a time"""
+        last_id = after_id
+        where, params = self._where(**filters)
+        where = f"{where} AND id > ?" if where else " WHERE id > ?"
+        while True:
+            with self._lock:
+                rows = self._db.execute(f"SELECT {RECORD_COLUMNS} FROM analyses{where} ORDER BY id LIMIT ?",
+                                        params + [last_id, batch_size]).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield HistoryRecord(row)
+            last_id = rows[-1][0]
+
+    def render_report(self, record):
+        """Regenerate the full report for a history record from its stored scores"""
+        return self.analyzer.generate_personality_report(
+            record.personality_scores, record.experience_level,
+            record.industry, record.features or {}
+        )
+
+    def clear(self):
+        """Delete the whole history"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM analyses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,195 @@
+from tkinter import ttk
+
+# Approximate pixel heights used to work out how many rows fit in the tree
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+# Window heights of rows fetched at a time: the visible rows plus a page on
+# either side, so small scrolls are drawn from memory
+CACHE_PAGES = 3
+
+# Rows between the sort keys sampled for jumping to an arbitrary offset
+SEEK_STEP = 256
+
+
+class VirtualHistoryView:
+    """Windowed view of a HistoryStore in a ttk.Treeview.
+
+    The tree only ever holds the rows that are visible.  Rows around them are
+    cached; scrolling past the cache fetches the neighbouring rows by their
+    sort key (keyset paging) instead of re-running an OFFSET query, and a
+    jump across the result seeks from sort keys sampled every SEEK_STEP rows
+    in one pass.  Sorting and filtering reload the window, and new analyses
+    are inserted at the top without touching the other rows.  The scrollbar
+    represents every matching entry in the store, not just the loaded rows.
+    """
+
+    def __init__(self, tree, scrollbar, store, sort_columns):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.store = store
+        self.sort_columns = sort_columns
+        self.filters = {}
+        self.order_by = 'id'
+        self.descending = True
+        self.offset = 0
+        self.total = 0
+        self.visible_rows = int(tree.cget('height'))
+        # Cached rows in view order, the offset of the first one, and the
+        # sampled sort keys (None until a jump needs them)
+        self._rows = []
+        self._rows_start = 0
+        self._seek_keys = None
+
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight')
+        self.row_height = int(rowheight) if rowheight else DEFAULT_ROW_HEIGHT
+
+        tree.configure(yscrollcommand='')
+        scrollbar.configure(command=self.yview)
+        for column in sort_columns:
+            tree.heading(column, command=lambda column=column: self.sort_by(column))
+        tree.bind('<Configure>', self._on_resize)
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda event: self._scroll_rows(-WHEEL_ROWS))
+        tree.bind('<Button-5>', lambda event: self._scroll_rows(WHEEL_ROWS))
+        tree.bind('<Prior>', lambda event: self._scroll_rows(-self.visible_rows))
+        tree.bind('<Next>', lambda event: self._scroll_rows(self.visible_rows))
+
+    def selected_ids(self):
+        """Store ids of the selected rows"""
+        return [int(item) for item in self.tree.selection()]
+
+    def set_filters(self, **filters):
+        """Show only entries matching HistoryStore.query filters"""
+        self.filters = {key: value for key, value in filters.items() if value}
+        self.offset = 0
+        self.refresh(recount=True)
+
+    def sort_by(self, column):
+        """Sort by a tree column, toggling the direction on repeated clicks"""
+        order_by = self.sort_columns[column]
+        if order_by == self.order_by:
+            self.descending = not self.descending
+        else:
+            self.order_by = order_by
+            self.descending = order_by in ('id', 'timestamp')
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self, recount=False):
+        """Reload the visible window from the store"""
+        if recount:
+            self.total = self.store.count(**self.filters)
+        self._rows = []
+        self._seek_keys = None
+        self._show()
+
+    def _show(self):
+        """Draw the window at offset, fetching rows only when the cache does not cover it"""
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+        end = min(self.offset + self.visible_rows, self.total)
+        if not self._rows_start <= self.offset or end > self._rows_start + len(self._rows):
+            self._fetch()
+        start = self.offset - self._rows_start
+        self.tree.delete(*self.tree.get_children())
+        for entry in self._rows[start:start + self.visible_rows]:
+            self.tree.insert('', 'end', iid=str(entry.id), values=self.row_values(entry))
+        self._update_scrollbar()
+
+    def _query(self, **options):
+        return self.store.query(order_by=self.order_by, descending=self.descending, **options, **self.filters)
+
+    def _fetch(self):
+        page = self.visible_rows
+        cached_end = self._rows_start + len(self._rows)
+        if self._rows and self._rows_start <= self.offset <= cached_end:
+            # Scrolled down past the cache: continue after its last row
+            rows = self._query(limit=CACHE_PAGES * page, after=self._rows[-1].sort_key(self.order_by))
+            keep_from = max(0, self.offset - page - self._rows_start)
+            self._rows = self._rows[keep_from:] + rows
+            self._rows_start += keep_from
+        elif self._rows and self.offset < self._rows_start <= self.offset + page:
+            # Scrolled up past the cache: continue before its first row
+            start = max(0, self.offset - page)
+            rows = self._query(limit=self._rows_start - start, before=self._rows[0].sort_key(self.order_by))
+            self._rows = rows + self._rows[:self.offset + 2 * page - self._rows_start]
+            self._rows_start -= len(rows)
+        else:
+            start = max(0, self.offset - page)
+            self._rows = self._seek(start, CACHE_PAGES * page)
+            self._rows_start = start
+
+    def _seek(self, start, limit):
+        """Rows from offset start on, walking at most SEEK_STEP rows past a sampled key"""
+        step = start // SEEK_STEP
+        if not step:
+            return self._query(limit=limit, offset=start)
+        if self._seek_keys is None:
+            self._seek_keys = self.store.sort_keys(SEEK_STEP, order_by=self.order_by,
+                                                   descending=self.descending, **self.filters)
+        if step > len(self._seek_keys):
+            return self._query(limit=limit, offset=start)
+        return self._query(limit=limit, offset=start - step * SEEK_STEP, after=self._seek_keys[step - 1])
+
+    def entry_added(self, entry_id):
+        """Show a newly stored entry, touching as few rows as possible"""
+        if not self.store.matches(entry_id, **self.filters):
+            return
+        self.total += 1
+        if self.order_by != 'id' or not self.descending or self.offset:
+            # The new row lands somewhere inside the sorted result set
+            self.refresh()
+            return
+
+        entry = self.store.get(entry_id)
+        # The new row shifts every offset by one
+        self._seek_keys = None
+        if self._rows_start == 0:
+            self._rows.insert(0, entry)
+            del self._rows[CACHE_PAGES * self.visible_rows:]
+        else:
+            self._rows = []
+        self.tree.insert('', 0, iid=str(entry_id), values=self.row_values(entry))
+        children = self.tree.get_children()
+        if len(children) > self.visible_rows:
+            self.tree.delete(*children[self.visible_rows:])
+        self._update_scrollbar()
+
+    def row_values(self, entry):
+        return (entry.timestamp, entry.experience_level,
+                entry.industry, entry.dominant_label)
+
+    def yview(self, *args):
+        """Scrollbar command mapping scroll positions onto store offsets"""
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.offset += amount * step
+        self._show()
+
+    def _scroll_rows(self, rows):
+        self.offset += rows
+        self._show()
+        return 'break'
+
+    def _on_mousewheel(self, event):
+        return self._scroll_rows(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_resize(self, event):
+        visible_rows = max(1, (event.height - HEADING_HEIGHT) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._show()
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.scrollbar.set(0, 1)
+            return
+        first = self.offset / self.total
+        last = min(1.0, (self.offset + self.visible_rows) / self.total)
+        self.scrollbar.set(first, last)
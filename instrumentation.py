@@ -0,0 +1,289 @@
+import bisect
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import deque
+
+import streaming_analyzer
+from personality_analyzer import ANALYSIS_STAGES
+
+# Stage timed before feature extraction, when the text is lowercased and
+# scanned for keywords; 'Extracting features' then only covers tokenization
+SCAN_STAGE = 'Scanning keywords'
+
+# Stage of file analyses, which read the file, scan it for keywords and
+# extract its features chunk by chunk in one streaming pass
+STREAM_STAGE = 'Streaming file'
+REPORT_STAGE = ANALYSIS_STAGES[-1]
+
+# Stages in the order they run, as shown in timing breakdowns
+TIMED_STAGES = (SCAN_STAGE, STREAM_STAGE) + ANALYSIS_STAGES
+
+# Lines of profiler output kept for each slow document
+PROFILE_LINES = 25
+
+
+class Histogram:
+    """Histogram of positive values in logarithmic buckets.
+
+    Bucket i counts values up to base * 2**i, so a fixed number of buckets
+    covers microseconds to minutes (or characters to gigabytes) in constant
+    memory.  Percentiles are estimated from bucket upper bounds.
+    """
+
+    def __init__(self, base=1e-6, buckets=40):
+        self.bounds = [base * 2 ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Estimated value below which fraction of the observations fall"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Summary of the histogram as a dict"""
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class SlowDocument:
+    """cProfile capture of an analysis that exceeded the slow threshold"""
+
+    def __init__(self, characters, seconds, profile_text):
+        self.characters = characters
+        self.seconds = seconds
+        self.profile_text = profile_text
+
+
+class _RunTimer:
+    """Stage durations of one analysis, taken from its progress callbacks"""
+
+    def __init__(self, progress=None):
+        self._progress = progress
+        self.stages = {}
+        self._stage = None
+        self._started = time.perf_counter()
+
+    def progress(self, stage):
+        """Progress callback for the analyzer, forwarded to the caller's one"""
+        self.mark(stage)
+        self.forward(stage)
+
+    def forward(self, stage):
+        """Progress callback that only forwards, leaving the current stage running"""
+        if self._progress:
+            self._progress(stage)
+
+    def mark(self, stage):
+        """End the current stage and start timing stage"""
+        now = time.perf_counter()
+        if self._stage is not None:
+            self.stages[self._stage] = self.stages.get(self._stage, 0) + now - self._started
+        self._stage = stage
+        self._started = now
+
+    def finish(self):
+        self.mark(None)
+        return self.stages
+
+
+class Instrumentation:
+    """Opt-in timing of PersonalityAnalyzer calls.
+
+    Assign an instance to analyzer.instrumentation to enable it and set that
+    back to None to disable it; disabled analyzers only pay one attribute
+    check per call.  Every analysis records its stage durations, input size
+    and keyword and word totals into histograms and counters.
+
+    Hooks are called with (kind, name, value) for every observation, where
+    kind is 'timing' (seconds), 'size' (characters) or 'count', so they can
+    forward measurements to any metrics sink.  With a profile_threshold,
+    every analysis runs under cProfile and the profiles of those slower than
+    that many seconds are kept in profiles; profiling slows the analyses
+    down, their timings included.
+    """
+
+    def __init__(self, profile_threshold=None, max_profiles=10):
+        self.profile_threshold = profile_threshold
+        self.profiles = deque(maxlen=max_profiles)
+        self.hooks = []
+        self.histograms = {stage: Histogram() for stage in TIMED_STAGES}
+        self.histograms['Total'] = Histogram()
+        self.histograms['Characters'] = Histogram(base=1)
+        self.counters = {'analyses': 0, 'reports': 0, 'characters': 0, 'words': 0,
+                         'keyword_hits': 0, 'slow_documents': 0}
+        self.runs = 0
+        self._last_run = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Call hook(kind, name, value) for every observation"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def analyze(self, analyzer, text, progress=None):
+        """Timed equivalent of analyzer.analyze"""
+        run = _RunTimer(progress)
+        (counts, result), profiler = self._call(self._analyze_text, analyzer, text, run)
+        stages = run.finish()
+        self._record(stages, result, len(text), counts)
+        self._keep_profile(profiler, len(text), stages)
+        return result
+
+    def _analyze_text(self, analyzer, text, run):
+        run.mark(SCAN_STAGE)
+        # analyze reuses this scan, so its cost is measured on its own here
+        counts = analyzer.scan_text(text)[1]
+        return counts, analyzer._analyze(text, run.progress)
+
+    def analyze_counts(self, analyzer, counts, features, progress=None):
+        """Timed equivalent of analyzer.analyze_counts"""
+        run = _RunTimer(progress)
+        result, profiler = self._call(analyzer._analyze_counts, counts, features, run.progress)
+        stages = run.finish()
+        self._record(stages, result, None, counts)
+        self._keep_profile(profiler, None, stages)
+        return result
+
+    def analyze_file(self, analyzer, path, encoding='utf-8', errors='strict',
+                     chunk_size=streaming_analyzer.DEFAULT_CHUNK_SIZE, progress=None):
+        """Timed equivalent of streaming_analyzer.analyze_file"""
+        run = _RunTimer(progress)
+        (counts, characters, result), profiler = self._call(
+            self._analyze_file, analyzer, path, encoding, errors, chunk_size, run)
+        stages = run.finish()
+        self._record(stages, result, characters, counts)
+        self._keep_profile(profiler, characters, stages)
+        return result
+
+    def _analyze_file(self, analyzer, path, encoding, errors, chunk_size, run):
+        run.mark(STREAM_STAGE)
+        features, counts, characters = streaming_analyzer.extract_file_features(
+            analyzer, path, encoding, errors, chunk_size, run.forward)
+        return counts, characters, analyzer._analyze_counts(counts, features, run.progress)
+
+    def _call(self, function, *args):
+        """Return (function(*args), profiler), profiling the call when slow analyses are kept"""
+        if self.profile_threshold is None:
+            return function(*args), None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running (one per process since Python 3.12)
+            return function(*args), None
+        try:
+            return function(*args), profiler
+        finally:
+            profiler.disable()
+
+    def generate_report(self, analyzer, scores, experience_level, industry, features):
+        """Timed equivalent of analyzer.generate_personality_report"""
+        start = time.perf_counter()
+        report = analyzer._generate_report(scores, experience_level, industry, features)
+        seconds = time.perf_counter() - start
+
+        with self._lock:
+            self.histograms[REPORT_STAGE].observe(seconds)
+            self.counters['reports'] += 1
+            if REPORT_STAGE not in self._last_run:
+                # Reports follow the analysis they describe
+                self._last_run = dict(self._last_run, **{REPORT_STAGE: seconds})
+        self._emit([('timing', REPORT_STAGE, seconds), ('count', 'reports', 1)])
+        return report
+
+    def _record(self, stages, result, characters, counts):
+        features = result['features']
+        observations = [('timing', stage, seconds) for stage, seconds in stages.items()]
+        observations.append(('timing', 'Total', sum(stages.values())))
+        observations.append(('count', 'analyses', 1))
+        observations.append(('count', 'words', features['total_words']))
+        observations.append(('count', 'keyword_hits', sum(counts.values())))
+        if characters is not None:
+            observations.append(('size', 'Characters', characters))
+            observations.append(('count', 'characters', characters))
+
+        with self._lock:
+            for kind, name, value in observations:
+                if kind == 'count':
+                    self.counters[name] += value
+                else:
+                    self.histograms[name].observe(value)
+            self.runs += 1
+            self._last_run = dict(stages)
+        self._emit(observations)
+
+    def _emit(self, observations):
+        for hook in list(self.hooks):
+            for kind, name, value in observations:
+                hook(kind, name, value)
+
+    def _keep_profile(self, profiler, characters, stages):
+        """Keep the profile of an analysis that reached the slow threshold"""
+        seconds = sum(stages.values())
+        if profiler is None or seconds < self.profile_threshold:
+            return
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        with self._lock:
+            self.profiles.append(SlowDocument(characters, seconds, output.getvalue()))
+            self.counters['slow_documents'] += 1
+
+    def profile(self, analyzer, text):
+        """Run one analysis of text under cProfile and return its pstats.Stats"""
+        # Forget the memoized scan so the keyword scan is part of the profile
+        analyzer._last_scan = (None, None, None)
+        profiler = cProfile.Profile()
+        profiler.runcall(analyzer._analyze, text)
+        return pstats.Stats(profiler)
+
+    def last_run(self):
+        """Stage durations in seconds of the most recent analysis, in stage order"""
+        with self._lock:
+            return {stage: self._last_run[stage] for stage in TIMED_STAGES if stage in self._last_run}
+
+    def snapshot(self):
+        """Histogram summaries and counter totals as a dict"""
+        with self._lock:
+            return {
+                'histograms': {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+                'counters': dict(self.counters),
+                'runs': self.runs,
+            }
+
+
+def format_breakdown(stages):
+    """Short one-line timing breakdown such as 'Scanning keywords 1.2 ms | ...'"""
+    parts = [f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in stages.items()]
+    parts.append(f"total {sum(stages.values()) * 1000:.1f} ms")
+    return " | ".join(parts)
@@ -0,0 +1,184 @@
+from collections import deque
+from itertools import compress
+
+
+def _is_word_char(ch):
+    """Match the definition of \\w used by the re module for str patterns"""
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that counts many keywords in a single pass.
+
+    By default counts follow ``str.count`` semantics for every keyword: each
+    keyword is counted as a substring, non-overlapping with itself, scanning
+    left to right.  Different keywords may overlap each other, exactly as if
+    ``text.count(keyword)`` had been called once per keyword.
+
+    With ``word_boundary=True`` a keyword is only counted when it is neither
+    preceded nor followed by a word character, so 'art' no longer matches
+    inside 'start'.
+    """
+
+    def __init__(self, keywords, word_boundary=False):
+        self.word_boundary = word_boundary
+        self.keywords = []
+        index = {}
+        for keyword in keywords:
+            if keyword and keyword not in index:
+                index[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+        self._build(index)
+
+    def _build(self, index):
+        """Build the trie, failure links and the resolved transition table"""
+        goto = [{}]
+        outputs = [[]]
+        for keyword, keyword_id in index.items():
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].append((keyword_id, len(keyword)))
+
+        # Breadth-first pass computing failure links; every state inherits the
+        # outputs and transitions of its failure state so that scanning needs
+        # exactly one dictionary lookup per character.
+        fail = [0] * len(goto)
+        transitions = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, target in goto[state].items():
+                queue.append(target)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail_target = goto[fallback].get(ch, 0)
+                fail[target] = fail_target if fail_target != target else 0
+                outputs[target] = outputs[target] + outputs[fail[target]]
+            for ch, target in transitions[fail[state]].items():
+                transitions[state].setdefault(ch, target)
+
+        self._transitions = transitions
+        self.longest = max((len(keyword) for keyword in index), default=0)
+        self._outputs = [tuple(out) if out else None for out in outputs]
+
+    def scanner(self):
+        """Return a scanner that can be fed text incrementally"""
+        return KeywordScanner(self)
+
+    def count(self, text):
+        """Count every keyword in text and return a {keyword: count} dict"""
+        scanner = self.scanner()
+        scanner.feed(text)
+        return scanner.counts()
+
+    def count_hits(self, text):
+        """Count every keyword in text and return {keyword: count} for the ones found"""
+        scanner = self.scanner()
+        scanner.feed(text)
+        return scanner.hits()
+
+
+class KeywordScanner:
+    """Incremental scanning state for a KeywordMatcher.
+
+    Text can be fed in arbitrary pieces; keywords that span the boundary
+    between two pieces are counted exactly as if the text had been fed whole.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.state = 0
+        self.position = 0
+        self._counts = [0] * len(matcher.keywords)
+        self._last_end = [0] * len(matcher.keywords)
+        # Word boundary mode needs the character before a match and may have
+        # to wait for the character after it, which can live in the next piece.
+        self._pending = []
+        self._tail = ''
+
+    def feed(self, text):
+        """Scan the next piece of (already lowercased) text"""
+        if not text:
+            return
+        if self.matcher.word_boundary:
+            self._feed_word_boundary(text)
+            return
+
+        transitions = self.matcher._transitions
+        outputs = self.matcher._outputs
+        counts = self._counts
+        last_end = self._last_end
+        state = self.state
+        position = self.position
+        for ch in text:
+            position += 1
+            state = transitions[state].get(ch, 0)
+            found = outputs[state]
+            if found:
+                for keyword_id, length in found:
+                    if position - length >= last_end[keyword_id]:
+                        counts[keyword_id] += 1
+                        last_end[keyword_id] = position
+        self.state = state
+        self.position = position
+
+    def _feed_word_boundary(self, text):
+        transitions = self.matcher._transitions
+        outputs = self.matcher._outputs
+        state = self.state
+        position = self.position
+        # The retained tail is always long enough to hold the character just
+        # before any match that ends in this piece.
+        window = self._tail + text
+        offset = position - len(self._tail)
+        for ch in text:
+            if self._pending:
+                self._resolve_pending(not _is_word_char(ch))
+            position += 1
+            state = transitions[state].get(ch, 0)
+            found = outputs[state]
+            if found:
+                for keyword_id, length in found:
+                    start = position - length
+                    if start == 0 or not _is_word_char(window[start - offset - 1]):
+                        self._pending.append((keyword_id, start, position))
+        self.state = state
+        self.position = position
+        longest = self.matcher.longest
+        self._tail = window[-longest:] if longest else ''
+
+    def _resolve_pending(self, boundary_follows, counts=None, last_end=None):
+        """Count matches that were waiting on the character following them"""
+        counts = self._counts if counts is None else counts
+        last_end = self._last_end if last_end is None else last_end
+        if boundary_follows:
+            for keyword_id, start, end in self._pending:
+                if start >= last_end[keyword_id]:
+                    counts[keyword_id] += 1
+                    last_end[keyword_id] = end
+        if counts is self._counts:
+            self._pending = []
+
+    def _totals(self):
+        counts = self._counts
+        if self._pending:
+            # End of input is a word boundary, but more text may still be fed,
+            # so resolve pending matches against copies of the counters.
+            counts = list(counts)
+            self._resolve_pending(True, counts, list(self._last_end))
+        return counts
+
+    def counts(self):
+        """Return the {keyword: count} dict for all text fed so far"""
+        return dict(zip(self.matcher.keywords, self._totals()))
+
+    def hits(self):
+        """Return {keyword: count} for the keywords found so far, skipping zero counts"""
+        totals = self._totals()
+        return dict(zip(compress(self.matcher.keywords, totals), filter(None, totals)))
@@ -0,0 +1,254 @@
+"""Lexicon files and their precompiled keyword matcher bundles.
+
+Examples:
+    python lexicon_bundle.py lexicons/default.json
+    python lexicon_bundle.py my_lexicon.json --word-boundary --output my_lexicon.pickle
+
+A lexicon is a JSON file holding the analyzer's keyword lists.  Compiling it
+builds the KeywordMatcher automaton once and pickles it together with the
+lexicon; later loads unpickle that bundle instead of rebuilding the
+automaton.  Bundles are named after the SHA-256 of the lexicon file, so an
+edited lexicon never loads a stale bundle.  Only load bundles written by this
+module into directories you trust, as unpickling can run arbitrary code.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+from keyword_matcher import KeywordMatcher
+
+# Lexicon shipped with the analyzer
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons', 'default.json')
+
+# Where compiled bundles are kept between runs
+BUNDLE_DIR = os.path.join(os.path.expanduser("~"), ".cv_analysis", "lexicons")
+
+# Bump whenever KeywordMatcher's pickled layout changes
+BUNDLE_FORMAT = 1
+
+# Keyword lists in a lexicon file; the first three are nested dicts
+LEXICON_FIELDS = (
+    'personality_keywords',
+    'experience_indicators',
+    'industries',
+    'education_keywords',
+    'achievement_keywords',
+    'leadership_keywords',
+    'collab_keywords',
+)
+
+# The scoring rules adjust these traits by name
+TRAIT_NAMES = ('Openness', 'Conscientiousness', 'Extraversion', 'Agreeableness', 'Emotional Stability')
+
+
+def _check_keywords(keywords, where):
+    if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+        raise ValueError(f"{where} must be a list of strings")
+    # The matcher skips empty keywords, which the scoring would then miss
+    if not all(keyword.strip() for keyword in keywords):
+        raise ValueError(f"{where} must not contain empty or blank keywords")
+
+
+def _check_object(value, where):
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be a JSON object")
+
+
+def parse_lexicon(data):
+    """Parse and validate lexicon JSON, raising ValueError when malformed"""
+    lexicon = json.loads(data)
+    if not isinstance(lexicon, dict):
+        raise ValueError("lexicon must be a JSON object")
+    missing = [field for field in LEXICON_FIELDS if field not in lexicon]
+    if missing:
+        raise ValueError(f"lexicon is missing {', '.join(missing)}")
+
+    for field in LEXICON_FIELDS[:3]:
+        _check_object(lexicon[field], field)
+    if set(lexicon['personality_keywords']) != set(TRAIT_NAMES):
+        raise ValueError(f"personality_keywords must have exactly the traits {', '.join(TRAIT_NAMES)}")
+    for trait, keywords in lexicon['personality_keywords'].items():
+        if not isinstance(keywords, dict) or set(keywords) != {'high', 'low'}:
+            raise ValueError(f"personality_keywords.{trait} must have exactly 'high' and 'low' lists")
+        _check_keywords(keywords['high'], f"personality_keywords.{trait}.high")
+        _check_keywords(keywords['low'], f"personality_keywords.{trait}.low")
+    if set(lexicon['experience_indicators']) != {'senior', 'mid', 'junior'}:
+        raise ValueError("experience_indicators must have exactly 'senior', 'mid' and 'junior'")
+    for field in ('experience_indicators', 'industries'):
+        if not lexicon[field]:
+            raise ValueError(f"{field} must not be empty")
+        for name, keywords in lexicon[field].items():
+            _check_keywords(keywords, f"{field}.{name}")
+    for field in LEXICON_FIELDS[3:]:
+        _check_keywords(lexicon[field], field)
+    return {field: lexicon[field] for field in LEXICON_FIELDS}
+
+
+def lexicon_keywords(lexicon):
+    """Every keyword of a lexicon, in the order the analyzer has always used"""
+    keywords = []
+    for trait_keywords in lexicon['personality_keywords'].values():
+        keywords.extend(trait_keywords['high'])
+        keywords.extend(trait_keywords['low'])
+    for indicators in lexicon['experience_indicators'].values():
+        keywords.extend(indicators)
+    for industry_keywords in lexicon['industries'].values():
+        keywords.extend(industry_keywords)
+    for field in LEXICON_FIELDS[3:]:
+        keywords.extend(lexicon[field])
+    return keywords
+
+
+class LexiconBundle:
+    """A parsed lexicon with its compiled keyword matcher"""
+
+    def __init__(self, lexicon, matcher, source_digest, source_path=None):
+        self.lexicon = lexicon
+        self.matcher = matcher
+        self.source_digest = source_digest
+        self.source_path = source_path
+
+    @property
+    def word_boundary(self):
+        return self.matcher.word_boundary
+
+
+def bundle_path_for(source_digest, word_boundary, bundle_dir=BUNDLE_DIR):
+    mode = 'words' if word_boundary else 'substrings'
+    return os.path.join(bundle_dir, f"lexicon-{source_digest[:32]}-{mode}-v{BUNDLE_FORMAT}.pickle")
+
+
+def compile_lexicon(data, word_boundary=False, source_path=None):
+    """Build a bundle from lexicon file contents"""
+    lexicon = parse_lexicon(data)
+    matcher = KeywordMatcher(lexicon_keywords(lexicon), word_boundary=word_boundary)
+    return LexiconBundle(lexicon, matcher, hashlib.sha256(data).hexdigest(), source_path)
+
+
+def save_bundle(bundle, path):
+    """Pickle a bundle, replacing any existing file atomically"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    state = {
+        'format': BUNDLE_FORMAT,
+        'source_digest': bundle.source_digest,
+        'lexicon': bundle.lexicon,
+        'matcher': bundle.matcher,
+    }
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_bundle(path, source_path=None):
+    """Unpickle a bundle written by save_bundle"""
+    with open(path, 'rb') as file:
+        state = pickle.load(file)
+    if state.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{path} has bundle format {state.get('format')}, expected {BUNDLE_FORMAT}")
+    return LexiconBundle(state['lexicon'], state['matcher'], state['source_digest'], source_path)
+
+
+def load_bundle(path=DEFAULT_LEXICON_PATH, word_boundary=False, bundle_dir=BUNDLE_DIR):
+    """Load the compiled bundle for a lexicon file, compiling it when needed"""
+    with open(path, 'rb') as file:
+        data = file.read()
+    source_digest = hashlib.sha256(data).hexdigest()
+    compiled_path = bundle_path_for(source_digest, word_boundary, bundle_dir)
+    try:
+        bundle = read_bundle(compiled_path, path)
+        if bundle.source_digest == source_digest and bundle.word_boundary == word_boundary:
+            return bundle
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    bundle = compile_lexicon(data, word_boundary, path)
+    try:
+        save_bundle(bundle, compiled_path)
+    except OSError:
+        # A read-only home directory only costs the compile on every start
+        pass
+    return bundle
+
+
+class LexiconWatcher:
+    """Detect changes to a lexicon file and load the new bundle.
+
+    check() only stats the file unless it changed, so it is cheap enough to
+    call from a periodic timer.  The caller swaps in the returned bundle.
+    """
+
+    def __init__(self, path, word_boundary=False, source_digest=None, bundle_dir=BUNDLE_DIR):
+        self.path = path
+        self.word_boundary = word_boundary
+        self.bundle_dir = bundle_dir
+        self.source_digest = source_digest
+        self.error = None
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def check(self):
+        """Return a new bundle if the file changed since the last check, else None.
+
+        A lexicon that fails to load leaves the current one in use; the error
+        message is kept in self.error until a later load succeeds.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            bundle = load_bundle(self.path, self.word_boundary, self.bundle_dir)
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            return None
+        self.error = None
+        if bundle.source_digest == self.source_digest:
+            return None
+        self.source_digest = bundle.source_digest
+        return bundle
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a lexicon file into a keyword matcher bundle")
+    parser.add_argument('lexicon', nargs='?', default=DEFAULT_LEXICON_PATH,
+                        help="lexicon JSON file (default: the bundled lexicons/default.json)")
+    parser.add_argument('--word-boundary', action='store_true',
+                        help="compile for whole-word keyword matching")
+    parser.add_argument('--output', '-o',
+                        help=f"bundle file to write (default: a content-addressed file in {BUNDLE_DIR})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.lexicon, 'rb') as file:
+        data = file.read()
+    try:
+        bundle = compile_lexicon(data, args.word_boundary, args.lexicon)
+    except ValueError as e:
+        print(f"{args.lexicon}: {e}", file=sys.stderr)
+        return 1
+    output = args.output or bundle_path_for(bundle.source_digest, args.word_boundary)
+    save_bundle(bundle, output)
+    print(f"Compiled {len(bundle.matcher.keywords)} keywords to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
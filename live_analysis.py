@@ -0,0 +1,121 @@
+import re
+from collections import Counter
+
+_WORD = re.compile(r'\b\w+\b')
+_SENTENCE_END = re.compile(r'[.!?]+')
+_CAPITAL_WORD = re.compile(r'\b[A-Z]{2,}\b')
+_NUMBER = re.compile(r'\b\d+\b')
+
+# Per-line totals kept next to the keyword hits and words of each line
+_TOTALS = ('word_length', 'sentence_count', 'exclamation_count', 'question_count',
+           'capital_words', 'numbers_count')
+
+
+def changed_range(old, new):
+    """Return (start, old_stop, new_stop) so that old[start:old_stop] became new[start:new_stop]"""
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return start, len(old) - end, len(new) - end
+
+
+class LiveAnalysis:
+    """Analysis of text being edited, kept up to date line by line.
+
+    Every line keeps its own keyword hits, words and feature totals.  Each
+    update diffs the new text against the previous one by lines, subtracts
+    the lines that changed and adds their replacements, so an edit costs a
+    rescan of the edited lines only.  No keyword or feature pattern can match
+    across a newline, which makes the line totals add up to exactly what
+    analyzer.analyze reports for the whole text.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        matcher = analyzer.keyword_matcher
+        # A lexicon with multi-line keywords is rescanned whole on every update
+        self._by_line = not any('\n' in keyword for keyword in matcher.keywords)
+        self._lines = []
+        self._stats = []
+        self.counts = Counter()
+        self._word_counts = Counter()
+        self._total_words = 0
+        self._totals = dict.fromkeys(_TOTALS, 0)
+        self.rescanned = 0
+
+    def update(self, text):
+        """Bring the analysis up to date with text and return the analysis result"""
+        lines = text.split('\n') if self._by_line else [text]
+        start, old_stop, new_stop = changed_range(self._lines, lines)
+        for stats in self._stats[start:old_stop]:
+            self._apply(stats, -1)
+        added = [self._line_stats(line) for line in lines[start:new_stop]]
+        for stats in added:
+            self._apply(stats, 1)
+        self._stats[start:old_stop] = added
+        self._lines = lines
+        self.rescanned = new_stop - start
+        return self.result()
+
+    def _line_stats(self, line):
+        line_lower = line.lower()
+        words = _WORD.findall(line_lower)
+        totals = (
+            sum(len(word) for word in words),
+            len(_SENTENCE_END.findall(line)),
+            line.count('!'),
+            line.count('?'),
+            len(_CAPITAL_WORD.findall(line)),
+            len(_NUMBER.findall(line)),
+        )
+        return self.analyzer.keyword_matcher.count_hits(line_lower), words, totals
+
+    def _apply(self, stats, sign):
+        hits, words, totals = stats
+        counts = self.counts
+        for keyword, count in hits.items():
+            counts[keyword] += sign * count
+
+        word_counts = self._word_counts
+        if sign > 0:
+            word_counts.update(words)
+        else:
+            for word in words:
+                remaining = word_counts[word] - 1
+                if remaining:
+                    word_counts[word] = remaining
+                else:
+                    del word_counts[word]
+        self._total_words += sign * len(words)
+        for name, value in zip(_TOTALS, totals):
+            self._totals[name] += sign * value
+
+    def features(self):
+        """Text features of the current text, as extract_text_features computes them"""
+        total_words = self._total_words
+        features = {
+            'total_words': total_words,
+            'unique_words': len(self._word_counts),
+            'avg_word_length': self._totals['word_length'] / total_words if total_words else 0,
+        }
+        for name in _TOTALS[1:]:
+            features[name] = self._totals[name]
+        self.analyzer.add_keyword_features(features, self.counts)
+        return features
+
+    def result(self):
+        """Analysis result of the current text, without the report"""
+        analyzer = self.analyzer
+        features = self.features()
+        personality_scores = analyzer.scores_from_counts(self.counts, features)
+        return {
+            'personality_scores': personality_scores,
+            'experience_level': analyzer.experience_level_from_counts(self.counts),
+            'industry': analyzer.industry_from_counts(self.counts),
+            'dominant_trait': max(personality_scores, key=personality_scores.get),
+            'features': features,
+        }
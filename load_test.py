@@ -0,0 +1,115 @@
+"""Load test for scoring_service.py with a synthetic resume corpus.
+
+Examples:
+    python load_test.py --requests 2000 --concurrency 32
+    python load_test.py --port 8080 --bulk 16 --requests 200
+
+Every request carries a distinct generated resume so worker caches never
+hit.  Prints throughput, latency percentiles and the number of requests the
+service rejected because its queue was full.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmark import generate_corpus
+from personality_analyzer import PersonalityAnalyzer
+from scoring_service import DEFAULT_PORT
+
+
+async def post_json(reader, writer, host, path, payload):
+    """Send one keep-alive POST and return (status, decoded JSON body)"""
+    body = json.dumps(payload).encode('utf-8')
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_client(host, port, payloads, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path, payload in payloads:
+            start = time.perf_counter()
+            status, _ = await post_json(reader, writer, host, path, payload)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, corpus, concurrency, bulk):
+    if bulk > 1:
+        payloads = [('/analyze/batch', {'texts': corpus[i:i + bulk]}) for i in range(0, len(corpus), bulk)]
+    else:
+        payloads = [('/analyze', {'text': text}) for text in corpus]
+    iterator = iter(payloads)
+    latencies = []
+    statuses = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, iterator, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    response = await reader.read()
+    writer.close()
+    metrics = json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+    latencies.sort()
+    return {
+        'requests': len(payloads),
+        'texts': len(corpus),
+        'seconds': elapsed,
+        'requests_per_second': len(payloads) / elapsed,
+        'texts_per_second': len(corpus) / elapsed,
+        'latency_p50_ms': statistics.median(latencies) * 1000,
+        'latency_p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'statuses': statuses,
+        'service': {name: metrics[name] for name in ('workers', 'batches', 'rejected')},
+        'mean_batch_size': metrics['batch_size']['mean'],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the resume scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--requests', type=int, default=1000, help="resumes to send (default: 1000)")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="simultaneous connections (default: 16)")
+    parser.add_argument('--bulk', type=int, default=1,
+                        help="resumes per request; above 1 uses /analyze/batch (default: 1)")
+    parser.add_argument('--words', type=int, default=400, help="words per resume (default: 400)")
+    parser.add_argument('--seed', type=int, default=1, help="corpus random seed (default: 1)")
+    args = parser.parse_args(argv)
+    if min(args.requests, args.concurrency, args.bulk, args.words) < 1:
+        parser.error("--requests, --concurrency, --bulk and --words must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = generate_corpus(PersonalityAnalyzer(), args.requests, args.words, seed=args.seed)
+    summary = asyncio.run(run_load(args.host, args.port, corpus, args.concurrency, args.bulk))
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH index.
+
+A resume is reduced to the set of its word shingles (runs of consecutive
+words as tokenized by PersonalityAnalyzer.tokenize) and summarized by a
+MinHash signature, whose agreement with another signature estimates the
+Jaccard similarity of the two shingle sets.  The LSH index splits
+signatures into bands and stores one bucket per band in SQLite, so a lookup
+costs a fixed number of indexed queries no matter how many resumes are
+indexed; only resumes sharing a bucket are compared.  Requires NumPy.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+# Words per shingle; light edits change only the shingles that overlap them
+DEFAULT_SHINGLE_SIZE = 5
+
+# Signature length, split into bands of rows.  Pairs of similarity s share
+# at least one bucket with probability 1 - (1 - s**4)**32 for 32 bands of 4
+# rows: 0.9998 or more from 0.7 up, so near-duplicates at the 0.8 threshold
+# are practically never missed, while pairs below 0.3 are compared less than
+# a quarter of the time
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+
+# Estimated Jaccard similarity at which two resumes count as near-duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# Signature values are the top 32 bits of 64-bit multiply-shift hashes
+SIGNATURE_DTYPE = np.uint32
+_HASH_SHIFT = np.uint64(32)
+
+
+class MinHasher:
+    """Compute MinHash signatures of word shingle sets"""
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64 with odd a, keeping the
+        # high bits; uint64 arithmetic wraps around, which is the mod
+        self._a = rng.randint(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingles(self, words):
+        """Distinct shingles of words; short texts form a single shingle"""
+        size = self.shingle_size
+        if len(words) <= size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def signature(self, words):
+        """MinHash signature of a word list, or None when it has no words"""
+        shingles = self.shingles(words)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8', 'surrogatepass')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        permuted = (self._a * hashes + self._b) >> _HASH_SHIFT
+        return permuted.min(axis=1).astype(SIGNATURE_DTYPE)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """Persistent LSH index of MinHash signatures keyed by integer ids.
+
+    Ids are chosen by the caller, e.g. HistoryStore entry ids, so a match can
+    link straight to the earlier result.  The hashing parameters are stored
+    with the index and must match when it is reopened.
+    """
+
+    def __init__(self, path, hasher=None, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError(f"{bands} bands do not divide {self.hasher.num_perm} permutations")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.threshold = threshold
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        parameters = {
+            'num_perm': str(self.hasher.num_perm),
+            'shingle_size': str(self.hasher.shingle_size),
+            'seed': str(self.hasher.seed),
+            'bands': str(self.bands),
+        }
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS parameters (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS signatures (id INTEGER PRIMARY KEY, signature BLOB NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS buckets "
+                             "(band INTEGER NOT NULL, bucket INTEGER NOT NULL, id INTEGER NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_buckets_band_bucket ON buckets (band, bucket)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_buckets_id ON buckets (id)")
+            stored = dict(self._db.execute("SELECT name, value FROM parameters"))
+            if stored and stored != parameters:
+                if dict(stored, bands=None) != dict(parameters, bands=None):
+                    raise ValueError(f"{self.path} was built with different MinHash parameters {stored}")
+                # Only the banding differs, which the stored signatures can be rebucketed for
+                self._rebucket()
+            self._db.executemany("INSERT OR REPLACE INTO parameters (name, value) VALUES (?, ?)",
+                                 parameters.items())
+
+    def _rebucket(self):
+        """Rebuild every bucket from the stored signatures"""
+        self._db.execute("DELETE FROM buckets")
+        for entry_id, signature in self._db.execute("SELECT id, signature FROM signatures").fetchall():
+            signature = np.frombuffer(signature, dtype=SIGNATURE_DTYPE)
+            self._db.executemany("INSERT INTO buckets (band, bucket, id) VALUES (?, ?, ?)",
+                                 [(band, bucket, entry_id) for band, bucket in self._buckets(signature)])
+
+    def signature(self, words):
+        return self.hasher.signature(words)
+
+    def _buckets(self, signature):
+        """One 64-bit bucket key per band of the signature"""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, 'little', signed=True)))
+        return keys
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def add(self, entry_id, signature):
+        """Index a signature under entry_id, replacing any earlier one"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM buckets WHERE id = ?", (entry_id,))
+            self._db.execute("INSERT OR REPLACE INTO signatures (id, signature) VALUES (?, ?)",
+                             (entry_id, signature.astype(SIGNATURE_DTYPE).tobytes()))
+            self._db.executemany("INSERT INTO buckets (band, bucket, id) VALUES (?, ?, ?)",
+                                 [(band, bucket, entry_id) for band, bucket in self._buckets(signature)])
+
+    def query(self, signature, threshold=None, limit=5):
+        """Return up to limit (entry id, similarity) pairs at or above threshold, best first"""
+        threshold = self.threshold if threshold is None else threshold
+        buckets = self._buckets(signature)
+        with self._lock:
+            candidates = set()
+            for band, bucket in buckets:
+                candidates.update(entry_id for entry_id, in self._db.execute(
+                    "SELECT id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+            rows = []
+            for entry_id in candidates:
+                row = self._db.execute("SELECT signature FROM signatures WHERE id = ?", (entry_id,)).fetchone()
+                if row is not None:
+                    rows.append((entry_id, np.frombuffer(row[0], dtype=SIGNATURE_DTYPE)))
+
+        matches = [(entry_id, similarity(signature, stored)) for entry_id, stored in rows]
+        matches = [match for match in matches if match[1] >= threshold]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+    def find(self, signature, threshold=None):
+        """Return the most similar (entry id, similarity) or None"""
+        matches = self.query(signature, threshold, limit=1)
+        return matches[0] if matches else None
+
+    def remove(self, entry_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM buckets WHERE id = ?", (entry_id,))
+            self._db.execute("DELETE FROM signatures WHERE id = ?", (entry_id,))
+
+    def clear(self):
+        """Forget every indexed signature"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM buckets")
+            self._db.execute("DELETE FROM signatures")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,338 @@
+import hashlib
+import json
+import re
+
+from lexicon_bundle import DEFAULT_LEXICON_PATH, lexicon_keywords, load_bundle
+
+# Bump whenever the scoring rules change so cached results are invalidated
+SCORING_VERSION = 1
+
+# Pipeline stages in order, as reported to progress callbacks
+ANALYSIS_STAGES = (
+    'Extracting features',
+    'Calculating personality scores',
+    'Determining experience level',
+    'Identifying industry',
+    'Generating report',
+)
+
+
+class PersonalityAnalyzer:
+    def __init__(self, word_boundary=False, lexicon_path=None, bundle=None):
+        """Load the analyzer's lexicon.
+        
+        bundle is an already loaded lexicon_bundle.LexiconBundle; otherwise
+        the lexicon file at lexicon_path (the bundled default lexicon if None)
+        is loaded for the given keyword matching mode.
+        """
+        # Big Five personality traits
+        self.traits = {
+            'Openness': 0,
+            'Conscientiousness': 0, 
+            'Extraversion': 0,
+            'Agreeableness': 0,
+            'Emotional Stability': 0
+        }
+        
+        # Keyword lists come from a lexicon file compiled together with the
+        # automaton that counts every keyword in a single scan
+        if bundle is None:
+            bundle = load_bundle(lexicon_path or DEFAULT_LEXICON_PATH, word_boundary)
+        self.lexicon_bundle = bundle
+        lexicon = bundle.lexicon
+        self.personality_keywords = lexicon['personality_keywords']
+        self.experience_indicators = lexicon['experience_indicators']
+        self.industries = lexicon['industries']
+        self.education_keywords = lexicon['education_keywords']
+        self.achievement_keywords = lexicon['achievement_keywords']
+        self.leadership_keywords = lexicon['leadership_keywords']
+        self.collab_keywords = lexicon['collab_keywords']
+        self.keyword_matcher = bundle.matcher
+        self._last_scan = (None, None, None)
+        self.lexicon_version = self.compute_lexicon_version()
+        
+        # Set to an instrumentation.Instrumentation to time every analysis
+        self.instrumentation = None
+        
+    def compute_lexicon_version(self):
+        """Return a fingerprint of the lexicons and scoring rules"""
+        lexicon = {
+            'scoring_version': SCORING_VERSION,
+            'word_boundary': self.keyword_matcher.word_boundary,
+            'personality_keywords': self.personality_keywords,
+            'experience_indicators': self.experience_indicators,
+            'industries': self.industries,
+            'education_keywords': self.education_keywords,
+            'achievement_keywords': self.achievement_keywords,
+            'leadership_keywords': self.leadership_keywords,
+            'collab_keywords': self.collab_keywords,
+        }
+        encoded = json.dumps(lexicon, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+    
+    def all_keywords(self):
+        """Return every keyword used by the analyzer"""
+        return lexicon_keywords(self.lexicon_bundle.lexicon)
+    
+    def scan_text(self, text):
+        """Lowercase text and count all keywords, reusing the last scan for the same text"""
+        last_text, text_lower, counts = self._last_scan
+        if text is not last_text and text != last_text:
+            text_lower = text.lower()
+            counts = self.keyword_matcher.count(text_lower)
+            self._last_scan = (text, text_lower, counts)
+        return text_lower, counts
+    
+    def count_keywords(self, text):
+        """Return {keyword: count} for every analyzer keyword in text"""
+        return self.scan_text(text)[1]
+    
+    def tokenize(self, text):
+        """Return the lowercased words of text used for the word features"""
+        return re.findall(r'\b\w+\b', self.scan_text(text)[0])
+    
+    def extract_text_features(self, text):
+        """Extract various features from resume text"""
+        counts = self.count_keywords(text)
+        words = self.tokenize(text)
+        
+        features = {
+            'total_words': len(words),
+            'unique_words': len(set(words)),
+            'avg_word_length': sum(len(word) for word in words) / len(words) if words else 0,
+            'sentence_count': len(re.findall(r'[.!?]+', text)),
+            'exclamation_count': text.count('!'),
+            'question_count': text.count('?'),
+            'capital_words': len(re.findall(r'\b[A-Z]{2,}\b', text)),
+            'numbers_count': len(re.findall(r'\b\d+\b', text)),
+        }
+        
+        self.add_keyword_features(features, counts)
+        return features
+    
+    def add_keyword_features(self, features, counts):
+        """Add the keyword mention features computed from keyword counts"""
+        # Education indicators
+        features['education_mentions'] = sum(counts[word] for word in self.education_keywords)
+        
+        # Achievement indicators  
+        features['achievement_mentions'] = sum(counts[word] for word in self.achievement_keywords)
+        
+        # Leadership indicators
+        features['leadership_mentions'] = sum(counts[word] for word in self.leadership_keywords)
+    
+    def calculate_personality_scores(self, text, features):
+        """Calculate personality trait scores based on text analysis"""
+        return self.scores_from_counts(self.count_keywords(text), features)
+    
+    def scores_from_counts(self, counts, features):
+        """Calculate personality trait scores from keyword counts and features"""
+        scores = {}
+        
+        for trait, keywords in self.personality_keywords.items():
+            high_score = sum(counts[word] for word in keywords['high'])
+            low_score = sum(counts[word] for word in keywords['low'])
+            
+            # Base score calculation
+            base_score = (high_score - low_score) + 50  # Normalize around 50
+            
+            # Adjust based on text features
+            if trait == 'Conscientiousness':
+                # More organized language structure indicates higher conscientiousness
+                if features['avg_word_length'] > 5:
+                    base_score += 5
+                if features['achievement_mentions'] > 2:
+                    base_score += 10
+                    
+            elif trait == 'Extraversion':
+                # More social and leadership language
+                if features['leadership_mentions'] > 1:
+                    base_score += 10
+                if features['exclamation_count'] > 0:
+                    base_score += 5
+                    
+            elif trait == 'Openness':
+                # Diverse vocabulary and creative language
+                vocab_diversity = features['unique_words'] / features['total_words'] if features['total_words'] > 0 else 0
+                if vocab_diversity > 0.6:
+                    base_score += 10
+                    
+            elif trait == 'Agreeableness':
+                # Collaborative and service-oriented language
+                collab_score = sum(counts[word] for word in self.collab_keywords)
+                base_score += collab_score * 2
+                
+            elif trait == 'Emotional Stability':
+                # Consistent, calm language patterns
+                if features['sentence_count'] > 10 and features['exclamation_count'] == 0:
+                    base_score += 5
+            
+            # Normalize score to 0-100 range
+            scores[trait] = max(0, min(100, base_score))
+            
+        return scores
+    
+    def determine_experience_level(self, text):
+        """Determine experience level from resume text"""
+        return self.experience_level_from_counts(self.count_keywords(text))
+    
+    def experience_level_from_counts(self, counts):
+        """Determine experience level from keyword counts"""
+        senior_count = sum(counts[word] for word in self.experience_indicators['senior'])
+        mid_count = sum(counts[word] for word in self.experience_indicators['mid'])
+        junior_count = sum(counts[word] for word in self.experience_indicators['junior'])
+        
+        if senior_count > mid_count and senior_count > junior_count:
+            return "Senior Level"
+        elif mid_count > junior_count:
+            return "Mid Level"
+        else:
+            return "Entry Level"
+    
+    def identify_industry(self, text):
+        """Identify likely industry based on keywords"""
+        return self.industry_from_counts(self.count_keywords(text))
+    
+    def industry_from_counts(self, counts):
+        """Identify likely industry from keyword counts"""
+        industry_scores = {}
+        
+        for industry, keywords in self.industries.items():
+            score = sum(counts[word] for word in keywords)
+            industry_scores[industry] = score
+        
+        if max(industry_scores.values()) > 0:
+            return max(industry_scores, key=industry_scores.get).title()
+        return "General"
+    
+    def generate_personality_report(self, scores, experience_level, industry, features):
+        """Generate a comprehensive personality report"""
+        if self.instrumentation is not None:
+            return self.instrumentation.generate_report(self, scores, experience_level, industry, features)
+        return self._generate_report(scores, experience_level, industry, features)
+    
+    def _generate_report(self, scores, experience_level, industry, features):
+        report = []
+        report.append("=== PERSONALITY ANALYSIS REPORT ===\n")
+        
+        # Big Five Scores
+        report.append("BIG FIVE PERSONALITY TRAITS:\n")
+        for trait, score in scores.items():
+            level = "High" if score > 70 else "Moderate" if score > 40 else "Low"
+            report.append(f"• {trait}: {score:.1f}/100 ({level})")
+        
+        report.append(f"\nEXPERIENCE LEVEL: {experience_level}")
+        report.append(f"LIKELY INDUSTRY: {industry}")
+        
+        # Detailed trait interpretations
+        report.append("\n=== DETAILED TRAIT ANALYSIS ===\n")
+        
+        # Openness
+        openness = scores['Openness']
+        if openness > 70:
+            report.append("OPENNESS (High): This candidate likely enjoys new experiences, is creative and imaginative. They may thrive in roles requiring innovation and adaptability.")
+        elif openness > 40:
+            report.append("OPENNESS (Moderate): This candidate shows balanced openness to new experiences while maintaining practical focus.")
+        else:
+            report.append("OPENNESS (Low): This candidate likely prefers routine and established methods. They may excel in structured, detail-oriented roles.")
+        
+        # Conscientiousness  
+        conscientiousness = scores['Conscientiousness']
+        if conscientiousness > 70:
+            report.append("CONSCIENTIOUSNESS (High): Highly organized and reliable. Likely to meet deadlines and maintain high quality standards.")
+        elif conscientiousness > 40:
+            report.append("CONSCIENTIOUSNESS (Moderate): Shows good organizational skills with balanced flexibility.")
+        else:
+            report.append("CONSCIENTIOUSNESS (Low): May prefer flexible work environments and spontaneous approaches.")
+        
+        # Extraversion
+        extraversion = scores['Extraversion']
+        if extraversion > 70:
+            report.append("EXTRAVERSION (High): Likely energetic and outgoing. May excel in leadership, sales, or client-facing roles.")
+        elif extraversion > 40:
+            report.append("EXTRAVERSION (Moderate): Comfortable in both individual and team settings.")
+        else:
+            report.append("EXTRAVERSION (Low): Likely prefers independent work and smaller team environments.")
+        
+        # Agreeableness
+        agreeableness = scores['Agreeableness']
+        if agreeableness > 70:
+            report.append("AGREEABLENESS (High): Cooperative and team-oriented. Likely to work well in collaborative environments.")
+        elif agreeableness > 40:
+            report.append("AGREEABLENESS (Moderate): Balanced approach to cooperation and assertiveness.")
+        else:
+            report.append("AGREEABLENESS (Low): May be more competitive and direct in approach. Could excel in challenging, results-driven roles.")
+        
+        # Emotional Stability
+        stability = scores['Emotional Stability']
+        if stability > 70:
+            report.append("EMOTIONAL STABILITY (High): Likely handles stress well and remains calm under pressure.")
+        elif stability > 40:
+            report.append("EMOTIONAL STABILITY (Moderate): Generally stable with normal stress responses.")
+        else:
+            report.append("EMOTIONAL STABILITY (Low): May be more sensitive to stress. Could benefit from supportive work environments.")
+        
+        # Role recommendations
+        report.append(f"\n=== ROLE RECOMMENDATIONS ===\n")
+        
+        if scores['Extraversion'] > 60 and scores['Agreeableness'] > 60:
+            report.append("• Team Leadership roles")
+            report.append("• Customer Relations")
+            report.append("• Sales and Marketing")
+        
+        if scores['Conscientiousness'] > 70 and scores['Openness'] < 50:
+            report.append("• Project Management")
+            report.append("• Quality Assurance")
+            report.append("• Operations")
+        
+        if scores['Openness'] > 70 and scores['Conscientiousness'] > 60:
+            report.append("• Research and Development")
+            report.append("• Creative roles")
+            report.append("• Innovation Management")
+        
+        if scores['Emotional Stability'] > 70 and scores['Conscientiousness'] > 60:
+            report.append("• Crisis Management")
+            report.append("• High-pressure environments")
+            report.append("• Strategic roles")
+        
+        return "\n".join(report)
+    
+    def analyze(self, text, progress=None):
+        """Run the full analysis pipeline and return the results as a dict
+        
+        progress, if given, is called with the name of each stage before it runs.
+        """
+        if self.instrumentation is not None:
+            return self.instrumentation.analyze(self, text, progress)
+        return self._analyze(text, progress)
+    
+    def _analyze(self, text, progress=None):
+        if progress:
+            progress(ANALYSIS_STAGES[0])
+        features = self.extract_text_features(text)
+        return self._analyze_counts(self.count_keywords(text), features, progress)
+    
+    def analyze_counts(self, counts, features, progress=None):
+        """Finish the analysis pipeline from keyword counts and extracted features"""
+        if self.instrumentation is not None:
+            return self.instrumentation.analyze_counts(self, counts, features, progress)
+        return self._analyze_counts(counts, features, progress)
+    
+    def _analyze_counts(self, counts, features, progress=None):
+        progress = progress or (lambda stage: None)
+        
+        progress(ANALYSIS_STAGES[1])
+        personality_scores = self.scores_from_counts(counts, features)
+        progress(ANALYSIS_STAGES[2])
+        experience_level = self.experience_level_from_counts(counts)
+        progress(ANALYSIS_STAGES[3])
+        industry = self.industry_from_counts(counts)
+        dominant_trait = max(personality_scores, key=personality_scores.get)
+        
+        return {
+            'personality_scores': personality_scores,
+            'experience_level': experience_level,
+            'industry': industry,
+            'dominant_trait': dominant_trait,
+            'features': features,
+        }
@@ -0,0 +1,231 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from personality_analyzer import ANALYSIS_STAGES
+import streaming_analyzer
+
+# Results written to the SQLite file per transaction; flush() and close()
+# commit the ones still pending
+COMMIT_EVERY = 64
+
+
+def normalize_text(text):
+    """Normalize resume text in ways that cannot change the analysis result"""
+    return text.replace('\r\n', '\n').strip()
+
+
+class ResultCache:
+    """Cache of full analysis results keyed by text content and lexicon version.
+
+    Results live in a bounded in-memory LRU and, when a path is given, in a
+    SQLite file that survives restarts.  Entries computed with a different
+    lexicon version are never returned and are purged from disk on open.
+    Disk writes are committed every commit_every results, so other processes
+    only see the latest ones after flush() or close().
+    """
+
+    def __init__(self, analyzer, max_entries=1024, path=None, commit_every=COMMIT_EVERY):
+        self.analyzer = analyzer
+        self.max_entries = max_entries
+        self.path = path
+        self.commit_every = commit_every
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._uncommitted = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path):
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                lexicon_version TEXT NOT NULL,
+                result TEXT NOT NULL
+            )
+        """)
+        self._db.execute("DELETE FROM results WHERE lexicon_version != ?",
+                         (self.analyzer.lexicon_version,))
+        self._db.commit()
+
+    def set_analyzer(self, analyzer):
+        """Switch to another analyzer, e.g. one with a reloaded lexicon.
+
+        Calls already running finish with the analyzer they started with.
+        Results of other lexicon versions are dropped.
+        """
+        with self._lock:
+            self.analyzer = analyzer
+            version_prefix = f"{analyzer.lexicon_version}:"
+            for key in [key for key in self._entries if not key.startswith(version_prefix)]:
+                del self._entries[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM results WHERE lexicon_version != ?",
+                                 (analyzer.lexicon_version,))
+                self._commit()
+
+    def make_key(self, text, analyzer=None):
+        """Return the cache key for already normalized text"""
+        digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        return self._key_for_digest(digest, analyzer or self.analyzer)
+
+    def _key_for_digest(self, digest, analyzer):
+        return f"{analyzer.lexicon_version}:{digest}"
+
+    def analyze(self, text, progress=None):
+        """Return the analysis result and report for text, computing it on a miss
+
+        progress is passed on to the analyzer and only called on a miss.
+        """
+        # One analyzer is used throughout even if set_analyzer runs meanwhile
+        analyzer = self.analyzer
+        text = normalize_text(text)
+        key = self.make_key(text, analyzer)
+
+        result = self._get(key)
+        if result is None:
+            result = self._compute(analyzer, text, progress)
+            self._put(key, result)
+        return copy.deepcopy(result)
+
+    def analyze_file(self, path, encoding='utf-8', errors='strict', progress=None):
+        """Like analyze, but streams the file so memory stays bounded.
+
+        The file is hashed in a first pass; on a miss it is analyzed in a
+        second streaming pass.  Keys match those of analyze for the same text.
+        """
+        analyzer = self.analyzer
+        digest = streaming_analyzer.digest_file(path, encoding, errors, progress=progress)
+        key = self._key_for_digest(digest, analyzer)
+
+        result = self._get(key)
+        if result is None:
+            result = streaming_analyzer.analyze_file(analyzer, path, encoding, errors,
+                                                     progress=progress)
+            self._add_report(analyzer, result, progress)
+            self._put(key, result)
+        return copy.deepcopy(result)
+
+    def analyze_many(self, texts, scorer):
+        """Like analyze for a list of texts, scoring every miss in a single batch
+
+        scorer is a batch_scoring.BatchScorer built on this cache's analyzer.
+        """
+        analyzer = scorer.analyzer
+        texts = [normalize_text(text) for text in texts]
+        keys = [self.make_key(text, analyzer) for text in texts]
+        results = [self._get(key) for key in keys]
+
+        missing = {}
+        for key, text, result in zip(keys, texts, results):
+            if result is None:
+                missing.setdefault(key, text)
+        computed = {}
+        if missing:
+            for key, result in zip(missing, scorer.analyze_batch(list(missing.values()))):
+                computed[key] = self._add_report(analyzer, result)
+                self._put(key, result)
+            self.flush()
+
+        return [copy.deepcopy(result if result is not None else computed[key])
+                for key, result in zip(keys, results)]
+
+    def _get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM results WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    return result
+
+            self.misses += 1
+            return None
+
+    def _compute(self, analyzer, text, progress=None):
+        result = analyzer.analyze(text, progress)
+        self._add_report(analyzer, result, progress)
+        return result
+
+    def _add_report(self, analyzer, result, progress=None):
+        if progress:
+            progress(ANALYSIS_STAGES[-1])
+        result['report'] = analyzer.generate_personality_report(
+            result['personality_scores'], result['experience_level'],
+            result['industry'], result['features']
+        )
+        result['lexicon_version'] = analyzer.lexicon_version
+        return result
+
+    def _put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, lexicon_version, result) VALUES (?, ?, ?)",
+                    (key, result['lexicon_version'], json.dumps(result, ensure_ascii=False))
+                )
+                self._uncommitted += 1
+                if self._uncommitted >= self.commit_every:
+                    self._commit()
+
+    def _commit(self):
+        self._db.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """Commit the results written to disk since the last commit"""
+        with self._lock:
+            if self._db is not None and self._uncommitted:
+                self._commit()
+
+    def _remember(self, key, result):
+        """Insert into the memory tier, evicting the least recently used entries"""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit, miss and eviction counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+            }
+
+    def clear(self):
+        """Drop every cached result from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+                self._db.close()
+                self._db = None
@@ -0,0 +1,412 @@
+"""Local HTTP scoring service for the resume analyzer.
+
+Examples:
+    python scoring_service.py --port 8080 --workers 4
+    curl -X POST localhost:8080/analyze -d '{"text": "Led a team of engineers..."}'
+
+Endpoints:
+    POST /analyze        {"text": "...", "report": false} -> analysis result
+    POST /analyze/batch  {"texts": ["...", ...], "report": false} -> {"results": [...]}
+    GET  /health         liveness and queue state
+    GET  /metrics        request, batch and latency statistics
+
+Each worker watches the lexicon file and swaps in the recompiled lexicon
+between batches when it changes; results carry the lexicon_version they
+were computed with.
+
+Concurrent requests are queued and gathered into micro-batches that a pool
+of worker processes analyzes.  The queue has a maximum depth: once it is full
+new requests are rejected with 503 and a Retry-After header instead of
+piling up, so callers back off.  Only the standard library is used and the
+GUI is never imported.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from batch_analyze import make_cache, make_scorer
+from instrumentation import Histogram
+from lexicon_bundle import LexiconWatcher
+from personality_analyzer import PersonalityAnalyzer
+
+DEFAULT_PORT = 8080
+
+# Texts analyzed by one worker call, and how long the batcher waits for a
+# batch to fill once the queue runs dry
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_DELAY = 0.002
+
+# Texts waiting for a worker before new requests are rejected
+DEFAULT_MAX_QUEUE_DEPTH = 1024
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+RETRY_AFTER_SECONDS = 1
+
+# Minimum time between two checks of the lexicon file by a worker
+LEXICON_CHECK_INTERVAL = 2.0
+
+# Result cache, optional vectorized scorer and lexicon watcher of the
+# current worker process
+_worker_cache = None
+_worker_scorer = None
+_worker_watcher = None
+_next_lexicon_check = 0
+
+
+def _init_worker(word_boundary, vectorized, lexicon_path=None):
+    global _worker_cache, _worker_scorer, _worker_watcher
+    _worker_cache = make_cache(word_boundary, lexicon_path=lexicon_path)
+    _worker_scorer = make_scorer(_worker_cache) if vectorized else None
+    bundle = _worker_cache.analyzer.lexicon_bundle
+    _worker_watcher = LexiconWatcher(bundle.source_path, bundle.word_boundary, bundle.source_digest)
+
+
+def _reload_lexicon():
+    """Swap in the recompiled lexicon if its file changed"""
+    global _worker_scorer, _next_lexicon_check
+    now = time.monotonic()
+    if now < _next_lexicon_check:
+        return
+    _next_lexicon_check = now + LEXICON_CHECK_INTERVAL
+    bundle = _worker_watcher.check()
+    if bundle is not None:
+        _worker_cache.set_analyzer(PersonalityAnalyzer(bundle=bundle))
+        if _worker_scorer is not None:
+            _worker_scorer = make_scorer(_worker_cache)
+
+
+def analyze_texts(texts):
+    """Analyze one micro-batch inside a worker process"""
+    _reload_lexicon()
+    if _worker_scorer is not None:
+        return _worker_cache.analyze_many(texts, _worker_scorer)
+    return [_worker_cache.analyze(text) for text in texts]
+
+
+class QueueFull(Exception):
+    """Raised when a request does not fit in the remaining queue depth"""
+
+
+class MicroBatcher:
+    """Gather queued texts into batches and run them on a process pool.
+
+    At most one batch per worker is in flight; while every worker is busy the
+    queue fills up and submit() starts refusing work.
+    """
+
+    def __init__(self, executor, workers, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_delay=DEFAULT_MAX_DELAY, max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH):
+        self.executor = executor
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_depth = max_queue_depth
+        self.batches = 0
+        self.failed_batches = 0
+        self.batch_sizes = Histogram(base=1, buckets=16)
+        self.in_flight = 0
+        self._queue = asyncio.Queue(maxsize=max_queue_depth)
+        self._slots = asyncio.Semaphore(workers)
+        self._task = None
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def submit(self, texts):
+        """Queue texts and return one future per text; all or none are queued"""
+        if len(texts) > self.max_queue_depth - self._queue.qsize():
+            raise QueueFull()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+        return futures
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch_size and self.max_delay:
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            await self._slots.acquire()
+            asyncio.create_task(self._dispatch(batch))
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        self.batches += 1
+        self.batch_sizes.observe(len(batch))
+        try:
+            results = await loop.run_in_executor(self.executor, analyze_texts,
+                                                 [text for text, _ in batch])
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+
+class ScoringService:
+    """HTTP/1.1 front end of a MicroBatcher using asyncio streams"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.started = time.time()
+        self.requests = 0
+        self.texts = 0
+        self.rejected = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.metrics,
+            ('POST', '/analyze'): self.analyze,
+            ('POST', '/analyze/batch'): self.analyze_batch,
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection, keeping it alive between them"""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit (asyncio.LimitOverrunError)
+                    await self._respond(writer, HTTPStatus.REQUEST_URI_TOO_LONG, {'error': "request line too long"})
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "malformed request line"})
+                    break
+
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                        {'error': "header line too long"})
+                    break
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "invalid Content-Length"})
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {'error': f"body larger than {MAX_BODY_BYTES} bytes"})
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload, extra_headers = await self.dispatch(method, target.split('?')[0], body)
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                await self._respond(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive=False, extra_headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body):
+        """Route a request; returns (status, JSON payload, extra headers)"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed on {path}"}, None
+            return HTTPStatus.NOT_FOUND, {'error': f"no such endpoint {path}"}, None
+
+        if method != 'POST':
+            return HTTPStatus.OK, handler(), None
+
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': "body is not valid JSON"}, None
+        if not isinstance(request, dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "body must be a JSON object"}, None
+        return await handler(request)
+
+    async def analyze(self, request):
+        text = request.get('text')
+        if not isinstance(text, str):
+            return HTTPStatus.BAD_REQUEST, {'error': "'text' must be a string"}, None
+        status, results, headers = await self._score([text], request.get('report', False))
+        return status, results[0] if status == HTTPStatus.OK else results, headers
+
+    async def analyze_batch(self, request):
+        texts = request.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return HTTPStatus.BAD_REQUEST, {'error': "'texts' must be a list of strings"}, None
+        if len(texts) > self.batcher.max_queue_depth:
+            return HTTPStatus.BAD_REQUEST, {
+                'error': f"at most {self.batcher.max_queue_depth} texts per request"}, None
+        status, results, headers = await self._score(texts, request.get('report', False))
+        return status, {'results': results} if status == HTTPStatus.OK else results, headers
+
+    async def _score(self, texts, include_report):
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            futures = self.batcher.submit(texts)
+        except QueueFull:
+            self.rejected += 1
+            return (HTTPStatus.SERVICE_UNAVAILABLE, {'error': "queue is full, retry later"},
+                    {'Retry-After': RETRY_AFTER_SECONDS})
+
+        try:
+            results = await asyncio.gather(*futures)
+        except Exception as e:
+            self.errors += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}, None
+
+        self.texts += len(texts)
+        if not include_report:
+            for result in results:
+                del result['report']
+        self.latency.observe(time.perf_counter() - start)
+        return HTTPStatus.OK, results, None
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'queue_depth': self.batcher.queue_depth,
+            'max_queue_depth': self.batcher.max_queue_depth,
+            'workers': self.batcher.workers,
+        }
+
+    def metrics(self):
+        batcher = self.batcher
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'requests': self.requests,
+            'texts': self.texts,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'queue_depth': batcher.queue_depth,
+            'max_queue_depth': batcher.max_queue_depth,
+            'workers': batcher.workers,
+            'batches_in_flight': batcher.in_flight,
+            'batches': batcher.batches,
+            'failed_batches': batcher.failed_batches,
+            'batch_size': batcher.batch_sizes.snapshot(),
+            'latency_seconds': self.latency.snapshot(),
+        }
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, workers=None,
+                max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY,
+                max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH, word_boundary=False, vectorized=False,
+                lexicon_path=None):
+    """Run the service until cancelled"""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(word_boundary, vectorized, lexicon_path)) as executor:
+        batcher = MicroBatcher(executor, workers, max_batch_size, max_delay, max_queue_depth)
+        batcher.start()
+        service = ScoringService(batcher)
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f"Scoring service listening on http://{host}:{port} with {workers} workers",
+              file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await batcher.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume analyses over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"texts per micro-batch (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument('--max-delay-ms', type=float, default=DEFAULT_MAX_DELAY * 1000,
+                        help="time to wait for a micro-batch to fill (default: 2)")
+    parser.add_argument('--max-queue-depth', type=int, default=DEFAULT_MAX_QUEUE_DEPTH,
+                        help=f"queued texts before rejecting requests (default: {DEFAULT_MAX_QUEUE_DEPTH})")
+    parser.add_argument('--word-boundary', action='store_true',
+                        help="only count keywords that appear as whole words")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="score each micro-batch with NumPy (requires NumPy)")
+    parser.add_argument('--lexicon', metavar='PATH',
+                        help="lexicon JSON file to use instead of the default lexicon")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_batch_size < 1 or args.max_queue_depth < 1:
+        parser.error("--max-batch-size and --max-queue-depth must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_batch_size,
+                          args.max_delay_ms / 1000, args.max_queue_depth,
+                          args.word_boundary, args.vectorized, args.lexicon))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Nearest-neighbour search over stored analyses.
+
+Every analysis is embedded as one vector: its five trait scores scaled to
+0-1 followed by its text features, each log-scaled to roughly 0-1 so long
+resumes do not dominate the distance.  Vectors live in one contiguous
+float32 array that grows by doubling, so adding an analysis is amortized
+constant time.  Queries are an exact blocked brute-force top-k: each block
+of rows costs one matrix-vector product against precomputed squared norms
+plus an argpartition, which keeps a search over a million analyses in the
+milliseconds without building a tree.  Requires NumPy.
+"""
+import math
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from history_store import TRAIT_COLUMNS
+
+# Feature dimensions, in vector order, with the value that maps to 1.0
+FEATURE_SCALES = {
+    'total_words': 2000,
+    'unique_words': 1000,
+    'avg_word_length': 10,
+    'sentence_count': 200,
+    'exclamation_count': 10,
+    'question_count': 10,
+    'capital_words': 100,
+    'numbers_count': 100,
+    'education_mentions': 20,
+    'achievement_mentions': 20,
+    'leadership_mentions': 20,
+}
+
+DIMENSIONS = len(TRAIT_COLUMNS) + len(FEATURE_SCALES)
+
+# Rows scored per matrix-vector product; large enough to amortize the
+# per-block overhead, small enough for the distances to stay in cache
+BLOCK_ROWS = 65536
+
+DEFAULT_K = 10
+
+# Bump whenever the vector layout or scaling changes
+VECTOR_FORMAT = 1
+
+_FEATURE_DIVISORS = np.array([math.log1p(scale) for scale in FEATURE_SCALES.values()], dtype=np.float32)
+
+
+def analysis_vector(scores, features):
+    """Embed trait scores and text features as a float32 vector"""
+    features = features or {}
+    vector = np.empty(DIMENSIONS, dtype=np.float32)
+    vector[:len(TRAIT_COLUMNS)] = [scores[trait] / 100 for trait in TRAIT_COLUMNS]
+    raw = np.array([max(features.get(name, 0), 0) for name in FEATURE_SCALES], dtype=np.float32)
+    vector[len(TRAIT_COLUMNS):] = np.log1p(raw) / _FEATURE_DIVISORS
+    return vector
+
+
+class SimilarityIndex:
+    """Incremental in-memory index of analysis vectors keyed by history entry id.
+
+    sync(store) adds the HistoryStore entries newer than the last synced
+    one, and save()/load() keep a snapshot between sessions so only entries
+    added since the snapshot are read back from the store.  Entries added
+    directly with add() do not move that watermark, because other writers
+    (e.g. watch_folder) may have stored older entries not synced yet.
+    """
+
+    def __init__(self, capacity=1024):
+        self._vectors = np.empty((capacity, DIMENSIONS), dtype=np.float32)
+        self._norms = np.empty(capacity, dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._size = 0
+        self.last_id = 0
+        # Indexed ids above last_id, skipped when sync reaches them
+        self._ahead_ids = set()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, rows):
+        capacity = len(self._ids)
+        if self._size + rows <= capacity:
+            return
+        capacity = max(capacity * 2, self._size + rows)
+        for name in ('_vectors', '_norms', '_ids'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def add_vectors(self, entry_ids, vectors):
+        """Append already embedded vectors, one row per entry id"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, DIMENSIONS)
+        with self._lock:
+            self._reserve(len(vectors))
+            end = self._size + len(vectors)
+            self._vectors[self._size:end] = vectors
+            self._norms[self._size:end] = np.einsum('ij,ij->i', vectors, vectors)
+            self._ids[self._size:end] = entry_ids
+            self._size = end
+            self._ahead_ids.update(int(entry_id) for entry_id in entry_ids if entry_id > self.last_id)
+            if len(vectors):
+                self.dirty = True
+
+    def add(self, entry_id, scores, features):
+        """Index one analysis under its history entry id"""
+        self.add_vectors([entry_id], analysis_vector(scores, features))
+
+    def sync(self, store, batch_size=10000):
+        """Index the store's entries not indexed yet and return how many"""
+        if store.count() < self._size or (self.last_id and store.get(self.last_id) is None):
+            # The history was cleared or replaced since the snapshot
+            self.clear()
+        added = self._sync_newer(store, batch_size)
+        if store.count(max_id=self.last_id) != self._size:
+            # Entries below the watermark are missing, as in snapshots saved
+            # before add() left the watermark alone, so index everything again
+            self.clear()
+            added = self._sync_newer(store, batch_size)
+        return added
+
+    def _sync_newer(self, store, batch_size):
+        """Index the entries above the watermark and move it to the newest entry"""
+        added = 0
+        ids = []
+        vectors = []
+        last_id = self.last_id
+        for entry in store.iter_entries(batch_size=batch_size, after_id=last_id):
+            last_id = entry.id
+            if entry.id in self._ahead_ids:
+                continue
+            ids.append(entry.id)
+            vectors.append(analysis_vector(entry.personality_scores, entry.features))
+            if len(ids) == batch_size:
+                self.add_vectors(ids, vectors)
+                added += len(ids)
+                ids, vectors = [], []
+        if ids:
+            self.add_vectors(ids, vectors)
+            added += len(ids)
+        with self._lock:
+            if last_id != self.last_id:
+                self.last_id = last_id
+                self._ahead_ids = {entry_id for entry_id in self._ahead_ids if entry_id > last_id}
+                self.dirty = True
+        return added
+
+    def query(self, scores, features, k=DEFAULT_K, exclude=()):
+        """Return up to k (entry id, distance) pairs nearest to an analysis, closest first"""
+        return self.query_vector(analysis_vector(scores, features), k, exclude)
+
+    def query_vector(self, vector, k=DEFAULT_K, exclude=()):
+        """Return up to k (entry id, distance) pairs nearest to vector, skipping excluded ids"""
+        query = np.asarray(vector, dtype=np.float32)
+        exclude = set(exclude)
+        with self._lock:
+            # Rows below size are never rewritten, so they can be read unlocked
+            size = self._size
+            vectors, norms, ids = self._vectors, self._norms, self._ids
+        take = k + len(exclude)
+        if not size or k <= 0:
+            return []
+
+        distances = []
+        rows = []
+        for start in range(0, size, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, size)
+            # Squared distance minus the query's own squared norm
+            block = norms[start:end] - 2 * (vectors[start:end] @ query)
+            if len(block) > take:
+                best = np.argpartition(block, take - 1)[:take]
+            else:
+                best = np.arange(len(block))
+            distances.append(block[best])
+            rows.append(best + start)
+        distances = np.concatenate(distances)
+        rows = np.concatenate(rows)
+
+        query_norm = float(query @ query)
+        matches = []
+        for position in np.argsort(distances, kind='stable'):
+            entry_id = int(ids[rows[position]])
+            if entry_id in exclude:
+                continue
+            matches.append((entry_id, math.sqrt(max(float(distances[position]) + query_norm, 0.0))))
+            if len(matches) == k:
+                break
+        return matches
+
+    def clear(self):
+        """Forget every indexed analysis"""
+        with self._lock:
+            self._size = 0
+            self.last_id = 0
+            self._ahead_ids = set()
+            self.dirty = True
+
+    def save(self, path):
+        """Write a snapshot of the index, replacing any existing file atomically"""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            size = self._size
+            state = {
+                'format': np.array(VECTOR_FORMAT),
+                'last_id': np.array(self.last_id),
+                'ids': self._ids[:size],
+                'vectors': self._vectors[:size],
+            }
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    np.savez(file, **state)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Load a snapshot written by save, or return an empty index when there is none"""
+        try:
+            with np.load(path, allow_pickle=False) as state:
+                if int(state['format']) != VECTOR_FORMAT or state['vectors'].shape[1:] != (DIMENSIONS,):
+                    return cls()
+                ids = state['ids']
+                vectors = state['vectors']
+                last_id = int(state['last_id'])
+        except (OSError, ValueError, KeyError):
+            return cls()
+        index = cls(max(len(ids), 1024))
+        index.last_id = last_id
+        index.add_vectors(ids, vectors)
+        index.dirty = False
+        return index
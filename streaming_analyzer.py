@@ -0,0 +1,222 @@
+import hashlib
+import math
+import re
+
+from personality_analyzer import ANALYSIS_STAGES
+
+# Progress stage reported while hashing a file before analysis
+READ_STAGE = 'Reading file'
+
+# Characters read from a file per chunk
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Text held back waiting for whitespace before it is force-cut, as a multiple
+# of the chunk size; only reached by inputs with enormous unbroken tokens
+MAX_CARRY_CHUNKS = 4
+
+# Distinct words counted exactly; past this many, unique_words becomes a
+# HyperLogLog estimate (about 0.8% standard error) kept in constant memory
+MAX_EXACT_UNIQUE_WORDS = 100000
+
+# The estimate uses 2 ** HLL_PRECISION one-byte registers
+HLL_PRECISION = 14
+
+_WORD = re.compile(r'\b\w+\b')
+_SENTENCE_END = re.compile(r'[.!?]+')
+_CAPITAL_WORD = re.compile(r'\b[A-Z]{2,}\b')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+class StreamingAnalyzer:
+    """Incremental version of PersonalityAnalyzer.analyze for very large texts.
+
+    Text is fed in arbitrary chunks and only a small carry-over is kept
+    between them.  Text is processed in segments that end right after a
+    whitespace character; no feature pattern can match across such a cut and
+    keyword matches that span it are carried by the keyword scanner, so the
+    result is the same as analyzing the whole text at once.
+
+    Memory is bounded by the carry-over, one segment and the distinct words,
+    of which at most MAX_EXACT_UNIQUE_WORDS are kept.  Texts with more
+    distinct words than that get an estimated unique_words, which is the only
+    way the result can differ from analyzing the whole text.
+    """
+
+    def __init__(self, analyzer, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.analyzer = analyzer
+        self.max_carry = chunk_size * MAX_CARRY_CHUNKS
+        self._scanner = analyzer.keyword_matcher.scanner()
+        self.characters = 0
+        self._carry = ''
+        self._total_words = 0
+        self._word_length = 0
+        self._unique_words = DistinctCounter()
+        self._sentence_count = 0
+        self._exclamation_count = 0
+        self._question_count = 0
+        self._capital_words = 0
+        self._numbers_count = 0
+
+    def feed(self, text):
+        """Analyze the next chunk of text"""
+        self.characters += len(text)
+        buffer = self._carry + text
+        cut = len(buffer)
+        while cut and not buffer[cut - 1].isspace():
+            cut -= 1
+        if not cut and len(buffer) > self.max_carry:
+            cut = len(buffer)
+        self._carry = buffer[cut:]
+        if cut:
+            self._process(buffer[:cut])
+
+    def _process(self, segment):
+        segment_lower = segment.lower()
+        self._scanner.feed(segment_lower)
+
+        words = _WORD.findall(segment_lower)
+        self._total_words += len(words)
+        self._word_length += sum(len(word) for word in words)
+        self._unique_words.update(words)
+        self._sentence_count += len(_SENTENCE_END.findall(segment))
+        self._exclamation_count += segment.count('!')
+        self._question_count += segment.count('?')
+        self._capital_words += len(_CAPITAL_WORD.findall(segment))
+        self._numbers_count += len(_NUMBER.findall(segment))
+
+    def finish(self):
+        """Flush the remaining text and return (features, keyword counts)"""
+        if self._carry:
+            self._process(self._carry)
+            self._carry = ''
+
+        features = {
+            'total_words': self._total_words,
+            'unique_words': min(self._unique_words.count(), self._total_words),
+            'avg_word_length': self._word_length / self._total_words if self._total_words else 0,
+            'sentence_count': self._sentence_count,
+            'exclamation_count': self._exclamation_count,
+            'question_count': self._question_count,
+            'capital_words': self._capital_words,
+            'numbers_count': self._numbers_count,
+        }
+        counts = self._scanner.counts()
+        self.analyzer.add_keyword_features(features, counts)
+        return features, counts
+
+
+class DistinctCounter:
+    """Number of distinct strings added, exact up to max_exact of them.
+
+    Past max_exact the strings are dropped and the count becomes a
+    HyperLogLog estimate over 2 ** precision one-byte registers, hashed with
+    BLAKE2b so the same input always gives the same estimate.
+    """
+
+    def __init__(self, max_exact=MAX_EXACT_UNIQUE_WORDS, precision=HLL_PRECISION):
+        self.max_exact = max_exact
+        self.precision = precision
+        self.exact = set()
+        self.registers = None
+
+    def update(self, items):
+        if self.registers is None:
+            self.exact.update(items)
+            if len(self.exact) <= self.max_exact:
+                return
+            items, self.exact = self.exact, None
+            self.registers = bytearray(1 << self.precision)
+        else:
+            items = set(items)
+        registers = self.registers
+        rest_bits = 64 - self.precision
+        rest_mask = (1 << rest_bits) - 1
+        for item in items:
+            digest = hashlib.blake2b(item.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'big')
+            index = value >> rest_bits
+            rank = rest_bits - (value & rest_mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self):
+        if self.registers is None:
+            return len(self.exact)
+        size = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * size and empty:
+            # Small-range correction of the original algorithm
+            estimate = size * math.log(size / empty)
+        return round(estimate)
+
+
+class NormalizedDigest:
+    """SHA-256 of result_cache.normalize_text(text) computed over chunks"""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._started = False
+        self._pending = ''
+
+    def feed(self, text):
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+        # Trailing whitespace is only hashed once more text follows it, which
+        # also keeps every '\r\n' pair inside a single update
+        stripped = text.rstrip()
+        if stripped:
+            self._update(self._pending + stripped)
+            self._pending = text[len(stripped):]
+        else:
+            self._pending += text
+
+    def _update(self, text):
+        self._hash.update(text.replace('\r\n', '\n').encode('utf-8', 'surrogatepass'))
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def iter_file_chunks(path, encoding='utf-8', errors='strict', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a text file in chunks of at most chunk_size characters"""
+    with open(path, 'r', encoding=encoding, errors=errors) as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def digest_file(path, encoding='utf-8', errors='strict', chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Hash a file's normalized text without loading it whole"""
+    digest = NormalizedDigest()
+    for chunk in iter_file_chunks(path, encoding, errors, chunk_size):
+        if progress:
+            progress(READ_STAGE)
+        digest.feed(chunk)
+    return digest.hexdigest()
+
+
+def extract_file_features(analyzer, path, encoding='utf-8', errors='strict',
+                          chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Stream a file through a StreamingAnalyzer; return (features, keyword counts, characters)"""
+    streaming = StreamingAnalyzer(analyzer, chunk_size)
+    for chunk in iter_file_chunks(path, encoding, errors, chunk_size):
+        if progress:
+            progress(ANALYSIS_STAGES[0])
+        streaming.feed(chunk)
+    features, counts = streaming.finish()
+    return features, counts, streaming.characters
+
+
+def analyze_file(analyzer, path, encoding='utf-8', errors='strict',
+                 chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Analyze a resume file in bounded memory; same result as analyzer.analyze"""
+    if analyzer.instrumentation is not None:
+        return analyzer.instrumentation.analyze_file(analyzer, path, encoding, errors, chunk_size, progress)
+    features, counts, _ = extract_file_features(analyzer, path, encoding, errors, chunk_size, progress)
+    return analyzer.analyze_counts(counts, features, progress)
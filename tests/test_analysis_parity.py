@@ -0,0 +1,204 @@
+"""Parity of PersonalityAnalyzer, the streaming analyzer and the batch scorer.
+
+The reference is the scoring code of the original single-file GUI, which
+counted every keyword with str.count on the lowercased text.
+"""
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import streaming_analyzer
+from personality_analyzer import PersonalityAnalyzer
+
+try:
+    import batch_scoring
+    from batch_scoring import BatchScorer
+except ImportError:
+    batch_scoring = BatchScorer = None
+
+# Feature keyword lists hard-coded in the original analyzer
+BASELINE_EDUCATION = ['university', 'college', 'degree', 'bachelor', 'master', 'phd', 'doctorate']
+BASELINE_ACHIEVEMENT = ['achieved', 'accomplished', 'awarded', 'recognized', 'improved', 'increased']
+BASELINE_LEADERSHIP = ['led', 'managed', 'directed', 'supervised', 'coordinated', 'headed']
+BASELINE_COLLAB = ['team', 'collaborate', 'help', 'support', 'assist']
+
+FILLER = ['the', 'and', 'of', 'STARTED', 'art', 'Leder', 'project', 'data', '2019', '15', 'x',
+          'Straße', 'İstanbul', 'ΣΟΦΙΑ', 'café', 'naïve', 'snake_case', 'e-mail', 'C++', 'a.b']
+PUNCTUATION = [' ', ' ', ' ', '\n', '. ', '! ', '? ', '...', ', ', '; ', ' - ', '!!', '?!', '\t', '(', ')']
+
+
+def baseline_analyze(analyzer, text):
+    """The original analyzer's results for text, with str.count keyword counting"""
+    text_lower = text.lower()
+
+    def total(keywords):
+        return sum(text_lower.count(word) for word in keywords)
+
+    words = re.findall(r'\b\w+\b', text_lower)
+    features = {
+        'total_words': len(words),
+        'unique_words': len(set(words)),
+        'avg_word_length': sum(len(word) for word in words) / len(words) if words else 0,
+        'sentence_count': len(re.findall(r'[.!?]+', text)),
+        'exclamation_count': text.count('!'),
+        'question_count': text.count('?'),
+        'capital_words': len(re.findall(r'\b[A-Z]{2,}\b', text)),
+        'numbers_count': len(re.findall(r'\b\d+\b', text)),
+        'education_mentions': total(BASELINE_EDUCATION),
+        'achievement_mentions': total(BASELINE_ACHIEVEMENT),
+        'leadership_mentions': total(BASELINE_LEADERSHIP),
+    }
+
+    scores = {}
+    for trait, keywords in analyzer.personality_keywords.items():
+        base_score = (total(keywords['high']) - total(keywords['low'])) + 50
+        if trait == 'Conscientiousness':
+            if features['avg_word_length'] > 5:
+                base_score += 5
+            if features['achievement_mentions'] > 2:
+                base_score += 10
+        elif trait == 'Extraversion':
+            if features['leadership_mentions'] > 1:
+                base_score += 10
+            if features['exclamation_count'] > 0:
+                base_score += 5
+        elif trait == 'Openness':
+            vocab_diversity = features['unique_words'] / features['total_words'] if features['total_words'] > 0 else 0
+            if vocab_diversity > 0.6:
+                base_score += 10
+        elif trait == 'Agreeableness':
+            base_score += total(BASELINE_COLLAB) * 2
+        elif trait == 'Emotional Stability':
+            if features['sentence_count'] > 10 and features['exclamation_count'] == 0:
+                base_score += 5
+        scores[trait] = max(0, min(100, base_score))
+
+    indicators = analyzer.experience_indicators
+    senior, mid, junior = (total(indicators[level]) for level in ('senior', 'mid', 'junior'))
+    if senior > mid and senior > junior:
+        experience_level = "Senior Level"
+    elif mid > junior:
+        experience_level = "Mid Level"
+    else:
+        experience_level = "Entry Level"
+
+    industry_scores = {industry: total(keywords) for industry, keywords in analyzer.industries.items()}
+    if max(industry_scores.values()) > 0:
+        industry = max(industry_scores, key=industry_scores.get).title()
+    else:
+        industry = "General"
+
+    return {
+        'personality_scores': scores,
+        'experience_level': experience_level,
+        'industry': industry,
+        'dominant_trait': max(scores, key=scores.get),
+        'features': features,
+    }
+
+
+def random_resumes(analyzer, count, seed=0, max_tokens=400):
+    """Texts mixing lexicon keywords in varied case with filler, numbers and punctuation"""
+    rng = random.Random(seed)
+    keywords = analyzer.all_keywords()
+    texts = []
+    for _ in range(count):
+        pieces = []
+        for _ in range(rng.randint(0, max_tokens)):
+            word = rng.choice(keywords) if rng.random() < 0.4 else rng.choice(FILLER)
+            case = rng.random()
+            if case < 0.1:
+                word = word.upper()
+            elif case < 0.3:
+                word = word.title()
+            pieces.append(word)
+            pieces.append(rng.choice(PUNCTUATION))
+        texts.append(''.join(pieces))
+    return texts
+
+
+class AnalyzerParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = PersonalityAnalyzer()
+        cls.texts = random_resumes(cls.analyzer, 150) + ['', ' ', 'LED!', 'Σ', 'ΣΣ. σς?']
+
+    def test_default_lexicon_keeps_the_original_keyword_lists(self):
+        self.assertEqual(self.analyzer.education_keywords, BASELINE_EDUCATION)
+        self.assertEqual(self.analyzer.achievement_keywords, BASELINE_ACHIEVEMENT)
+        self.assertEqual(self.analyzer.leadership_keywords, BASELINE_LEADERSHIP)
+        self.assertEqual(self.analyzer.collab_keywords, BASELINE_COLLAB)
+
+    def test_analyze_matches_baseline(self):
+        for text in self.texts:
+            with self.subTest(text=text[:60]):
+                self.assertEqual(self.analyzer.analyze(text), baseline_analyze(self.analyzer, text))
+
+    def test_streaming_matches_analyze(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "resume.txt")
+        # Exact as long as no run of non-whitespace outgrows the carry-over,
+        # which is streaming_analyzer.MAX_CARRY_CHUNKS chunks
+        chunk_sizes = (32, 100, streaming_analyzer.DEFAULT_CHUNK_SIZE)
+        texts = self.texts[:40] + self.texts[-5:]
+        longest = max((len(run) for text in texts for run in text.split()), default=0)
+        self.assertLessEqual(longest, min(chunk_sizes) * streaming_analyzer.MAX_CARRY_CHUNKS)
+
+        for index, text in enumerate(texts):
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                file.write(text)
+            expected = self.analyzer.analyze(text)
+            for chunk_size in chunk_sizes:
+                with self.subTest(text=index, chunk_size=chunk_size):
+                    self.assertEqual(streaming_analyzer.analyze_file(self.analyzer, path, chunk_size=chunk_size),
+                                     expected)
+
+    @unittest.skipIf(BatchScorer is None, "batch scoring needs NumPy")
+    def test_batch_matches_analyze(self):
+        for word_boundary in (False, True):
+            analyzer = PersonalityAnalyzer(word_boundary=word_boundary)
+            scorer = BatchScorer(analyzer)
+            # Two batches, so the second one reuses the vocabulary of the first
+            for batch in (self.texts[:80], self.texts[60:]):
+                for text, result in zip(batch, scorer.analyze_batch(batch)):
+                    with self.subTest(word_boundary=word_boundary, text=text[:60]):
+                        self.assertEqual(result, analyzer.analyze(text))
+
+    @unittest.skipIf(BatchScorer is None, "batch scoring needs NumPy")
+    def test_batch_matches_analyze_in_small_chunks(self):
+        # Tiny chunks, and every phrase keyword sharing one of two mask bits
+        with mock.patch.object(batch_scoring, 'CHUNK_DOCUMENTS', 7), \
+                mock.patch.object(batch_scoring, 'PHRASE_BITS', 2):
+            results = BatchScorer(self.analyzer).analyze_batch(self.texts)
+        self.assertEqual(results, [self.analyzer.analyze(text) for text in self.texts])
+
+    @unittest.skipIf(BatchScorer is None, "batch scoring needs NumPy")
+    def test_batch_keyword_counts(self):
+        scorer = BatchScorer(self.analyzer)
+        counts, _ = scorer.featurize(self.texts)
+        expected = [[text.lower().count(term) for term in scorer.terms] for text in self.texts]
+        self.assertEqual(counts.toarray().tolist(), expected)
+
+    @unittest.skipIf(BatchScorer is None, "batch scoring needs NumPy")
+    def test_batch_vocabulary_is_bounded(self):
+        scorer = BatchScorer(self.analyzer, max_vocabulary=50)
+        for start in range(0, len(self.texts), 20):
+            batch = self.texts[start:start + 20]
+            for text, result in zip(batch, scorer.analyze_batch(batch)):
+                with self.subTest(text=text[:60]):
+                    self.assertEqual(result, self.analyzer.analyze(text))
+            # Every batch outgrows the limit, so each one starts from scratch
+            fresh = BatchScorer(self.analyzer)
+            fresh.analyze_batch(batch)
+            self.assertEqual(len(scorer._vocabulary.ids), len(fresh._vocabulary.ids))
+            self.assertEqual(len(scorer._word_hits), len(fresh._word_hits))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Exit status and messages of batch_analyze for inputs that match nothing."""
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import batch_analyze
+
+
+class MissingInputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.resume = os.path.join(self.directory, "resume.txt")
+        with open(self.resume, 'w', encoding='utf-8') as file:
+            file.write("Led the team and managed projects.")
+        self.output = os.path.join(self.directory, "results.jsonl")
+
+    def run_main(self, *inputs):
+        """Return (exit status, stderr, records) of batch_analyze.main"""
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = batch_analyze.main([*inputs, '--workers', '1', '--output', self.output])
+        with open(self.output, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        return status, stderr.getvalue(), records
+
+    def test_nonexistent_path_fails(self):
+        missing = os.path.join(self.directory, "nope.txt")
+        status, stderr, records = self.run_main(missing)
+        self.assertNotEqual(status, 0)
+        self.assertIn(missing, stderr)
+        self.assertEqual(records, [])
+
+    def test_glob_without_matches_fails(self):
+        pattern = os.path.join(self.directory, "*.pdf")
+        status, stderr, _ = self.run_main(pattern)
+        self.assertNotEqual(status, 0)
+        self.assertIn(pattern, stderr)
+
+    def test_missing_input_is_reported_next_to_matches(self):
+        missing = os.path.join(self.directory, "nope.txt")
+        status, stderr, records = self.run_main(self.resume, missing)
+        self.assertEqual(status, 0)
+        self.assertIn(missing, stderr)
+        self.assertEqual([record['path'] for record in records], [self.resume])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Syncing the cohort aggregates with a history store that has other writers."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from cohort_analytics import CohortAnalytics
+from history_store import HistoryStore
+from tests.test_history_io import make_entries
+
+
+class CohortSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "history.sqlite")
+        # The GUI's store and a second writer such as watch_folder
+        self.store = HistoryStore(path)
+        self.writer = HistoryStore(path)
+        self.entries = iter(make_entries(50))
+
+    def tearDown(self):
+        self.store.close()
+        self.writer.close()
+        shutil.rmtree(self.directory)
+
+    def add_analysis(self, analytics):
+        entry = next(self.entries)
+        entry_id = self.store.append(entry)
+        analytics.add(entry_id, entry['timestamp'], entry['experience_level'], entry['industry'],
+                      entry['personality_scores'])
+
+    def assertCountsStore(self, analytics):
+        expected = CohortAnalytics()
+        expected.sync(self.store)
+        self.assertEqual(len(analytics), len(self.store))
+        self.assertEqual(analytics.experience_mix(), expected.experience_mix())
+        self.assertEqual(analytics.industries(), expected.industries())
+
+    def test_entries_of_other_writers_are_counted_after_direct_adds(self):
+        snapshot = os.path.join(self.directory, "cohorts.json")
+        analytics = CohortAnalytics()
+        self.store.extend([next(self.entries) for _ in range(2)])
+        analytics.sync(self.store)
+        self.writer.extend([next(self.entries) for _ in range(4)])
+        self.add_analysis(analytics)
+        analytics.save(snapshot)
+
+        analytics = CohortAnalytics.load(snapshot)
+        self.assertEqual(analytics.sync(self.store), 4)
+        self.assertCountsStore(analytics)
+        self.add_analysis(analytics)
+        self.assertEqual(analytics.sync(self.store), 0)
+        self.assertCountsStore(analytics)
+
+    def test_snapshot_missing_older_entries_is_rebuilt(self):
+        analytics = CohortAnalytics()
+        self.store.extend([next(self.entries) for _ in range(3)])
+        analytics.sync(self.store)
+        self.writer.extend([next(self.entries) for _ in range(3)])
+        # A watermark past entries never counted, as older versions saved it
+        analytics.last_id = max(record.id for record in self.store)
+        analytics.sync(self.store)
+        self.assertCountsStore(analytics)
+
+
+if __name__ == '__main__':
+    unittest.main()
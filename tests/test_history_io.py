@@ -0,0 +1,125 @@
+"""Round trips of the history through every export format.
+
+Run from the repository root with:
+    python -m unittest discover -s tests -t .
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import history_io
+from history_store import FEATURE_NAMES, TRAIT_COLUMNS, HistoryStore
+
+
+def make_entries(count, seed=0, extra_features=True):
+    """History entry dicts with standard, missing and (optionally) non-standard features"""
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        features = {name: rng.randint(0, 500) for name in FEATURE_NAMES}
+        features['avg_word_length'] = rng.uniform(3, 8)
+        if index % 5 == 3:
+            features = None
+        elif extra_features and index % 5 == 4:
+            features = {'total_words': rng.randint(0, 500), 'custom': "value"}
+        entries.append({
+            'timestamp': f"2026-{1 + index % 12:02d}-{1 + index % 28:02d} 10:{index % 60:02d}:00",
+            'experience_level': rng.choice(["Senior Level", "Mid Level", "Entry Level"]),
+            'industry': rng.choice(["Tech", "Business", "Creative", "Unknown, \"quoted\""]),
+            'personality_scores': {trait: rng.choice([rng.randint(0, 100), rng.uniform(0, 100)])
+                                   for trait in TRAIT_COLUMNS},
+            'features': features,
+            'lexicon_version': rng.choice(["0123456789abcdef", None]),
+        })
+    return entries
+
+
+def stored_entries(store):
+    """Every stored entry as an export dict without its id"""
+    entries = []
+    for record in store:
+        entry = record.to_dict()
+        del entry['id']
+        entries.append(entry)
+    return entries
+
+
+class HistoryRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.directory)
+
+    def make_store(self, name):
+        store = HistoryStore(os.path.join(self.directory, name))
+        self.stores.append(store)
+        return store
+
+    def round_trip(self, extension, batch_size, entries):
+        source = self.make_store(f"source{extension}-{batch_size}.sqlite")
+        source.extend(entries)
+        path = os.path.join(self.directory, f"history-{batch_size}{extension}")
+        exported = history_io.export_history(source, path, batch_size=batch_size)
+        self.assertEqual(exported, len(entries))
+
+        target = self.make_store(f"target{extension}-{batch_size}.sqlite")
+        fractions = []
+        imported = history_io.import_history(target, path, batch_size=batch_size,
+                                             progress=lambda rows, fraction: fractions.append(fraction))
+        self.assertEqual(imported, len(entries))
+        self.assertEqual(fractions[-1], 1.0)
+        self.assertEqual(fractions, sorted(fractions))
+        return stored_entries(source), stored_entries(target)
+
+    def test_round_trip_every_format(self):
+        for extension in history_io.FORMATS:
+            # CSV only has columns for the standard features
+            entries = make_entries(53, extra_features=extension != '.csv')
+            for batch_size in (7, 10000):
+                with self.subTest(extension=extension, batch_size=batch_size):
+                    expected, actual = self.round_trip(extension, batch_size, entries)
+                    self.assertEqual(actual, expected)
+
+    def test_empty_history(self):
+        for extension in history_io.FORMATS:
+            with self.subTest(extension=extension):
+                expected, actual = self.round_trip(extension, 10, [])
+                self.assertEqual(actual, [])
+
+    def test_import_leaves_file_usable(self):
+        # A text reader must not close the file when its wrapper is collected
+        store = self.make_store("source.sqlite")
+        store.extend(make_entries(3))
+        path = os.path.join(self.directory, "history.jsonl")
+        history_io.export_history(store, path)
+        with open(path, 'rb') as raw:
+            self.assertEqual(len(list(history_io._READERS['jsonl'](raw))), 3)
+            self.assertFalse(raw.closed)
+            self.assertEqual(raw.tell(), os.path.getsize(path))
+
+    def test_malformed_files_raise_value_error(self):
+        store = self.make_store("target.sqlite")
+        contents = {
+            '.json': '[{"timestamp": "x"}]',
+            '.jsonl': '{"timestamp": \n',
+            '.csv': 'timestamp,industry\nx,y\n',
+            '.cvh': 'not columnar',
+        }
+        for extension, content in contents.items():
+            with self.subTest(extension=extension):
+                path = os.path.join(self.directory, f"bad{extension}")
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(content)
+                with self.assertRaises(ValueError):
+                    history_io.import_history(store, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
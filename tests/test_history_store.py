@@ -0,0 +1,53 @@
+"""Keyset paging of HistoryStore.query against OFFSET paging."""
+import unittest
+
+from history_store import SORT_COLUMNS, HistoryStore
+from tests.test_history_io import make_entries
+
+
+class KeysetPagingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = HistoryStore(':memory:')
+        cls.store.extend(make_entries(700, extra_features=False))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.close()
+
+    def orders(self):
+        filter_sets = [{}, {'industry': "Tech"}, {'experience_level': "Mid Level", 'min_scores': {'Openness': 40}}]
+        for filters in filter_sets:
+            for order_by in SORT_COLUMNS:
+                for descending in (True, False):
+                    yield dict(order_by=order_by, descending=descending, **filters)
+
+    def ids(self, records):
+        return [record.id for record in records]
+
+    def test_after_and_before_continue_offset_pages(self):
+        for options in self.orders():
+            with self.subTest(**options):
+                everything = self.store.query(limit=10000, **options)
+                for position in (0, 1, 57, len(everything) - 1):
+                    key = everything[position].sort_key(options['order_by'])
+                    self.assertEqual(self.ids(self.store.query(limit=25, after=key, **options)),
+                                     self.ids(everything[position + 1:position + 26]))
+                    self.assertEqual(self.ids(self.store.query(limit=25, before=key, **options)),
+                                     self.ids(everything[max(0, position - 25):position]))
+
+    def test_sort_keys_seek_to_every_step(self):
+        for options in self.orders():
+            with self.subTest(**options):
+                everything = self.store.query(limit=10000, **options)
+                keys = self.store.sort_keys(64, **options)
+                self.assertEqual(len(keys), len(everything) // 64)
+                for index, key in enumerate(keys):
+                    start = (index + 1) * 64
+                    self.assertEqual(self.ids(self.store.query(limit=3, after=key, **options)),
+                                     self.ids(everything[start:start + 3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""The windowed history view against plain OFFSET queries, without a display."""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from history_store import HistoryStore
+from tests.test_history_io import make_entries
+
+try:
+    import history_view
+except ImportError:
+    history_view = None
+
+
+class FakeTree:
+    """The part of ttk.Treeview the view uses, keeping rows in a list"""
+
+    def __init__(self, height):
+        self.height = height
+        self.items = []
+
+    def cget(self, option):
+        return self.height
+
+    def configure(self, **options):
+        pass
+
+    def heading(self, column, **options):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def delete(self, *items):
+        self.items = [item for item in self.items if item not in items]
+
+    def insert(self, parent, index, iid, values):
+        self.items.insert(len(self.items) if index == 'end' else index, iid)
+
+
+class FakeScrollbar:
+
+    def configure(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+@unittest.skipIf(history_view is None, "tkinter is not available")
+class VirtualHistoryViewTest(unittest.TestCase):
+
+    SORT_COLUMNS = {'Timestamp': 'timestamp', 'Experience': 'experience_level',
+                    'Industry': 'industry', 'Top_Trait': 'dominant_trait'}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = HistoryStore(os.path.join(self.directory, "history.sqlite"))
+        self.store.extend(make_entries(1500, extra_features=False))
+        with mock.patch.object(history_view.ttk, 'Style'):
+            self.view = history_view.VirtualHistoryView(FakeTree(12), FakeScrollbar(), self.store,
+                                                        self.SORT_COLUMNS)
+        self.view.refresh(recount=True)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def assertShowsOffsetQuery(self):
+        view = self.view
+        expected = self.store.query(limit=view.visible_rows, offset=view.offset, order_by=view.order_by,
+                                    descending=view.descending, **view.filters)
+        self.assertEqual(view.tree.get_children(), tuple(str(entry.id) for entry in expected))
+
+    def scroll_around(self, rng, moves=150):
+        view = self.view
+        for _ in range(moves):
+            action = rng.random()
+            if action < 0.4:
+                view._scroll_rows(rng.choice((-3, 3)))
+            elif action < 0.7:
+                view.yview('scroll', rng.choice((-1, 1)), 'pages')
+            elif action < 0.95:
+                view.yview('moveto', rng.random())
+            else:
+                view.visible_rows = rng.randint(5, 30)
+                view._show()
+            self.assertShowsOffsetQuery()
+
+    def test_scrolling_matches_offset_queries(self):
+        rng = random.Random(0)
+        filters = [{}, {'industry': "Tech"}, {'experience_level': "Mid Level", 'industry': "Business"},
+                   {'min_scores': {'Openness': 50}}]
+        for filter_set in filters:
+            self.view.set_filters(**filter_set)
+            for column in ('Timestamp', 'Top_Trait', 'Top_Trait', 'Industry'):
+                with self.subTest(filters=filter_set, column=column, descending=self.view.descending):
+                    self.view.sort_by(column)
+                    self.scroll_around(rng)
+
+    def test_added_entries_shift_the_cached_rows(self):
+        rng = random.Random(1)
+        for entry in make_entries(20, seed=5, extra_features=False):
+            self.view.entry_added(self.store.append(entry))
+            self.assertShowsOffsetQuery()
+            self.scroll_around(rng, moves=5)
+            self.view._scroll_rows(-self.view.total)
+
+
+if __name__ == '__main__':
+    unittest.main()
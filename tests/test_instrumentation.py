@@ -0,0 +1,66 @@
+"""Stage timings and slow-analysis profiles of instrumented text and file analyses."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import streaming_analyzer
+from instrumentation import SCAN_STAGE, STREAM_STAGE, Instrumentation
+from personality_analyzer import ANALYSIS_STAGES, PersonalityAnalyzer
+
+RESUME = ("Senior software engineer leading a team of developers. "
+          "Designed python services, mentored engineers and managed agile delivery. ") * 200
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = PersonalityAnalyzer()
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            handle.write(RESUME)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_file_jobs_time_the_streaming_stage(self):
+        expected = streaming_analyzer.analyze_file(self.analyzer, self.path, chunk_size=1024)
+        instrumentation = Instrumentation()
+        self.analyzer.instrumentation = instrumentation
+        stages = []
+        result = streaming_analyzer.analyze_file(self.analyzer, self.path, chunk_size=1024,
+                                                 progress=stages.append)
+
+        self.assertEqual(result, expected)
+        run = instrumentation.last_run()
+        self.assertGreater(run[STREAM_STAGE], 0)
+        self.assertNotIn(SCAN_STAGE, run)
+        self.assertNotIn(ANALYSIS_STAGES[0], run)
+        self.assertIn(ANALYSIS_STAGES[0], stages)
+        self.assertEqual(instrumentation.counters['characters'], len(RESUME))
+
+    def test_profile_comes_from_the_actual_run(self):
+        instrumentation = Instrumentation(profile_threshold=0)
+        self.analyzer.instrumentation = instrumentation
+        with mock.patch.object(self.analyzer, '_analyze', wraps=self.analyzer._analyze) as analyze:
+            self.analyzer.analyze(RESUME)
+        self.assertEqual(analyze.call_count, 1)
+
+        streaming_analyzer.analyze_file(self.analyzer, self.path, chunk_size=1024)
+        self.assertEqual(len(instrumentation.profiles), 2)
+        self.assertEqual(instrumentation.counters['slow_documents'], 2)
+        file_profile = instrumentation.profiles[-1]
+        self.assertEqual(file_profile.characters, len(RESUME))
+        self.assertIn('extract_file_features', file_profile.profile_text)
+
+    def test_fast_analyses_keep_no_profile(self):
+        instrumentation = Instrumentation(profile_threshold=60)
+        self.analyzer.instrumentation = instrumentation
+        self.analyzer.analyze(RESUME)
+        streaming_analyzer.analyze_file(self.analyzer, self.path)
+        self.assertEqual(len(instrumentation.profiles), 0)
+        self.assertEqual(instrumentation.runs, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Parity of KeywordMatcher with str.count and with a word-boundary regex."""
+import random
+import re
+import unittest
+
+from keyword_matcher import KeywordMatcher
+
+# Keywords that overlap themselves and each other, share prefixes and
+# suffixes, and contain spaces and punctuation
+KEYWORDS = ['a', 'aa', 'aba', 'ab', 'b a', 'ba', 'bab', 'abab', 'c', 'ca', 'a-b', 'a.b', 'cab', 'é', 'éa']
+
+# A small alphabet makes keywords occur often and overlap in every way
+ALPHABET = 'aabbc -._é1'
+
+
+def random_texts(count, seed=0, max_length=80):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_length))) for _ in range(count)]
+
+
+def boundary_count(keyword, text):
+    return len(re.findall(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)', text))
+
+
+def feed_in_pieces(matcher, text, rng):
+    scanner = matcher.scanner()
+    position = 0
+    while position < len(text):
+        size = rng.randint(0, 5)
+        scanner.feed(text[position:position + size])
+        position += size
+    return scanner.counts()
+
+
+class KeywordMatcherTest(unittest.TestCase):
+
+    def test_counts_match_str_count(self):
+        matcher = KeywordMatcher(KEYWORDS)
+        for text in random_texts(2000):
+            with self.subTest(text=text):
+                self.assertEqual(matcher.count(text), {keyword: text.count(keyword) for keyword in KEYWORDS})
+
+    def test_word_boundary_counts_match_regex(self):
+        matcher = KeywordMatcher(KEYWORDS, word_boundary=True)
+        for text in random_texts(2000, seed=1):
+            with self.subTest(text=text):
+                self.assertEqual(matcher.count(text),
+                                 {keyword: boundary_count(keyword, text) for keyword in KEYWORDS})
+
+    def test_chunked_feed_matches_one_shot(self):
+        rng = random.Random(2)
+        for word_boundary in (False, True):
+            matcher = KeywordMatcher(KEYWORDS, word_boundary=word_boundary)
+            for text in random_texts(1000, seed=3):
+                with self.subTest(word_boundary=word_boundary, text=text):
+                    self.assertEqual(feed_in_pieces(matcher, text, rng), matcher.count(text))
+
+    def test_hits_are_the_nonzero_counts(self):
+        matcher = KeywordMatcher(KEYWORDS)
+        for text in random_texts(200, seed=4):
+            counts = matcher.count(text)
+            self.assertEqual(matcher.count_hits(text),
+                             {keyword: count for keyword, count in counts.items() if count})
+
+    def test_duplicate_and_empty_keywords_are_ignored(self):
+        matcher = KeywordMatcher(['ab', '', 'ab', 'b'])
+        self.assertEqual(matcher.keywords, ['ab', 'b'])
+        self.assertEqual(matcher.count('abab'), {'ab': 2, 'b': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
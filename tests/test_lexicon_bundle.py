@@ -0,0 +1,44 @@
+"""Validation of lexicon files by parse_lexicon."""
+import json
+import unittest
+
+from lexicon_bundle import DEFAULT_LEXICON_PATH, parse_lexicon
+
+
+def default_lexicon():
+    with open(DEFAULT_LEXICON_PATH, encoding='utf-8') as file:
+        return json.load(file)
+
+
+class ParseLexiconTest(unittest.TestCase):
+
+    def test_default_lexicon_is_valid(self):
+        lexicon = default_lexicon()
+        self.assertEqual(parse_lexicon(json.dumps(lexicon)), lexicon)
+
+    def test_empty_and_blank_keywords_are_rejected(self):
+        locations = [
+            lambda lexicon: lexicon['collab_keywords'],
+            lambda lexicon: lexicon['personality_keywords']['Openness']['low'],
+            lambda lexicon: lexicon['experience_indicators']['mid'],
+            lambda lexicon: lexicon['industries']['tech'],
+        ]
+        for keyword in ('', ' ', '\t\n'):
+            for index, location in enumerate(locations):
+                with self.subTest(keyword=keyword, location=index):
+                    lexicon = default_lexicon()
+                    location(lexicon).append(keyword)
+                    with self.assertRaises(ValueError):
+                        parse_lexicon(json.dumps(lexicon))
+
+    def test_nested_lists_are_rejected(self):
+        for field in ('personality_keywords', 'experience_indicators', 'industries'):
+            with self.subTest(field=field):
+                lexicon = default_lexicon()
+                lexicon[field] = [lexicon[field]]
+                with self.assertRaises(ValueError):
+                    parse_lexicon(json.dumps(lexicon))
+
+
+if __name__ == '__main__':
+    unittest.main()
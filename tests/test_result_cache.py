@@ -0,0 +1,57 @@
+"""Batched commits of the result cache's SQLite file."""
+import contextlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from personality_analyzer import PersonalityAnalyzer
+from result_cache import ResultCache
+
+
+class CommitBatchingTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "cache.sqlite3")
+        self.cache = ResultCache(PersonalityAnalyzer(), path=self.path, commit_every=5)
+        self.addCleanup(self.cache.close)
+
+    def committed(self):
+        """Rows visible to another connection"""
+        with contextlib.closing(sqlite3.connect(self.path)) as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def analyze(self, count, start=0):
+        for number in range(start, start + count):
+            self.cache.analyze(f"Resume {number}: led the team")
+
+    def test_commits_every_n_results(self):
+        self.analyze(4)
+        self.assertEqual(self.committed(), 0)
+        self.analyze(1, start=4)
+        self.assertEqual(self.committed(), 5)
+        self.analyze(2, start=5)
+        self.assertEqual(self.committed(), 5)
+
+    def test_flush_and_close_commit_pending_results(self):
+        self.analyze(2)
+        self.cache.flush()
+        self.assertEqual(self.committed(), 2)
+        self.analyze(2, start=2)
+        self.cache.close()
+        self.assertEqual(self.committed(), 4)
+
+    def test_reopened_cache_serves_committed_results(self):
+        self.analyze(3)
+        self.cache.close()
+        reopened = ResultCache(PersonalityAnalyzer(), path=self.path)
+        self.addCleanup(reopened.close)
+        reopened.analyze("Resume 1: led the team")
+        self.assertEqual(reopened.stats()['disk_hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Responses of the scoring service to malformed requests."""
+import asyncio
+import json
+import unittest
+
+from scoring_service import ScoringService
+
+
+async def exchange(request):
+    """Send raw request bytes to a fresh service and return its status code and JSON body"""
+    # Requests rejected before routing never reach the batcher
+    service = ScoringService(batcher=None)
+    server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+    async with server:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+class MalformedRequestTest(unittest.TestCase):
+
+    def assertStatus(self, request, status):
+        code, payload = asyncio.run(asyncio.wait_for(exchange(request), 10))
+        self.assertEqual(code, status)
+        self.assertIn('error', payload)
+
+    def test_invalid_content_length(self):
+        for value in (b'-1', b'abc', b'1.5'):
+            with self.subTest(value=value):
+                self.assertStatus(b'POST /analyze HTTP/1.1\r\nContent-Length: ' + value + b'\r\n\r\n', 400)
+
+    def test_oversized_header(self):
+        request = b'GET /health HTTP/1.1\r\nX-Padding: ' + b'a' * 100000 + b'\r\n\r\n'
+        self.assertStatus(request, 431)
+
+    def test_oversized_request_line(self):
+        self.assertStatus(b'GET /' + b'a' * 100000 + b' HTTP/1.1\r\n\r\n', 414)
+
+    def test_malformed_request_line(self):
+        self.assertStatus(b'GET\r\n\r\n', 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Syncing the similarity index with a history store that has other writers."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from history_store import HistoryStore
+from tests.test_history_io import make_entries
+
+try:
+    from similarity_index import DIMENSIONS, SimilarityIndex
+except ImportError:
+    SimilarityIndex = None
+
+
+@unittest.skipIf(SimilarityIndex is None, "the similarity index needs NumPy")
+class SimilarityIndexSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "history.sqlite")
+        # The GUI's store and a second writer such as watch_folder
+        self.store = HistoryStore(path)
+        self.writer = HistoryStore(path)
+        self.entries = iter(make_entries(50))
+
+    def tearDown(self):
+        self.store.close()
+        self.writer.close()
+        shutil.rmtree(self.directory)
+
+    def indexed_ids(self, index):
+        return sorted(entry_id for entry_id, _ in index.query_vector([0.0] * DIMENSIONS, k=len(index)))
+
+    def stored_ids(self):
+        return [record.id for record in self.store]
+
+    def add_analysis(self, index):
+        entry = next(self.entries)
+        entry_id = self.store.append(entry)
+        index.add(entry_id, entry['personality_scores'], entry['features'] or {})
+
+    def test_entries_of_other_writers_are_synced_after_direct_adds(self):
+        snapshot = os.path.join(self.directory, "index.npz")
+        index = SimilarityIndex()
+        self.store.extend([next(self.entries) for _ in range(2)])
+        index.sync(self.store)
+        self.writer.extend([next(self.entries) for _ in range(4)])
+        self.add_analysis(index)
+        index.save(snapshot)
+
+        index = SimilarityIndex.load(snapshot)
+        self.assertEqual(index.sync(self.store), 4)
+        self.assertEqual(self.indexed_ids(index), self.stored_ids())
+        self.add_analysis(index)
+        self.assertEqual(index.sync(self.store), 0)
+        self.assertEqual(self.indexed_ids(index), self.stored_ids())
+
+    def test_snapshot_missing_older_entries_is_rebuilt(self):
+        index = SimilarityIndex()
+        self.store.extend([next(self.entries) for _ in range(3)])
+        index.sync(self.store)
+        self.writer.extend([next(self.entries) for _ in range(3)])
+        # A watermark past entries never indexed, as older versions saved it
+        index.last_id = self.stored_ids()[-1]
+        index.sync(self.store)
+        self.assertEqual(self.indexed_ids(index), self.stored_ids())
+
+
+if __name__ == '__main__':
+    unittest.main()
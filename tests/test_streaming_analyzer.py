@@ -0,0 +1,52 @@
+"""Bounded memory of the streaming analyzer's distinct word count."""
+import unittest
+
+from personality_analyzer import PersonalityAnalyzer
+from streaming_analyzer import HLL_PRECISION, MAX_EXACT_UNIQUE_WORDS, DistinctCounter, StreamingAnalyzer
+
+
+class DistinctCounterTest(unittest.TestCase):
+
+    def test_exact_up_to_the_limit(self):
+        counter = DistinctCounter(max_exact=1000)
+        for start in range(0, 3000, 100):
+            counter.update(f"w{number % 1000}" for number in range(start, start + 100))
+        self.assertEqual(counter.count(), 1000)
+        self.assertIsNone(counter.registers)
+
+    def test_estimates_past_the_limit_in_fixed_memory(self):
+        counter = DistinctCounter(max_exact=1000)
+        for start in range(0, 200000, 5000):
+            counter.update(f"word{number}" for number in range(start, start + 5000))
+            # Repeated words do not count again
+            counter.update(f"word{number}" for number in range(start, start + 50))
+        self.assertIsNone(counter.exact)
+        self.assertEqual(len(counter.registers), 1 << HLL_PRECISION)
+        self.assertAlmostEqual(counter.count() / 200000, 1, delta=0.03)
+
+    def test_estimate_is_deterministic(self):
+        words = [f"term{number}" for number in range(5000)]
+        counts = set()
+        for _ in range(2):
+            counter = DistinctCounter(max_exact=10)
+            counter.update(words)
+            counts.add(counter.count())
+        self.assertEqual(len(counts), 1)
+
+
+class StreamingAnalyzerTest(unittest.TestCase):
+
+    def test_unique_words_of_huge_vocabularies_are_estimated(self):
+        distinct = MAX_EXACT_UNIQUE_WORDS + 20000
+        streaming = StreamingAnalyzer(PersonalityAnalyzer(), chunk_size=1 << 16)
+        text = " ".join(f"w{number}" for number in range(distinct)) + " "
+        for start in range(0, len(text), 1 << 16):
+            streaming.feed(text[start:start + (1 << 16)])
+        features, _ = streaming.finish()
+        self.assertEqual(features['total_words'], distinct)
+        self.assertIsNone(streaming._unique_words.exact)
+        self.assertAlmostEqual(features['unique_words'] / distinct, 1, delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,600 @@
+"""Watch folders for resume files and ingest them into the analysis history.
+
+Examples:
+    python watch_folder.py /srv/ats/outbox
+    python watch_folder.py incoming/ --read-workers 4 --queue-size 128 --report-interval 5
+    python watch_folder.py incoming/ --once --history results.sqlite
+
+Folders are polled for new or changed files matching the pattern.  A file is
+picked up once it has stopped changing for the settle time, and it is only
+ingested if its size and modification time are the same before and after it
+is read, so files still being written are left for a later poll.  Each file
+then passes through four stages: read (and hash), extract_text_features,
+scoring and persistence into the HistoryStore.  The stages are connected by
+bounded queues and each has its own pool of worker threads, so a slow stage
+holds back the ones before it instead of letting work pile up in memory.
+
+Files whose content was already ingested, under any name, are skipped as
+duplicates by their SHA-256 hash.  Which files and hashes were ingested is
+kept in a small state database, so a restart only picks up files that are
+new or changed since.  Transient errors (I/O errors and a locked database)
+are retried with exponential backoff; files that still fail are recorded as
+failed and tried again once they change.
+
+Queue depths, per-stage throughput and busy time, and the age of the oldest
+file in the pipeline are reported periodically on stderr.
+"""
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from batch_analyze import iter_input_paths
+from history_store import HistoryStore
+from instrumentation import Histogram
+from personality_analyzer import PersonalityAnalyzer
+from result_cache import normalize_text
+
+# The GUI's history database, so ingested resumes show up in its History tab
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "history.sqlite")
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".cv_analysis", "watch_folder.sqlite")
+
+# Pipeline stages in order, with their default number of worker threads;
+# reading waits on the disk, the other stages mostly on the CPU
+STAGES = ('read', 'features', 'scoring', 'persist')
+DEFAULT_WORKERS = {'read': 2, 'features': 1, 'scoring': 1, 'persist': 1}
+
+# Files waiting in front of each stage
+DEFAULT_QUEUE_SIZE = 64
+
+# Seconds between polls, and how long a file must stay unchanged before it
+# is read
+DEFAULT_INTERVAL = 1.0
+DEFAULT_SETTLE = 2.0
+
+# Attempts after the first one for transient errors, and the delay before
+# the first retry, doubled for every further one
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0
+
+DEFAULT_REPORT_INTERVAL = 10.0
+
+# Errors worth retrying: files locked or briefly unreadable on a shared
+# folder, and a history database locked by another writer
+RETRYABLE_ERRORS = (OSError, sqlite3.OperationalError)
+
+# How long the scanner waits on a full queue before checking for retries,
+# reports and shutdown
+_PUT_TIMEOUT = 0.1
+
+
+class FileNotReady(Exception):
+    """Raised for a file that changed while it was read, or whose identical twin is still in the pipeline"""
+
+
+class IngestItem:
+    """A file travelling through the pipeline"""
+
+    def __init__(self, path, signature):
+        self.path = path
+        # (mtime_ns, size) when the file was picked up
+        self.signature = signature
+        self.picked_up = time.monotonic()
+        self.attempts = 0
+        self.digest = None
+        self.text = None
+        self.features = None
+        self.counts = None
+        self.result = None
+        self.entry_id = None
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class IngestState:
+    """Files already handled and content hashes already ingested, kept in SQLite"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    digest BLOB,
+                    entry_id INTEGER,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    updated TEXT NOT NULL
+                )
+            """)
+            self._db.execute("CREATE TABLE IF NOT EXISTS digests "
+                             "(digest BLOB PRIMARY KEY, entry_id INTEGER NOT NULL, path TEXT NOT NULL)")
+
+    def files(self):
+        """{path: (mtime_ns, size)} of every file handled so far"""
+        with self._lock:
+            return {path: (mtime_ns, size) for path, mtime_ns, size in
+                    self._db.execute("SELECT path, mtime_ns, size FROM files")}
+
+    def digests(self):
+        """{SHA-256 digest: history entry id} of every ingested content"""
+        with self._lock:
+            return dict(self._db.execute("SELECT digest, entry_id FROM digests"))
+
+    def record(self, item, status, error=None, duplicate_of=None):
+        """Remember how a file was handled; ingested files also record their digest"""
+        updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entry_id = item.entry_id if duplicate_of is None else duplicate_of
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (item.path, *item.signature, item.digest, entry_id, status, error, updated))
+            if status == 'ingested':
+                self._db.execute("INSERT OR IGNORE INTO digests VALUES (?, ?, ?)",
+                                 (item.digest, item.entry_id, item.path))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Stage:
+    """One pipeline step: a bounded input queue, its worker threads and their statistics"""
+
+    def __init__(self, name, function, workers, queue_size):
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.input = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.busy_seconds = 0.0
+        self.latency = Histogram()
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, outcome='processed'):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.busy_seconds += seconds
+            if outcome == 'processed':
+                self.latency.observe(seconds)
+
+    def snapshot(self, uptime):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self.input.qsize(),
+                'queue_size': self.input.maxsize,
+                'processed': self.processed,
+                'failed': self.failed,
+                'retried': self.retried,
+                'per_second': self.processed / uptime if uptime else 0.0,
+                # Share of the workers' time spent working; the stage close
+                # to 1.0 is the one limiting throughput
+                'utilization': self.busy_seconds / (uptime * self.workers) if uptime else 0.0,
+                'latency_seconds': self.latency.snapshot(),
+            }
+
+
+class WatchFolderPipeline:
+    """Poll folders and ingest settled new or changed files through the staged pipeline.
+
+    run() polls in the calling thread until stop() is called, or with once
+    until everything currently in the folders has been handled.  report, if
+    given, is called with metrics() every report_interval seconds.  log, if
+    given, is called with a message for every file that fails.
+    """
+
+    def __init__(self, folders, history, state, analyzer=None, pattern='*.txt', encoding='utf-8',
+                 workers=None, queue_size=DEFAULT_QUEUE_SIZE, interval=DEFAULT_INTERVAL,
+                 settle=DEFAULT_SETTLE, retries=DEFAULT_RETRIES, retry_delay=DEFAULT_RETRY_DELAY,
+                 log=None):
+        self.folders = folders
+        self.history = history
+        self.state = state
+        self.analyzer = analyzer or history.analyzer or PersonalityAnalyzer()
+        self.pattern = pattern
+        self.encoding = encoding
+        self.interval = interval
+        self.settle = settle
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.log = log or (lambda message: None)
+
+        workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        functions = {'read': self._read, 'features': self._extract_features,
+                     'scoring': self._score, 'persist': self._persist}
+        self.stages = [Stage(name, functions[name], workers[name], queue_size) for name in STAGES]
+
+        self.started = None
+        self.discovered = 0
+        self.ingested = 0
+        self.duplicates = 0
+        self.failed = 0
+        self._known = state.files()
+        self._digests = state.digests()
+        self._in_flight = {}
+        self._settling = {}
+        self._retries = []
+        self._retry_order = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._report = None
+        self._report_interval = DEFAULT_REPORT_INTERVAL
+        self._next_report = 0.0
+
+    def start(self):
+        """Start the stage worker threads"""
+        self.started = time.monotonic()
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,),
+                                          name=f"watch-{stage.name}-{number + 1}", daemon=True)
+                thread.start()
+                stage.threads.append(thread)
+
+    def run(self, once=False, report=None, report_interval=DEFAULT_REPORT_INTERVAL):
+        """Poll until stop(), or with once until the folders hold nothing left to ingest"""
+        self._report = report
+        self._report_interval = report_interval
+        self._next_report = time.monotonic() + report_interval
+        while not self._stopping.is_set():
+            settling = self.scan()
+            self._tick()
+            if once and not settling and self.pending() == 0:
+                return
+            self._stopping.wait(self.interval)
+
+    def stop(self):
+        """Stop polling, finish the files already queued and stop the workers.
+
+        Files waiting for a retry are dropped; they are still in the folder
+        and are picked up again by the next run.
+        """
+        self._stopping.set()
+        for stage in self.stages:
+            for _ in stage.threads:
+                stage.input.put(None)
+            for thread in stage.threads:
+                thread.join()
+        with self._lock:
+            self._retries = []
+
+    def pending(self):
+        """Number of files picked up and not yet ingested, skipped or failed"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def scan(self):
+        """Queue every settled new or changed file and return how many are still settling"""
+        now = time.monotonic()
+        wall_clock = time.time()
+        settling = {}
+        for path in iter_input_paths(self.folders, self.pattern):
+            try:
+                signature = file_signature(path)
+            except OSError:
+                continue
+            with self._lock:
+                if self._known.get(path) == signature or path in self._in_flight:
+                    continue
+            # Empty files are usually about to be written
+            if not signature[1]:
+                continue
+            previous = self._settling.get(path)
+            since = previous[1] if previous and previous[0] == signature else now
+            if now - since < self.settle and wall_clock - signature[0] / 1e9 < self.settle:
+                settling[path] = (signature, since)
+                continue
+
+            item = IngestItem(path, signature)
+            with self._lock:
+                self._in_flight[path] = item
+                self.discovered += 1
+            if not self._put_new(item):
+                break
+        self._settling = settling
+        return len(settling)
+
+    def _put_new(self, item):
+        """Queue a picked up file, waiting while the read queue is full"""
+        read_queue = self.stages[0].input
+        while True:
+            try:
+                read_queue.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                if self._stopping.is_set():
+                    self._release(item)
+                    return False
+                self._tick()
+
+    def _tick(self):
+        """Requeue files whose retry is due and report metrics when due"""
+        now = time.monotonic()
+        with self._lock:
+            due = []
+            while self._retries and self._retries[0][0] <= now:
+                due.append(heapq.heappop(self._retries))
+        for retry in due:
+            stage = self.stages[retry[2]]
+            try:
+                stage.input.put_nowait(retry[3])
+            except queue.Full:
+                with self._lock:
+                    heapq.heappush(self._retries, retry)
+        if self._report and now >= self._next_report:
+            self._next_report = now + self._report_interval
+            self._report(self.metrics())
+
+    def _work(self, index):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = stage.input.get()
+            if item is None:
+                return
+            started = time.perf_counter()
+            try:
+                forward = stage.function(item)
+            except (FileNotReady, FileNotFoundError):
+                # Picked up again by a later poll if the file is still there
+                stage.observe(time.perf_counter() - started, 'retried')
+                self._release(item)
+            except RETRYABLE_ERRORS as e:
+                if item.attempts < self.retries:
+                    stage.observe(time.perf_counter() - started, 'retried')
+                    self._retry(index, item)
+                else:
+                    stage.observe(time.perf_counter() - started, 'failed')
+                    self._fail(stage, item, e)
+            except Exception as e:
+                stage.observe(time.perf_counter() - started, 'failed')
+                self._fail(stage, item, e)
+            else:
+                stage.observe(time.perf_counter() - started)
+                if forward and next_stage is not None:
+                    next_stage.input.put(item)
+
+    def _retry(self, index, item):
+        delay = self.retry_delay * 2 ** item.attempts
+        item.attempts += 1
+        with self._lock:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_order), index, item))
+
+    def _release(self, item):
+        """Forget a file without recording it, so that the scanner sees it again"""
+        with self._lock:
+            self._in_flight.pop(item.path, None)
+            if item.digest is not None and self._digests.get(item.digest, 0) is None:
+                del self._digests[item.digest]
+
+    def _finish(self, item, status):
+        with self._lock:
+            self._in_flight.pop(item.path, None)
+            self._known[item.path] = item.signature
+            setattr(self, status, getattr(self, status) + 1)
+
+    def _fail(self, stage, item, error):
+        message = f"{item.path}: {stage.name} failed: {error}"
+        self.log(message)
+        with self._lock:
+            if item.digest is not None and self._digests.get(item.digest, 0) is None:
+                del self._digests[item.digest]
+        try:
+            self.state.record(item, 'failed', str(error))
+        except sqlite3.Error as e:
+            # Not recorded, so the file is tried again on the next run
+            self.log(f"{item.path}: could not record the failure: {e}")
+        self._finish(item, 'failed')
+
+    def _read(self, item):
+        """Read a settled file and skip it if its content was ingested before"""
+        if file_signature(item.path) != item.signature:
+            raise FileNotReady(item.path)
+        with open(item.path, 'rb') as file:
+            data = file.read()
+        if file_signature(item.path) != item.signature:
+            raise FileNotReady(item.path)
+
+        digest = hashlib.sha256(data).digest()
+        with self._lock:
+            if digest not in self._digests:
+                # Claimed until ingested, so identical files read meanwhile wait
+                self._digests[digest] = None
+                duplicate_of = None
+            else:
+                duplicate_of = self._digests[digest]
+                if duplicate_of is None:
+                    raise FileNotReady(item.path)
+        item.digest = digest
+        if duplicate_of is not None:
+            self.state.record(item, 'duplicate', duplicate_of=duplicate_of)
+            self._finish(item, 'duplicates')
+            return False
+        item.text = normalize_text(data.decode(self.encoding, errors='replace'))
+        return True
+
+    def _extract_features(self, item):
+        analyzer = self.analyzer
+        item.features = analyzer.extract_text_features(item.text)
+        item.counts = analyzer.count_keywords(item.text)
+        item.text = None
+        return True
+
+    def _score(self, item):
+        analyzer = self.analyzer
+        item.result = analyzer.analyze_counts(item.counts, item.features)
+        item.result['lexicon_version'] = analyzer.lexicon_version
+        item.counts = None
+        return True
+
+    def _persist(self, item):
+        result = item.result
+        personality_scores = result['personality_scores']
+        dominant_trait = result['dominant_trait']
+        # A retry after the state update failed must not store the entry twice
+        if item.entry_id is None:
+            item.entry_id = self.history.append({
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'experience_level': result['experience_level'],
+                'industry': result['industry'],
+                'dominant_trait': f"{dominant_trait} ({personality_scores[dominant_trait]:.1f})",
+                'personality_scores': personality_scores,
+                'features': result['features'],
+                'lexicon_version': result['lexicon_version'],
+            })
+        self.state.record(item, 'ingested')
+        with self._lock:
+            self._digests[item.digest] = item.entry_id
+        self._finish(item, 'ingested')
+        return True
+
+    def metrics(self):
+        """Counters, queue depths and per-stage throughput as a dict"""
+        now = time.monotonic()
+        uptime = now - self.started if self.started else 0.0
+        with self._lock:
+            oldest = min((item.picked_up for item in self._in_flight.values()), default=None)
+            metrics = {
+                'uptime_seconds': uptime,
+                'discovered': self.discovered,
+                'ingested': self.ingested,
+                'duplicates': self.duplicates,
+                'failed': self.failed,
+                'in_flight': len(self._in_flight),
+                'waiting_for_retry': len(self._retries),
+                'settling': len(self._settling),
+                # Time the oldest file in the pipeline has spent in it; it
+                # keeps growing when ingestion falls behind
+                'oldest_in_flight_seconds': now - oldest if oldest is not None else 0.0,
+            }
+        metrics['stages'] = {stage.name: stage.snapshot(uptime) for stage in self.stages}
+        return metrics
+
+
+class StatusReporter:
+    """Print one status line per report, with throughput since the previous one"""
+
+    def __init__(self, output=sys.stderr, as_json=False):
+        self.output = output
+        self.as_json = as_json
+        self._previous = None
+
+    def __call__(self, metrics):
+        if self.as_json:
+            print(json.dumps(metrics), file=self.output, flush=True)
+            return
+        previous = self._previous or {'uptime_seconds': 0.0, 'stages': {}}
+        seconds = metrics['uptime_seconds'] - previous['uptime_seconds']
+        parts = []
+        for name, stage in metrics['stages'].items():
+            done = stage['processed'] - previous['stages'].get(name, {}).get('processed', 0)
+            rate = done / seconds if seconds > 0 else 0.0
+            parts.append(f"{name} {stage['queue_depth']}/{stage['queue_size']} "
+                         f"{rate:.1f}/s {stage['utilization']:.0%}")
+        print(f"[{datetime.now():%H:%M:%S}] {' | '.join(parts)} | ingested {metrics['ingested']}, "
+              f"duplicates {metrics['duplicates']}, failed {metrics['failed']}, "
+              f"in flight {metrics['in_flight']}, oldest {metrics['oldest_in_flight_seconds']:.1f}s",
+              file=self.output, flush=True)
+        self._previous = metrics
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Watch folders for resume files and ingest them into the analysis history")
+    parser.add_argument('folders', nargs='+', help="folders to watch")
+    parser.add_argument('--pattern', default='*.txt',
+                        help="filename pattern of resume files (default: *.txt)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH,
+                        help="history database to ingest into (default: the GUI's history)")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH,
+                        help="database remembering ingested files and content hashes")
+    parser.add_argument('--encoding', default='utf-8', help="encoding of resume files")
+    for stage in STAGES:
+        parser.add_argument(f'--{stage}-workers', type=int, default=DEFAULT_WORKERS[stage],
+                            help=f"worker threads of the {stage} stage (default: {DEFAULT_WORKERS[stage]})")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"files queued in front of each stage (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between polls of the folders (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE,
+                        help=f"seconds a file must stay unchanged before it is read (default: {DEFAULT_SETTLE:g})")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f"retries of a file after a transient error (default: {DEFAULT_RETRIES})")
+    parser.add_argument('--report-interval', type=float, default=DEFAULT_REPORT_INTERVAL,
+                        help=f"seconds between status reports (default: {DEFAULT_REPORT_INTERVAL:g})")
+    parser.add_argument('--json', action='store_true',
+                        help="report the full metrics as JSON lines instead of status lines")
+    parser.add_argument('--once', action='store_true',
+                        help="ingest what is in the folders now, then exit")
+    parser.add_argument('--word-boundary', action='store_true',
+                        help="only count keywords that appear as whole words")
+    parser.add_argument('--lexicon', metavar='PATH',
+                        help="lexicon JSON file to use instead of the default lexicon")
+    args = parser.parse_args(argv)
+
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            parser.error(f"{folder} is not a folder")
+    if any(getattr(args, f'{stage}_workers') < 1 for stage in STAGES):
+        parser.error("every stage needs at least 1 worker")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+    if args.retries < 0:
+        parser.error("--retries must not be negative")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    analyzer = PersonalityAnalyzer(word_boundary=args.word_boundary, lexicon_path=args.lexicon)
+    history = HistoryStore(args.history, analyzer)
+    state = IngestState(args.state)
+    pipeline = WatchFolderPipeline(
+        args.folders, history, state, analyzer, args.pattern, args.encoding,
+        workers={stage: getattr(args, f'{stage}_workers') for stage in STAGES},
+        queue_size=args.queue_size, interval=args.interval, settle=args.settle,
+        retries=args.retries, log=lambda message: print(message, file=sys.stderr, flush=True))
+    reporter = StatusReporter(as_json=args.json)
+
+    print(f"Watching {', '.join(args.folders)} for {args.pattern}", file=sys.stderr)
+    pipeline.start()
+    try:
+        pipeline.run(args.once, reporter, args.report_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        reporter(pipeline.metrics())
+        state.close()
+        history.close()
+
+    print(f"Ingested {pipeline.ingested} resumes ({pipeline.duplicates} duplicates, "
+          f"{pipeline.failed} failed)", file=sys.stderr)
+    return 1 if pipeline.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())